@@ -14,6 +14,9 @@ class ExecutionAgent(Agent):
         self.plugin_manager = plugin_manager
         self.logger = setup_logger("ExecutionAgent")
 
+    async def shutdown(self) -> None:
+        await self.plugin_manager.shutdown()
+
     def _extract_failure_reason(self, plugin_response: MCPRequest[Any]) -> str:
         if not plugin_response.content:
             return "plugin response is empty"
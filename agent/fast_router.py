@@ -0,0 +1,121 @@
+import math
+import re
+from collections import Counter
+from typing import Any, Dict, List, Tuple
+
+from scheme.mcp import MCPRequest, MCPRequestMessage
+from utils.constant import FAST_ROUTER_MIN_MARGIN, FAST_ROUTER_MIN_SCORE, FAST_ROUTER_STOPWORDS
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    CamelCase 이름과 snake_case 키까지 단어 단위로 나눈 소문자 토큰. 불용어는 뺀다.
+    recommends / recommendation 처럼 어형만 다른 단어가 같아지도록 앞 6글자만 사용한다.
+    """
+    text = re.sub(r"([a-z])([A-Z])", r"\1 \2", text)
+    return [
+        token[:6]
+        for token in re.split(r"[^0-9a-zA-Z가-힣]+", text.lower())
+        if len(token) > 1 and token not in FAST_ROUTER_STOPWORDS
+    ]
+
+
+def strip_examples(description: str) -> str:
+    """
+    설명(.md)에서 예시 문장("e.g., ...")을 뺀 부분. 예시 속 도시 이름 같은 단어가 색인에 들어가지 않게 한다.
+    """
+    return re.split(r"e\.g\.|for example|예:|예\)", description, maxsplit=1, flags=re.IGNORECASE)[0]
+
+
+class FastToolRouter:
+    """
+        LLM을 거치지 않고 도구를 고르는 사전 선택 단계
+
+        플러그인의 이름, 설명(.md, 예시 제외), 스키마(.json)의 metadata 키로 TF-IDF 색인을 만든 뒤
+        요청 문장의 유사도에 metadata 키 일치율을 가중치로 곱한다.
+        요청 문장에 도구의 기능 단어(이름과 설명의 단어 중 스키마 키가 아닌 것)가 하나도 없으면 후보에서 뺀다.
+        1등 점수와 2등과의 차이가 모두 기준을 넘을 때만 도구를 확정하고, 아니면 None을 반환한다.
+    """
+
+    def __init__(
+        self,
+        profiles: List[Dict[str, Any]],
+        min_score: float = FAST_ROUTER_MIN_SCORE,
+        min_margin: float = FAST_ROUTER_MIN_MARGIN,
+    ):
+        self.min_score = min_score
+        self.min_margin = min_margin
+        self._schema_keys: Dict[str, set] = {}
+        self._capabilities: Dict[str, set] = {}
+        documents: Dict[str, Counter] = {}
+
+        for profile in profiles:
+            name = profile["name"]
+            schema = profile.get("schema") or {}
+            keys = set((schema.get("metadata") or {}).keys()) if isinstance(schema, dict) else set()
+            key_tokens = [token for key in keys for token in tokenize(key)]
+            terms = tokenize(name) + tokenize(strip_examples(profile.get("description") or ""))
+            self._schema_keys[name] = keys
+            # metadata 키만 겹치는 요청(city 등)으로는 도구를 고르지 않도록 기능 단어에서 키를 뺀다
+            self._capabilities[name] = set(terms) - set(key_tokens)
+            documents[name] = Counter(terms + key_tokens)
+
+        document_frequency = Counter(token for document in documents.values() for token in document)
+        total = len(documents)
+        self._idf = {token: math.log((1 + total) / (1 + df)) + 1 for token, df in document_frequency.items()}
+        self._vectors = {name: self._normalize(self._weigh(document)) for name, document in documents.items()}
+
+    def score(self, content: str, metadata: Any) -> List[Tuple[str, float]]:
+        keys = self._metadata_keys(metadata)
+        content_tokens = tokenize(content)
+        query = Counter(content_tokens + [token for key in keys for token in tokenize(key)])
+        query_vector = self._normalize(self._weigh(query))
+
+        scores = []
+        for name, vector in self._vectors.items():
+            if self._capabilities[name].isdisjoint(content_tokens):
+                scores.append((name, 0.0))
+                continue
+            text_score = sum(weight * vector.get(token, 0.0) for token, weight in query_vector.items())
+            schema_keys = self._schema_keys[name]
+            key_score = len(keys & schema_keys) / len(keys) if keys and schema_keys else 0.0
+            scores.append((name, text_score * (0.5 + 0.5 * key_score)))
+
+        return sorted(scores, key=lambda item: item[1], reverse=True)
+
+    def select(self, content: str, metadata: Any) -> List[MCPRequest] | None:
+        scores = self.score(content, metadata)
+        if not scores:
+            return None
+
+        best_name, best = scores[0]
+        second = scores[1][1] if len(scores) > 1 else 0.0
+        if best < self.min_score or (best - second) / best < self.min_margin:
+            return None
+
+        # 선택한 도구의 스키마에 있는 파라미터만 넘긴다. 스키마(.json)가 없는 도구는 LLM 경로처럼 그대로 넘긴다
+        schema_keys = self._schema_keys[best_name]
+        parameters = (
+            {k: v for k, v in metadata.items() if k != "content" and (not schema_keys or k in schema_keys)}
+            if isinstance(metadata, dict) else {}
+        )
+        return [
+            MCPRequest[dict](
+                content=[MCPRequestMessage[dict](content=content, metadata=parameters)],
+                selected_tool=best_name,
+            )
+        ]
+
+    def _weigh(self, counter: Counter) -> Dict[str, float]:
+        return {token: count * self._idf.get(token, 0.0) for token, count in counter.items()}
+
+    @staticmethod
+    def _normalize(vector: Dict[str, float]) -> Dict[str, float]:
+        norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+        return {token: weight / norm for token, weight in vector.items()} if norm else {}
+
+    @staticmethod
+    def _metadata_keys(metadata: Any) -> set:
+        if not isinstance(metadata, dict):
+            return set()
+        return {key for key in metadata.keys() if key != "content"}
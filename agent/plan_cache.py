@@ -0,0 +1,98 @@
+import json
+import re
+import sqlite3
+import time
+import unicodedata
+from typing import List
+
+from scheme.a2a_message import AgentMessage
+from utils.cache import TTLCache
+from utils.constant import PLAN_CACHE_MAX_BYTES, PLAN_CACHE_MAX_ENTRIES, PLAN_CACHE_TTL
+from utils.logging import setup_logger
+
+
+def normalize_request(text: str) -> str:
+    """대소문자, 유니코드 표기, 공백, 앞뒤 문장부호 차이를 무시하는 정규화 키"""
+    text = unicodedata.normalize("NFKC", text).lower()
+    text = re.sub(r"\s+", " ", text)
+    return text.strip(" \t\n.,!?~")
+
+
+class PlanCache:
+    """
+        PlanningAgent의 LLM 플래닝 결과 캐시
+
+        - 원문 그대로의 key를 먼저 찾고, 없으면 정규화된 key로 찾는다.
+        - 메모리는 TTL + LRU + 용량 제한, path가 주어지면 SQLite에도 저장한다.
+          만료된 row는 시작할 때와 저장할 때 지운다.
+        - hits / misses는 get() 호출 단위로 센다. (원문 key와 정규화 key 조회를 합쳐 한 번)
+        - 캐시된 plan은 JSON으로 보관하고 조회할 때마다 새 AgentMessage로 만든다.
+    """
+
+    def __init__(
+        self,
+        path: str | None = None,
+        ttl: float = PLAN_CACHE_TTL,
+        max_entries: int = PLAN_CACHE_MAX_ENTRIES,
+        max_bytes: int = PLAN_CACHE_MAX_BYTES,
+    ):
+        self.logger = setup_logger("PlanCache")
+        self.ttl = ttl
+        self._memory: TTLCache[str, str] = TTLCache(max_entries=max_entries, ttl=ttl, max_bytes=max_bytes, sizeof=len)
+        self._db: sqlite3.Connection | None = None
+        self.hits = 0
+        self.misses = 0
+
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS plans (key TEXT PRIMARY KEY, plan TEXT, created REAL)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS plans_created ON plans (created)")
+            self._prune()
+            self._db.commit()
+
+    def get(self, request: str) -> List[AgentMessage] | None:
+        for key in self._keys(request):
+            plan = self._memory.get(key)
+            if plan is None:
+                plan = self._load(key)
+                if plan is not None:
+                    self._memory.set(key, plan)
+
+            if plan is not None:
+                self.hits += 1
+                return [AgentMessage.model_validate(item) for item in json.loads(plan)]
+
+        self.misses += 1
+        return None
+
+    def put(self, request: str, messages: List[AgentMessage]) -> None:
+        plan = json.dumps([message.model_dump() for message in messages], ensure_ascii=False)
+        for key in self._keys(request):
+            self._memory.set(key, plan)
+            self._store(key, plan)
+
+    def _keys(self, request: str) -> List[str]:
+        return [f"exact:{request}", f"normalized:{normalize_request(request)}"]
+
+    def _load(self, key: str) -> str | None:
+        if self._db is None:
+            return None
+
+        row = self._db.execute(
+            "SELECT plan FROM plans WHERE key = ? AND created >= ?", (key, time.time() - self.ttl)
+        ).fetchone()
+        return row[0] if row else None
+
+    def _store(self, key: str, plan: str) -> None:
+        if self._db is None:
+            return
+
+        try:
+            self._db.execute("INSERT OR REPLACE INTO plans VALUES (?, ?, ?)", (key, plan, time.time()))
+            self._prune()
+            self._db.commit()
+        except sqlite3.Error as e:
+            self.logger.error(f"[PlanCache] 저장 실패: {e}", exc_info=True)
+
+    def _prune(self) -> None:
+        self._db.execute("DELETE FROM plans WHERE created < ?", (time.time() - self.ttl,))
@@ -1,12 +1,15 @@
+import asyncio
 from collections.abc import AsyncGenerator
 from copy import deepcopy
 import os
-from typing import List
+from typing import List, Set
+from agent.plan_cache import PlanCache
 from agent.planning_agent_mcts import MCTSPlanner, PlanningState
 from agent.selector.base import Agent
 from models.model import ApiModel
 from scheme.a2a_message import AgentMessage
 from scheme.mcp import MCPRequest, MCPRequestMessage
+from utils.constant import MAX_ITERATIONS, MCTS_TIME_BUDGET
 from utils.env import load_dotenv
 from utils.logging import setup_logger
 
@@ -76,6 +79,13 @@ class PlanningAgent(Agent):
         load_dotenv()
         api_key = os.getenv("GOOGLE_API_KEY")
         self.model = ApiModel("gemini", api_key, "gemini-2.0-flash-lite")
+        self.plan_cache = PlanCache(path=os.getenv("PLAN_CACHE_PATH"))
+
+    async def startup(self) -> None:
+        await self.model.start()
+
+    async def shutdown(self) -> None:
+        await self.model.close()
 
     def set_state(self, state: PlanningState) -> None:
         self.state = state
@@ -83,7 +93,11 @@ class PlanningAgent(Agent):
     def get_state(self) -> PlanningState:
         return self.state
 
-    async def on_event(self, message: AgentMessage) -> AsyncGenerator[AgentMessage]:
+    async def on_event(self, message: AgentMessage, state: PlanningState | None = None) -> AsyncGenerator[AgentMessage]:
+        # 하나의 PlanningAgent를 여러 세션이 함께 쓰므로 Router는 세션 상태를 인자로 넘긴다.
+        # (set_state로 지정한 self.state는 다른 세션이 바꿀 수 있어 인자가 없을 때만 쓴다)
+        if state is None:
+            state = self.state
         try:
             for payload in message.payload:
                 content_data = payload.content
@@ -99,7 +113,21 @@ class PlanningAgent(Agent):
                         yield AgentMessage(sender="PlanningAgent", receiver="user", payload=[response_payload])
                         return
 
-                response_messages = await self.model.ask(self.system_prompt, queries, request_sender="PlanningAgent")
+                cache_key = "\n".join(queries)
+                response_messages = self.plan_cache.get(cache_key)
+                # 스트리밍 중에 먼저 내보낸 step (MCTS 결과에서 다시 내보내지 않는다)
+                streamed: Set[int] = set()
+                if response_messages is None:
+                    response_messages = []
+                    # 선행 step이 없는 step은 plan 전체가 생성되기를 기다리지 않고 바로 내보낸다
+                    async for step in self.model.ask_stream(self.system_prompt, queries, request_sender="PlanningAgent"):
+                        response_messages.append(step)
+                        if step.dag in (-1, None) and step.receiver != "user":
+                            streamed.add(id(step))
+                            yield step
+                    if response_messages:
+                        self.plan_cache.put(cache_key, response_messages)
+
                 if not response_messages:
                     response_message = MCPRequestMessage[str](content="플래닝 결과가 비어 있습니다.")
                     response_payload = MCPRequest[str](content=[response_message])
@@ -107,14 +135,22 @@ class PlanningAgent(Agent):
                     yield AgentMessage(sender="PlanningAgent", receiver="user", payload=[response_payload])
                     return
                 
-                self.state.remaining_goals.extend(response_messages)
-                # 2. MCTS 실행
-                planner = MCTSPlanner(root_state=self.state)
-                best_plan = planner.run(max_iter=10)
+                state.set_goals(response_messages)
+                # 2. MCTS 실행 (CPU 작업이므로 이벤트 루프 밖에서 실행)
+                # 먼저 내보낸 step이 실행되며 state를 바꾸므로, 탐색은 복제본에서 하고 결과만 반영한다
+                planning_state = state.clone()
+                history_length = len(state.history)
+                planner = MCTSPlanner(root_state=planning_state)
+                best_plan = await asyncio.to_thread(planner.run, max_iter=MAX_ITERATIONS, time_budget=MCTS_TIME_BUDGET)
+                state.init_args(
+                    history=planning_state.history + state.history[history_length:],
+                    remaining_goals=planning_state.remaining_goals,
+                )
                 
-                for plan in best_plan:
-                    yield plan
-
+                # best_plan 앞부분은 이전 요청의 history이므로 이번 요청에서 계획한 step만 내보낸다
+                for plan in best_plan[history_length:]:
+                    if id(plan) not in streamed:
+                        yield plan
         except Exception as e:
             self.logger.error(f"PlanningAgent 에러: {e}", exc_info=True)
             response_message = MCPRequestMessage[str](content="플래닝 중 시스템 오류가 발생했습니다.")
@@ -1,12 +1,38 @@
-import random
-from copy import deepcopy
-from typing import Dict, List, Union
+import asyncio
+import hashlib
+import math
+import pickle
+import time
+from collections import OrderedDict
+from typing import Dict, List, Set, Tuple, Union
+
+import numpy as np
 
 from scheme.a2a_message import AgentMessage
-from utils.constant import FAIL, SUCCESS
+from utils.constant import (
+    FAIL,
+    MCTS_EXPLORATION,
+    MCTS_MAX_TREES,
+    MCTS_ROLLOUT_BATCH,
+    MCTS_ROLLOUT_CELLS,
+    SUCCESS,
+)
+
+
+def message_key(message: AgentMessage) -> bytes:
+    """메시지 내용 해시. 같은 내용(pydantic 동등성)이면 같은 값이 나온다."""
+    return hashlib.blake2b(message.model_dump_json().encode("utf-8"), digest_size=16).digest()
 
 
 class PlanningState:
+    """
+        세션의 플래닝 상태
+
+        clone()은 컨테이너를 복사하지 않고 공유하며, 어느 쪽이든 처음 수정하는 컨테이너만
+        그때 얕게 복사한다. (copy-on-write) AgentMessage는 변경하지 않는 값으로 취급해 공유한다.
+        history와 실행 결과에는 id / 내용 해시 색인을 유지해 merge와 중복 검사를 메시지당 O(1)로 처리한다.
+    """
+
     history: List[AgentMessage] = []
     remaining_goals: List[AgentMessage] = []
     execution_results: Dict[int, List[AgentMessage]] = {}
@@ -15,62 +41,319 @@ class PlanningState:
         self,
         history: List[AgentMessage],
         remaining_goals: List[AgentMessage],
-        execution_results: Dict[str, List[AgentMessage]] = {},
+        execution_results: Dict[str, List[AgentMessage]] | None = None,
     ):
         self.history = history
         self.remaining_goals = remaining_goals
-        self.execution_results = execution_results
+        self.execution_results = execution_results if execution_results is not None else {}
+        self._waiters: Dict[int, List[asyncio.Future]] = {}
+        self._shared: Set[str] = set()
+        self._shared_results: Set[int] = set()
+        self._reset_indexes()
+        # MCTSPlanner가 goal 구성별로 재사용하는 탐색 트리 (clone 간에 공유)
+        self.search_trees: OrderedDict = OrderedDict()
+
+    def __getstate__(self):
+        # 대기 중인 future는 이벤트 루프에 묶여 있고 탐색 트리/색인은 캐시이므로 복사 대상에서 제외
+        state = self.__dict__.copy()
+        state.pop("_waiters", None)
+        state.pop("search_trees", None)
+        state.pop("_history_index", None)
+        state.pop("_result_index", None)
+        state.pop("_size_index", None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._waiters = {}
+        self.search_trees = OrderedDict()
+        # deepcopy 결과는 다른 상태와 컨테이너를 공유하지 않는다
+        self._shared = set()
+        self._shared_results = set()
+        self._reset_indexes()
+
+    def dumps(self) -> bytes:
+        """
+        세션 offload용 직렬화. pydantic generic 모델(MCPRequest[Any])은 pickle할 수 없으므로
+        메시지는 dict로 바꿔 저장한다. 대기 중인 future와 탐색 트리는 저장하지 않는다.
+        """
+        return pickle.dumps(
+            {
+                "history": [msg.model_dump() for msg in self.history],
+                "remaining_goals": [msg.model_dump() for msg in self.remaining_goals],
+                "execution_results": {
+                    parent_id: [msg.model_dump() for msg in results]
+                    for parent_id, results in self.execution_results.items()
+                },
+            },
+            protocol=pickle.HIGHEST_PROTOCOL,
+        )
+
+    @classmethod
+    def loads(cls, data: bytes) -> "PlanningState":
+        state = pickle.loads(data)
+        return cls(
+            history=[AgentMessage.model_validate(msg) for msg in state["history"]],
+            remaining_goals=[AgentMessage.model_validate(msg) for msg in state["remaining_goals"]],
+            execution_results={
+                parent_id: [AgentMessage.model_validate(msg) for msg in results]
+                for parent_id, results in state["execution_results"].items()
+            },
+        )
 
     def clone(self) -> "PlanningState":
-        return PlanningState(
-            history=deepcopy(self.history),
-            remaining_goals=deepcopy(self.remaining_goals),
-            execution_results=deepcopy(self.execution_results),
+        other = PlanningState(
+            history=self.history,
+            remaining_goals=self.remaining_goals,
+            execution_results=self.execution_results,
         )
+        for state in (self, other):
+            state._shared = {"history", "remaining_goals", "execution_results"}
+        other.search_trees = self.search_trees
+        # list를 공유하므로 측정해 둔 크기도 그대로 쓸 수 있다
+        other._size_index = {key: list(index) for key, index in self._size_index.items()}
+        return other
+
+    def approx_size(self) -> int:
+        """
+        메시지 JSON byte 수의 합으로 추정한 상태 크기. (SessionStore의 sizeof)
+        list마다 마지막으로 측정한 길이를 기억해 두고 그 뒤에 붙은 메시지만 측정한다.
+        같은 자리의 메시지가 교체된 경우는 list가 바뀌거나 줄어들 때까지 반영되지 않는다.
+        """
+        containers = [(("history",), self.history), (("remaining_goals",), self.remaining_goals)]
+        containers += [(("result", parent_id), results) for parent_id, results in self.execution_results.items()]
+
+        sizes: Dict[tuple, list] = {}
+        total = 0
+        for key, messages in containers:
+            index = self._size_index.get(key)
+            if index is None or index[0] is not messages or index[1] > len(messages):
+                index = [messages, 0, 0]
+            for message in messages[index[1]:]:
+                index[2] += len(message.model_dump_json())
+            index[1] = len(messages)
+            sizes[key] = index
+            total += index[2]
+
+        self._size_index = sizes
+        return total
+
+    def _own(self, name: str):
+        if name in self._shared:
+            value = getattr(self, name)
+            if isinstance(value, dict):
+                self._shared_results = set(value.keys())
+                value = dict(value)
+            else:
+                copied = list(value)
+                # 측정해 둔 크기는 복사본에서도 그대로 유효하다
+                index = self._size_index.get((name,))
+                if index is not None and index[0] is value:
+                    index[0] = copied
+                value = copied
+            setattr(self, name, value)
+            self._shared.discard(name)
+        return getattr(self, name)
+
+    def _own_result(self, parent_id: int) -> List[AgentMessage]:
+        results = self._own("execution_results")
+        if parent_id in self._shared_results:
+            index = self._size_index.get(("result", parent_id))
+            copied = list(results[parent_id])
+            if index is not None and index[0] is results[parent_id]:
+                index[0] = copied
+            results[parent_id] = copied
+            self._shared_results.discard(parent_id)
+        return results[parent_id]
 
     def init_args(self, **kwargs):
         self.__dict__.update(kwargs)
+        self._shared.difference_update(kwargs.keys())
+        if "history" in kwargs:
+            self._history_index = None
+        if "execution_results" in kwargs:
+            self._result_index = {}
+
+    def begin_request(self):
+        """
+        새 요청을 시작할 때 이전 요청의 실행 결과, 대기 중인 future, 남은 goal을 비웁니다.
+        step id는 요청마다 0부터 다시 매겨지므로 이전 결과가 남아 있으면 새 step의 선행 결과로 잘못 쓰인다.
+        history는 대화 맥락이므로 유지한다.
+        """
+        for waiters in self._waiters.values():
+            for future in waiters:
+                future.cancel()
+        self._waiters = {}
+        self.init_args(remaining_goals=[], execution_results={})
+        self._shared_results = set()
+
+    def _reset_indexes(self):
+        # history 색인: [색인한 list 객체, 색인한 길이, id -> 위치, 내용 해시 -> 개수]
+        self._history_index: list | None = None
+        # parent_id -> [색인한 list 객체, 색인한 길이, 내용 해시 집합]
+        self._result_index: Dict[int, list] = {}
+        # 컨테이너 -> [측정한 list 객체, 측정한 길이, byte 수] (approx_size용)
+        self._size_index: Dict[tuple, list] = {}
+
+    def _indexed_history(self) -> Tuple[Dict[int | None, int], Dict[bytes, int], Set[bytes]]:
+        """
+        id가 겹치지 않도록 정리된 history의 (id -> 위치, 내용 해시 -> 개수) 색인과
+        이번 정리에서 추가되거나 교체된 메시지들의 내용 해시를 반환합니다.
+        history는 정리되지 않은 새 메시지가 뒤에 붙는 형태로만 바뀌므로, 색인 이후에 붙은 부분만 정리합니다.
+        (list가 교체되었거나 줄어든 경우에는 처음부터 다시 만듭니다.)
+        """
+        index = self._history_index
+        if index is None or index[0] is not self.history or index[1] > len(self.history):
+            index = self._history_index = [self.history, 0, {}, {}]
+
+        tail_keys: Set[bytes] = set()
+        if index[1] < len(self.history):
+            history = self._own("history")
+            index[0] = history
+            tail = history[index[1]:]
+            del history[index[1]:]
+            tail_keys = self._append_unique(tail)
+        return index[2], index[3], tail_keys
+
+    def _append_unique(self, messages: List[AgentMessage]) -> Set[bytes]:
+        """
+        색인이 최신인 history에 messages를 id 기준으로 병합합니다. 같은 id는 처음 위치에 마지막 값을 둡니다.
+        추가되거나 교체된 메시지들의 내용 해시를 반환합니다.
+        """
+        history = self._own("history")
+        index = self._history_index
+        index[0] = history
+        ids, keys = index[2], index[3]
+        added: Set[bytes] = set()
+
+        for message in messages:
+            key = message_key(message)
+            added.add(key)
+            position = ids.get(message.id)
+            if position is None:
+                ids[message.id] = len(history)
+                history.append(message)
+            else:
+                replaced = message_key(history[position])
+                added.add(replaced)
+                keys[replaced] -= 1
+                if not keys[replaced]:
+                    del keys[replaced]
+                history[position] = message
+            keys[key] = keys.get(key, 0) + 1
+
+        index[1] = len(history)
+        return added
+
+    def _indexed_result(self, parent_id: int) -> Set[bytes]:
+        results = self.execution_results[parent_id]
+        index = self._result_index.get(parent_id)
+        if index is None or index[0] is not results or index[1] > len(results):
+            index = self._result_index[parent_id] = [results, 0, set()]
+
+        for message in results[index[1]:]:
+            index[2].add(message_key(message))
+        index[1] = len(results)
+        return index[2]
+
+    def merge(self, other: "PlanningState"):
+        """
+        다른 상태(같은 상태여도 된다)의 history / goal / 실행 결과를 병합합니다.
+        - history: id 기준으로 합치고 같은 id는 나중 메시지로 교체
+        - remaining_goals: other의 goal 중 (병합 전) history에 이미 있는 메시지는 제외
+        - execution_results: 중복 메시지를 제외하고 추가
+        """
+        ids, keys, tail_keys = self._indexed_history()
+        # 병합 전 history 기준으로 거른다. (이번 정리에서 교체된 메시지도 포함)
+        # 동등한 메시지는 id도 같으므로 id가 있을 때만 내용 해시를 계산한다
+        goals = [
+            goal for goal in other.remaining_goals
+            if goal.id not in ids or (message_key(goal) not in keys and message_key(goal) not in tail_keys)
+        ]
+        if other is not self:
+            self._append_unique(list(other.history))
+
+        if len(goals) != len(self.remaining_goals) or other is not self:
+            self.init_args(remaining_goals=goals)
+
+        self.update_execute(other.execution_results)
 
     def set_history(self, result: Union[AgentMessage | List[AgentMessage]]):
+        history = self._own("history")
         if isinstance(result, list):
-            self.history.extend(result)
+            history.extend(result)
             return
 
-        self.history.append(result)
+        history.append(result)
 
     def set_goals(self, result: Union[AgentMessage | List[AgentMessage]]):
+        goals = self._own("remaining_goals")
         if isinstance(result, list):
-            self.remaining_goals.extend(result)
+            goals.extend(result)
             return
 
-        self.remaining_goals.append(result)
+        goals.append(result)
+
+    def pop_goal(self, index: int) -> AgentMessage:
+        return self._own("remaining_goals").pop(index)
 
     def set_result(self, parent_id: int, result: AgentMessage):
-        if not parent_id in self.execution_results:
-            self.execution_results[parent_id] = []
+        if parent_id not in self.execution_results:
+            self._own("execution_results")[parent_id] = []
 
-        state = self.execution_results[parent_id]
+        state = self._own_result(parent_id)
 
-        if result in state:
+        if message_key(result) in self._indexed_result(parent_id):
             print(f"[set_result] Duplicate detected — skipping")
             return
 
-        self.execution_results[parent_id].append(result)
+        state.append(result)
+        self._notify_waiters(parent_id)
 
     def update_execute(self, new_state: Dict[int, List[AgentMessage]]):
         for k, v in new_state.items():
-            if k in self.execution_results:
+            if v is self.execution_results.get(k):
+                pass
+            elif k in self.execution_results:
                 for value in v:
-                    if value not in self.execution_results[k]:
-                        self.execution_results[k].extend(v)
+                    if message_key(value) not in self._indexed_result(k):
+                        self._own_result(k).append(value)
             else:
-                self.execution_results[k] = v
+                # 다른 상태의 리스트를 그대로 가져오므로 공유 중으로 표시
+                self._own("execution_results")[k] = v
+                self._shared_results.add(k)
+
+            self._notify_waiters(k)
+
+    def wait_result(self, parent_id: int) -> asyncio.Future:
+        """
+        parent_id의 실행 결과가 기록되는 즉시 완료되는 future를 반환합니다.
+        이미 결과가 있다면 완료된 future를 반환합니다.
+        """
+        future = asyncio.get_running_loop().create_future()
+        if self.get_result(parent_id):
+            future.set_result(self.execution_results[parent_id])
+            return future
+
+        waiters = self._waiters.setdefault(parent_id, [])
+        waiters.append(future)
+        future.add_done_callback(lambda f: f in waiters and waiters.remove(f))
+        return future
+
+    def _notify_waiters(self, parent_id: int):
+        if not self.get_result(parent_id):
+            return
+
+        for future in self._waiters.pop(parent_id, []):
+            if not future.done():
+                future.set_result(self.execution_results[parent_id])
 
     def pop_result(self, parent_id: int, remove_message: AgentMessage):
         if not parent_id in self.execution_results:
             return
 
-        self.execution_results[parent_id].remove(remove_message)
+        self._own_result(parent_id).remove(remove_message)
+        self._result_index.pop(parent_id, None)
 
     def get_result_failure(self, parent_id: int) -> AgentMessage | None:
         if not parent_id in self.execution_results:
@@ -122,61 +405,309 @@ def evaluate_plan(history: List[AgentMessage]) -> float:
     return score
 
 
+class CompiledGoals:
+    """
+        goal 목록을 정수 배열로 한 번만 변환해 두고, 여러 rollout을 NumPy로 한꺼번에 시뮬레이션/채점한다.
+
+        - id_col / parent_col: goal의 id와 dag를 "실행된 id" 행렬의 열 번호로 바꾼 값
+          (dag가 없거나 history에서 이미 실행된 id면 항상 True인 열, 알 수 없는 id면 항상 False인 열)
+        - receiver_mask: receiver마다 한 비트를 쓰는 bitmask (서로 다른 receiver는 63개까지 구분)
+        - stop_code: 1 = SUCCESS, 2 = FAIL, 0 = 그 외
+    """
+
+    def __init__(self, goals: List[AgentMessage], history: List[AgentMessage]):
+        self.goals = goals
+        self.size = len(goals)
+
+        history_ids = {msg.id for msg in history if msg.id is not None}
+        id_codes = {goal_id: code for code, goal_id in enumerate(sorted({g.id for g in goals if g.id is not None}))}
+        self.always_done = len(id_codes)
+        self.never_done = len(id_codes) + 1
+        self.scratch = len(id_codes) + 2
+        self.id_columns = len(id_codes) + 3
+
+        self.id_col = np.array([id_codes.get(g.id, self.scratch) for g in goals], dtype=np.int64)
+        self.parent_col = np.array(
+            [
+                self.always_done if g.dag in (-1, None) or g.dag in history_ids
+                else id_codes.get(g.dag, self.never_done)
+                for g in goals
+            ],
+            dtype=np.int64,
+        )
+
+        receivers = {g.receiver for g in goals} | {msg.receiver for msg in history}
+        receiver_codes = {receiver: code % 63 for code, receiver in enumerate(sorted(receivers))}
+        self.receiver_mask = np.array([1 << receiver_codes[g.receiver] for g in goals], dtype=np.int64)
+        self.stop_code = np.array(
+            [1 if g.stop_reason == SUCCESS else 2 if g.stop_reason == FAIL else 0 for g in goals], dtype=np.int8
+        )
+        self.is_user = np.array([g.receiver == "user" for g in goals], dtype=bool)
+
+        # greedy 정책: 실행 가능한 goal 중 id가 가장 작은 것 (동률이면 앞에 있는 것)
+        order = sorted(range(self.size), key=lambda idx: (goals[idx].id if goals[idx].id is not None else 10**9, idx))
+        self.rank = np.empty(self.size, dtype=np.int64)
+        self.rank[order] = np.arange(self.size)
+
+        self.history_length = len(history)
+        self.history_success = sum(1 for msg in history if msg.stop_reason == SUCCESS)
+        self.history_fail = sum(1 for msg in history if msg.stop_reason == FAIL)
+        self.history_mask = 0
+        for msg in history:
+            self.history_mask |= 1 << receiver_codes[msg.receiver]
+        self.history_last_user = bool(history) and history[-1].receiver == "user"
+
+    def initial_done(self, executed: List[int]) -> np.ndarray:
+        done = np.zeros(self.id_columns, dtype=bool)
+        done[self.always_done] = True
+        done[self.id_col[executed]] = True
+        return done
+
+    def ready(self, executed: np.ndarray, done: np.ndarray) -> np.ndarray:
+        """executed / done이 (B, n) / (B, id_columns)일 때 실행 가능한 goal mask (B, n)"""
+        return ~executed & done[:, self.parent_col]
+
+    def rollout(
+        self,
+        executed: List[int],
+        batch: int,
+        epsilon: float,
+        rng: np.random.Generator,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        executed 이후를 batch개의 epsilon-greedy rollout으로 한꺼번에 진행합니다.
+        반환값은 실행 순서 (B, n, 남는 칸은 -1)와 rollout마다 실행된 goal 수 (B,)입니다.
+        """
+        rows = np.arange(batch)
+        done_mask = np.zeros((batch, self.size), dtype=bool)
+        done_mask[:, executed] = True
+        done = np.tile(self.initial_done(executed), (batch, 1))
+        orders = np.full((batch, self.size), -1, dtype=np.int64)
+        lengths = np.zeros(batch, dtype=np.int64)
+        sentinel = self.size
+
+        for _ in range(self.size - len(executed)):
+            ready = self.ready(done_mask, done)
+            active = ready.any(axis=1)
+            if not active.any():
+                break
+
+            greedy = np.where(ready, self.rank, sentinel).argmin(axis=1)
+            explore = np.where(ready, rng.random((batch, self.size)), -1.0).argmax(axis=1)
+            chosen = np.where(rng.random(batch) < epsilon, explore, greedy)
+
+            live = rows[active]
+            picked = chosen[active]
+            done_mask[live, picked] = True
+            done[live, self.id_col[picked]] = True
+            orders[live, lengths[live]] = picked
+            lengths[live] += 1
+
+        return orders, lengths
+
+    def score(self, executed: np.ndarray, last: np.ndarray) -> np.ndarray:
+        """
+        evaluate_plan(history + 실행된 goal)을 rollout마다 계산합니다.
+        executed는 (B, n) mask, last는 마지막으로 실행된 goal index (없으면 -1) 입니다.
+        """
+        count = executed.sum(axis=1)
+        total = self.history_length + count
+        success = self.history_success + (executed & (self.stop_code == 1)).sum(axis=1)
+        fail = self.history_fail + (executed & (self.stop_code == 2)).sum(axis=1)
+
+        masks = np.bitwise_or.reduce(np.where(executed, self.receiver_mask, 0), axis=1) | self.history_mask
+        tool_usage = np.unpackbits(masks.astype(np.int64).view(np.uint8).reshape(-1, 8), axis=1).sum(axis=1)
+
+        last_user = np.where(last >= 0, self.is_user[np.maximum(last, 0)], self.history_last_user)
+
+        scores = -0.2 * total + success * 1.0 - fail * 2.0 + last_user * 3.0 + tool_usage * 0.5
+        return np.where(total > 0, scores, 0.0)
+
+
+class MCTSNode:
+    """실행된 goal 집합 하나에 대응하는 탐색 트리 노드"""
+
+    __slots__ = ("visits", "value", "children")
+
+    def __init__(self):
+        self.visits = 0
+        self.value = 0.0
+        # 이 노드에서 실행할 수 있는 goal을 하나 더 실행한 자식 key 목록 (아직 방문 전이면 None)
+        self.children: List[frozenset] | None = None
+
+    def mean(self) -> float:
+        return self.value / self.visits if self.visits else 0.0
+
+
 class MCTSPlanner:
-    def __init__(self, root_state: PlanningState, initial_epsilon: float = 0.3, min_epsilon: float = 0.05):
+    """
+        UCT 기반 MCTS 플래너
+
+        - 노드는 root 이후 실행된 goal 집합(frozenset)으로 식별한다. 순서만 다른 경로는 같은 노드를 공유한다.
+        - 트리는 PlanningState.search_trees에 goal 구성별로 보관되어, 같은 세션에서 같은 문제를 다시
+          풀 때 이전 통계를 이어서 사용한다.
+        - max_iter 또는 time_budget(초) 중 먼저 도달한 쪽에서 탐색을 멈춘다.
+          root에서 가능한 모든 경로를 끝까지 확장했다면 그 전에 멈춘다.
+    """
+
+    def __init__(
+        self,
+        root_state: PlanningState,
+        initial_epsilon: float = 0.3,
+        min_epsilon: float = 0.05,
+        exploration: float = MCTS_EXPLORATION,
+        rollout_batch: int = MCTS_ROLLOUT_BATCH,
+        seed: int | None = None,
+    ):
         self.root = root_state
         self.initial_epsilon = initial_epsilon
         self.min_epsilon = min_epsilon
-
-    def run(self, max_iter: int = 100) -> List[AgentMessage]:
-        best_plan: List[AgentMessage] = []
+        self.exploration = exploration
+        self.rollout_batch = rollout_batch
+        self.rng = np.random.default_rng(seed)
+        self._score_range = [float("inf"), float("-inf")]
+
+    def run(self, max_iter: int | None = 100, time_budget: float | None = None) -> List[AgentMessage]:
+        if max_iter is None and time_budget is None:
+            raise ValueError("max_iter 또는 time_budget 중 하나는 지정해야 합니다.")
+
+        goals = list(self.root.remaining_goals)
+        compiled = CompiledGoals(goals, self.root.history)
+        tree = self._search_tree(goals)
+        # rollout 한 번의 비용은 batch * n^2 에 비례하므로 goal이 많으면 batch를 줄인다
+        batch = max(1, min(self.rollout_batch, MCTS_ROLLOUT_CELLS // max(compiled.size ** 2, 1)))
+        best_order: List[int] = []
         best_score = float("-inf")
 
-        for i in range(max_iter):
-            epsilon = max(self.min_epsilon, self.initial_epsilon * (1 - i / max_iter))
-            state = self.root.clone()
-            score = self.simulate(state, epsilon)
-            if score > best_score:
-                best_score = score
-                best_plan = deepcopy(state.history)
+        # 이번 run에서 끝까지(terminal) 평가를 마친 노드 (이 아래로는 더 탐색할 것이 없다)
+        complete: Set[frozenset] = set()
+        started = time.perf_counter()
+        i = 0
+        while (max_iter is None or i < max_iter) and frozenset() not in complete:
+            elapsed = time.perf_counter() - started
+            if time_budget is not None and elapsed >= time_budget:
+                break
+
+            progress = i / max_iter if max_iter else elapsed / time_budget
+            epsilon = max(self.min_epsilon, self.initial_epsilon * (1 - progress))
+
+            path, executed, keys = self._select_and_expand(compiled, tree, epsilon, complete)
+            orders, lengths = compiled.rollout(executed, batch, epsilon, self.rng)
+
+            executed_mask = np.zeros((batch, compiled.size), dtype=bool)
+            executed_mask[:, executed] = True
+            rows, cols = np.nonzero(orders >= 0)
+            executed_mask[rows, orders[rows, cols]] = True
+            path_last = executed[-1] if executed else -1
+            last = np.where(lengths > 0, orders[np.arange(batch), np.maximum(lengths - 1, 0)], path_last)
+            scores = compiled.score(executed_mask, last)
+
+            self._backpropagate(path, float(scores.mean()), float(scores.min()), float(scores.max()))
+            self._mark_complete(tree, keys, complete)
+            best_row = int(scores.argmax())
+            if scores[best_row] > best_score:
+                best_score = float(scores[best_row])
+                best_order = executed + orders[best_row, : lengths[best_row]].tolist()
+            i += 1
 
         # planner 결과를 현재 상태에 반영
-        self.root.history = deepcopy(best_plan)
+        best_plan = self.root.history + [goals[idx] for idx in best_order]
         planned_ids = {msg.id for msg in best_plan if msg.id is not None}
-        self.root.remaining_goals = [
-            goal for goal in self.root.remaining_goals if goal.id not in planned_ids
-        ]
+        self.root.init_args(
+            history=list(best_plan),
+            remaining_goals=[goal for goal in self.root.remaining_goals if goal.id not in planned_ids],
+        )
 
         return best_plan
 
-    def _ready_goal_indexes(self, state: PlanningState, executed_ids: set[int]) -> List[int]:
-        ready_indexes: List[int] = []
-        for idx, goal in enumerate(state.remaining_goals):
-            if goal.dag in (-1, None) or goal.dag in executed_ids:
-                ready_indexes.append(idx)
-        return ready_indexes
-
-    def simulate(self, state: PlanningState, epsilon: float) -> float:
-        executed_ids = {msg.id for msg in state.history if msg.id is not None}
+    def _search_tree(self, goals: List[AgentMessage]) -> Dict[frozenset, MCTSNode]:
+        """
+        root의 goal 구성과 history 요약이 같으면 이전 run의 트리를 재사용합니다.
+        점수(evaluate_plan)에 영향을 주는 필드만 signature에 포함합니다.
+        """
+        history = self.root.history
+        signature = (
+            tuple((goal.id, goal.dag, goal.receiver, goal.stop_reason) for goal in goals),
+            len(history),
+            sum(1 for step in history if step.stop_reason == SUCCESS),
+            sum(1 for step in history if step.stop_reason == FAIL),
+            frozenset(step.receiver for step in history),
+        )
 
-        while state.remaining_goals:
-            ready_indexes = self._ready_goal_indexes(state, executed_ids)
-            if not ready_indexes:
-                break
+        trees = self.root.search_trees
+        if signature not in trees:
+            trees[signature] = {}
+            while len(trees) > MCTS_MAX_TREES:
+                trees.popitem(last=False)
+        trees.move_to_end(signature)
+        return trees[signature]
 
-            if random.random() < epsilon:
-                chosen_idx = random.choice(ready_indexes)
+    def _select_and_expand(
+        self,
+        compiled: CompiledGoals,
+        tree: Dict[frozenset, MCTSNode],
+        epsilon: float,
+        complete: Set[frozenset],
+    ) -> Tuple[List[MCTSNode], List[int], List[frozenset]]:
+        key: frozenset = frozenset()
+        node = tree.setdefault(key, MCTSNode())
+        path = [node]
+        keys = [key]
+        executed: List[int] = []
+        done_mask = np.zeros((1, compiled.size), dtype=bool)
+        done = compiled.initial_done([])[None, :]
+
+        while True:
+            ready = np.flatnonzero(compiled.ready(done_mask, done)[0]).tolist()
+            node.children = [key | {idx} for idx in ready]
+            if not ready:
+                return path, executed, keys
+
+            untried = [idx for idx in ready if key | {idx} not in tree]
+            if untried:
+                chosen = self._default_choice(untried, compiled, epsilon)
             else:
-                chosen_idx = min(
-                    ready_indexes,
-                    key=lambda idx: state.remaining_goals[idx].id
-                    if state.remaining_goals[idx].id is not None
-                    else 10**9,
-                )
-
-            next_step = state.remaining_goals.pop(chosen_idx)
-            state.history.append(next_step)
-            if next_step.id is not None:
-                executed_ids.add(next_step.id)
-
-        return evaluate_plan(state.history)
+                # 끝까지 평가한 하위 트리는 다시 내려가지 않는다
+                open_ready = [idx for idx in ready if key | {idx} not in complete] or ready
+                chosen = max(open_ready, key=lambda idx: self._uct(node, tree[key | {idx}]))
+
+            executed.append(chosen)
+            done_mask[0, chosen] = True
+            done[0, compiled.id_col[chosen]] = True
+
+            key = key | {chosen}
+            node = tree.setdefault(key, MCTSNode())
+            path.append(node)
+            keys.append(key)
+
+            if untried:
+                # 새로 확장한 노드부터는 rollout으로 평가
+                return path, executed, keys
+
+    def _mark_complete(self, tree: Dict[frozenset, MCTSNode], keys: List[frozenset], complete: Set[frozenset]) -> None:
+        """terminal 노드와, 모든 자식이 끝까지 평가된 노드를 leaf부터 root 방향으로 표시합니다."""
+        for key in reversed(keys):
+            children = tree[key].children
+            if children is None or any(child not in complete for child in children):
+                return
+            complete.add(key)
+
+    def _default_choice(self, candidates: List[int], compiled: CompiledGoals, epsilon: float) -> int:
+        if self.rng.random() < epsilon:
+            return candidates[int(self.rng.integers(len(candidates)))]
+        return min(candidates, key=lambda idx: compiled.rank[idx])
+
+    def _uct(self, parent: MCTSNode, child: MCTSNode) -> float:
+        if child.visits == 0:
+            return float("inf")
+
+        low, high = self._score_range
+        value = (child.mean() - low) / (high - low) if high > low else 0.0
+        return value + self.exploration * math.sqrt(math.log(max(parent.visits, 1)) / child.visits)
+
+    def _backpropagate(self, path: List[MCTSNode], score: float, low: float, high: float) -> None:
+        self._score_range[0] = min(self._score_range[0], low)
+        self._score_range[1] = max(self._score_range[1], high)
+        for node in path:
+            node.visits += 1
+            node.value += score
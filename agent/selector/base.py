@@ -7,4 +7,12 @@ from scheme.a2a_message import AgentMessage
 class Agent(ABC):
     @abstractmethod
     async def on_event(self, message: AgentMessage) -> AsyncGenerator[AgentMessage]:
-        pass
\ No newline at end of file
+        pass
+
+    async def startup(self) -> None:
+        """서버 시작 시 필요한 자원을 준비합니다."""
+        pass
+
+    async def shutdown(self) -> None:
+        """서버 종료 시 자원을 정리합니다."""
+        pass
@@ -1,14 +1,18 @@
 from collections.abc import AsyncGenerator
 from copy import deepcopy
+import hashlib
 import json
 import os
 from typing import List
+from agent.fast_router import FastToolRouter
 from agent.selector.base import Agent
 from models.model import Model
+from plugin.catalog import ToolCatalog
 from plugin.manager import PluginManager
 from scheme.a2a_message import AgentMessage
 from scheme.mcp import MCPRequest, MCPRequestMessage
-from utils.constant import FAIL, SUCCESS
+from utils.cache import TTLCache
+from utils.constant import FAIL, SUCCESS, TOOL_CACHE_MAX_ENTRIES, TOOL_CACHE_TTL
 from utils.env import load_dotenv
 from utils.logging import setup_logger
 from utils.util import merge_metadata_only
@@ -79,17 +83,52 @@ The metadata field is only for parameters, not full structure.
 The "content" field must be previous request
 The "metadata" field must be a valid JSON object (not a string) if a tool is selected.
         """
-        self.model = Model(local_dir)
+        self.model = Model(local_dir, prefix_cache_dir=os.getenv("PREFIX_CACHE_DIR"))
+        # (query, metadata, 도구 목록/설명 fingerprint) -> 도구 선택 결과
+        self.selection_cache: TTLCache[tuple, List[MCPRequest]] = TTLCache(
+            max_entries=TOOL_CACHE_MAX_ENTRIES, ttl=TOOL_CACHE_TTL
+        )
+        self.fast_router: FastToolRouter | None = None
+        # 마지막으로 사용한 catalog와 그 catalog로 만든 system prompt / fingerprint
+        self._catalog: ToolCatalog | None = None
+        self._system_prompt = ""
+        self._fingerprint = ""
+
+    def cache_stats(self) -> dict:
+        return self.selection_cache.stats()
+
+    async def shutdown(self) -> None:
+        self.model.close()
+
+    def _prepare(self) -> ToolCatalog:
+        """
+        catalog가 바뀐 경우에만 system prompt, fingerprint, 빠른 선택 색인을 다시 만든다.
+        """
+        catalog = self.plugin_manager.tool_catalog()
+        if catalog is not self._catalog:
+            system_prompt = self.system_prompt_template.format(tools_list=catalog.tools_list, mapped=catalog.tools_info)
+            # 도구 목록이나 설명이 바뀌면 system prompt가 달라지므로 캐시가 자연히 무효화된다
+            fingerprint = hashlib.sha256(f"{catalog.version}\n{system_prompt}".encode("utf-8")).hexdigest()
+            if fingerprint != self._fingerprint:
+                print(system_prompt)
+                self.fast_router = FastToolRouter(catalog.profiles)
+                self._system_prompt = system_prompt
+                self._fingerprint = fingerprint
+            self._catalog = catalog
+        return catalog
+
+    @staticmethod
+    def _canonical_metadata(metadata) -> str:
+        if isinstance(metadata, dict):
+            metadata = {k: v for k, v in metadata.items() if k != "content"}
+        return json.dumps(metadata, sort_keys=True, ensure_ascii=False, default=str)
 
     async def on_event(self, message: AgentMessage) -> AsyncGenerator[AgentMessage]:
         try:        
-            tools = self.plugin_manager.list_registry()
-            
-            tools_list = "\n".join([f'- "{tool}"' for tool in tools])
-            
-            tools_info = self.plugin_manager.pair_registry_execute_info()
-            system_prompt =  self.system_prompt_template.format(tools_list=tools_list, mapped="".join(tools_info))
-            print(system_prompt)
+            catalog = self._prepare()
+            system_prompt = self._system_prompt
+            fingerprint = self._fingerprint
+            fast_router = self.fast_router
             
             for payload in message.payload:
                 content_data = payload.content
@@ -105,6 +144,7 @@ The "metadata" field must be a valid JSON object (not a string) if a tool is sel
                         continue
                     
                     request = query.content 
+                    cache_key = (query.content, self._canonical_metadata(query.metadata), fingerprint)
 
                     metadata = deepcopy(query.metadata)
                     if isinstance(metadata, list):
@@ -124,15 +164,24 @@ The "metadata" field must be a valid JSON object (not a string) if a tool is sel
 
                     print("=========Tool Selector Query Result ==============")
                     print(request)
-                    # 🔥 LLM 호출
-                    final_response = []
-                    for _ in range(3):
-                        llm_response = await self.model.ask(system_prompt, request)
-                        
-                        if len(llm_response) > 0:
-                            final_response.extend(llm_response)
-                            break
-                    
+                    # 확신할 수 있는 요청은 LLM 없이 바로 도구를 고른다
+                    llm_response = fast_router.select(query.content, query.metadata)
+                    if llm_response is None:
+                        llm_response = self.selection_cache.get(cache_key)
+                    if llm_response is None:
+                        # 🔥 LLM 호출
+                        final_response = []
+                        for _ in range(3):
+                            llm_response = await self.model.ask(system_prompt, request, cache_version=catalog.version)
+                            
+                            if len(llm_response) > 0:
+                                final_response.extend(llm_response)
+                                break
+
+                        if llm_response and all(response.selected_tool for response in llm_response):
+                            self.selection_cache.set(cache_key, llm_response)
+
+                    llm_response = [response.model_copy(deep=True) for response in llm_response]
                     print(llm_response)
                     
                     print("===================================================")
@@ -1,73 +1,94 @@
 import asyncio
-from copy import deepcopy
+from contextlib import asynccontextmanager
 import random
 from typing import List
-from fastapi import FastAPI, WebSocket
+import uuid
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.encoders import jsonable_encoder
 from fastapi.responses import FileResponse
 
 from pydantic import BaseModel
 import json
+import os
 from plugin.manager import PluginManager
 from router import Router
 from scheme.a2a_message import AgentMessage
+from utils.constant import PLUGIN_WATCH_INTERVAL
+from utils.ws_sender import WebSocketSender
 from fastapi.staticfiles import StaticFiles
 
-app = FastAPI()
-
 plugin_manager = PluginManager()
 router = Router(plugin_manager)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await router.startup()
+    # plugins 디렉터리 변경을 감시해 서버 재시작 없이 플러그인을 다시 불러온다 (0이면 끔)
+    watch_interval = float(os.getenv("PLUGIN_WATCH_INTERVAL", PLUGIN_WATCH_INTERVAL))
+    watcher = asyncio.create_task(plugin_manager.watch(watch_interval)) if watch_interval > 0 else None
+    yield
+    if watcher is not None:
+        watcher.cancel()
+    await router.shutdown()
+
+app = FastAPI(lifespan=lifespan)
+
 class UserRequest(BaseModel):
     content: str
 
-CACHED_DATA: List[str] = []
-async def send_response(websocket: WebSocket, agent_message: AgentMessage):
-    message = agent_message.payload
-    for request in message:
-        cached_response = request.model_dump()
+async def send_response(sender: WebSocketSender, agent_message: AgentMessage):
+    for request in agent_message.payload:
+        payload = request.model_dump()
         result = {
-            f"{agent_message.sender}": cached_response
+            f"{agent_message.sender}": payload
         }
-        
-        if cached_response in CACHED_DATA:
-            return
-
-        await websocket.send_text(json.dumps(result))
-        await asyncio.sleep(0.3)
 
-        CACHED_DATA.append(cached_response)
+        # 같은 요청 안에서 이미 보낸 내용은 다시 보내지 않는다
+        await sender.send(result, dedup_key=payload)
 
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     await websocket.accept()
 
-    id = 0
-    while True:
-        try:
-            # 사용자의 요청 받기 (JSON 형태)
-            CACHED_DATA = []
-            data = await websocket.receive_text()
-            user_request = json.loads(data)
-            user_dict = {"content": user_request["content"], "metadata": {}}
-            # Router의 Generator 시작
-            async for agent_message in router.on_event(user_dict, str(id)):
-                try:
-                    # AgentMessage 객체를 직접 전달
-                    await send_response(websocket, deepcopy(agent_message))
-                except Exception as e:
-                    print(f"send_response 또는 sleep 중 오류 발생: {e}")
-                    # 한 메시지가 실패할 경우 클라이언트에 오류를 보내거나,
-                    # 그냥 로그를 남기고 다음 메시지로 계속 진행하는 것을 고려
-                    await websocket.send_text(json.dumps({"error": f"서버 메시지 처리 실패: {str(e)}"}))
-                    continue
-            
-        except Exception as e:
-            await websocket.send_text(json.dumps({"error": str(e)}))
-            # await websocket.close()
-        
+    # 연결 하나가 하나의 세션, 연결이 끊기면 세션 상태도 정리한다
+    session_id = uuid.uuid4().hex
+    sender = WebSocketSender(websocket)
+    sender.start()
+    try:
+        while True:
+            try:
+                # 사용자의 요청 받기 (JSON 형태)
+                data = await websocket.receive_text()
+                sender.reset_dedup()
+                user_request = json.loads(data)
+                user_dict = {"content": user_request["content"], "metadata": {}}
+                # Router의 Generator 시작
+                async for agent_message in router.on_event(user_dict, session_id):
+                    try:
+                        await send_response(sender, agent_message)
+                    except WebSocketDisconnect:
+                        raise
+                    except Exception as e:
+                        print(f"send_response 중 오류 발생: {e}")
+                        # 한 메시지가 실패할 경우 클라이언트에 오류를 보내거나,
+                        # 그냥 로그를 남기고 다음 메시지로 계속 진행하는 것을 고려
+                        await sender.send({"error": f"서버 메시지 처리 실패: {str(e)}"})
+                        continue
 
-        id += 1
+            except WebSocketDisconnect:
+                raise
+            except Exception as e:
+                await sender.send({"error": str(e)})
+                # await websocket.close()
+    except WebSocketDisconnect:
+        print(f"[ws] 연결 종료: {session_id}")
+    except Exception as e:
+        # 전송 중 연결이 끊긴 경우
+        print(f"[ws] 연결 오류로 종료: {session_id} {e}")
+    finally:
+        await sender.close()
+        await router.close_session(session_id)
         
 
 @app.get("/")
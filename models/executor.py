@@ -0,0 +1,79 @@
+import asyncio
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+from utils.logging import setup_logger
+
+R = TypeVar("R")
+
+
+class InferenceExecutor:
+    """
+        로컬 모델 추론을 이벤트 루프 밖의 전용 워커 스레드에서 실행하는 실행기
+
+        - replica 수만큼 모델 인스턴스를 만들고 워커 하나가 replica 하나를 점유한다.
+        - 처리 중이거나 대기 중인 요청이 max_pending을 넘으면 즉시 거절한다. (backpressure)
+        - 요청마다 timeout을 적용하며, 아직 시작하지 않은 요청은 취소된다.
+          이미 실행 중인 요청은 끝날 때까지 pending에 포함된다. (워커를 실제로 점유하고 있으므로)
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], Any],
+        replicas: int = 1,
+        max_pending: int = 16,
+        timeout: float | None = 120.0,
+    ):
+        if replicas < 1:
+            raise ValueError("replicas는 1 이상이어야 합니다.")
+
+        self.logger = setup_logger("InferenceExecutor")
+        self.replicas = replicas
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._idle: queue.SimpleQueue = queue.SimpleQueue()
+        for _ in range(replicas):
+            self._idle.put(factory())
+
+        self._pool = ThreadPoolExecutor(max_workers=replicas, thread_name_prefix="inference")
+        self._pending = 0
+        # 워커 스레드의 완료 callback에서도 감소하므로 lock으로 보호
+        self._pending_lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    async def submit(self, fn: Callable[..., R], *args: Any, timeout: float | None = None) -> R:
+        """
+        fn(replica, *args)를 워커 스레드에서 실행하고 결과를 반환합니다.
+        """
+        if self._pending >= self.max_pending:
+            raise RuntimeError(f"추론 대기열이 가득 찼습니다. (pending={self._pending})")
+
+        with self._pending_lock:
+            self._pending += 1
+        job = self._pool.submit(self._run_on_replica, fn, args)
+        # 슬롯은 timeout 시점이 아니라 작업이 실제로 끝나거나 취소될 때 반납한다
+        job.add_done_callback(self._release)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(job), timeout=timeout or self.timeout)
+        except asyncio.TimeoutError:
+            self.logger.error(f"추론 요청이 {timeout or self.timeout}초 안에 끝나지 않았습니다.")
+            raise TimeoutError("추론 요청 시간이 초과되었습니다.")
+
+    def _release(self, _) -> None:
+        with self._pending_lock:
+            self._pending -= 1
+
+    def _run_on_replica(self, fn: Callable[..., R], args: tuple) -> R:
+        replica = self._idle.get()
+        try:
+            return fn(replica, *args)
+        finally:
+            self._idle.put(replica)
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._pool.shutdown(wait=wait, cancel_futures=True)
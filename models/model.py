@@ -1,44 +1,314 @@
-from typing import Any, List
+import asyncio
+import json
+import threading
+from typing import Any, AsyncGenerator, Callable, Dict, List, Set, Tuple
 import aiohttp
 from scheme.a2a_message import AgentMessage
 from scheme.mcp import MCPRequest
 from llama_cpp import Llama
-from utils.util import convert_to_agent_message_api, convert_to_agent_message_local
+from models.executor import InferenceExecutor
+from models.prefix_cache import PrefixCache
+from utils.constant import (
+    API_CONNECTION_LIMIT,
+    API_TIMEOUT,
+    BATCH_MAX_SIZE,
+    BATCH_WINDOW,
+    INFERENCE_MAX_PENDING,
+    INFERENCE_REPLICAS,
+    INFERENCE_TIMEOUT,
+)
+from utils.util import convert_to_agent_message_api, convert_to_agent_message_local, stream_agent_messages
+
+
+class PromptBatcher:
+    """
+        같은 system prompt(prefix)를 쓰는 동시 요청을 짧은 시간(window) 동안 모아 함께 실행하는 배치 레이어
+
+        - 모은 prompt는 replica 수만큼 나눠, 나눈 묶음 하나를 추론 작업 하나로 제출한다.
+          작업은 prefix 상태를 한 번 찾아 둔 뒤 묶음 안의 prompt를 차례로 생성한다. (runner)
+        - 결과는 prompt마다 끝나는 즉시 돌려주며, 한 prompt의 실패는 같은 묶음의 다른 prompt에 영향을 주지 않는다.
+        - timeout은 묶음의 prompt 수에 비례해 적용한다. (prompt 하나당 executor.timeout)
+    """
+
+    def __init__(
+        self,
+        executor: InferenceExecutor,
+        runner: Callable[[Any, str, str, List[str], Callable[[int, Any, Exception | None], None]], None],
+        window: float = BATCH_WINDOW,
+        max_batch: int = BATCH_MAX_SIZE,
+    ):
+        self.executor = executor
+        self.runner = runner
+        self.window = window
+        self.max_batch = max_batch
+        self._batches: Dict[str, List[Tuple[str, asyncio.Future]]] = {}
+        # 실행 중인 작업 참조 (GC로 task가 사라지지 않도록 보관)
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def submit(self, key: str, prefix: str, prompt: str) -> Any:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        batch = self._batches.get(key)
+        if batch is None:
+            batch = self._batches[key] = []
+            loop.call_later(self.window, self._flush, key, prefix, batch)
+
+        batch.append((prompt, future))
+        if len(batch) >= self.max_batch:
+            self._flush(key, prefix, batch)
+
+        return await future
+
+    def _flush(self, key: str, prefix: str, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        # window 만료 전에 max_batch로 이미 실행된 배치라면 무시
+        if self._batches.get(key) is not batch:
+            return
+
+        del self._batches[key]
+        # 놀고 있는 replica가 함께 처리하도록 replica 수만큼 나눈다
+        count = min(self.executor.replicas, len(batch))
+        for chunk in (batch[i::count] for i in range(count)):
+            task = asyncio.create_task(self._run(key, prefix, chunk))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, key: str, prefix: str, chunk: List[Tuple[str, asyncio.Future]]) -> None:
+        loop = asyncio.get_running_loop()
+        futures = [future for _, future in chunk]
+
+        def resolve(index: int, output: Any, error: Exception | None) -> None:
+            future = futures[index]
+            if future.done():
+                return
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(output)
+
+        def deliver(index: int, output: Any, error: Exception | None = None) -> None:
+            # 워커 스레드에서 호출되므로 결과는 이벤트 루프에서 반영한다
+            loop.call_soon_threadsafe(resolve, index, output, error)
+
+        timeout = self.executor.timeout * len(chunk) if self.executor.timeout else None
+        try:
+            await self.executor.submit(self.runner, key, prefix, [prompt for prompt, _ in chunk], deliver, timeout=timeout)
+        except Exception as e:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
 
 # now use tiny model but when evaluating this systems then use large model 
 # to use image -etc..
 class Model:
-    def __init__(self, model = "", prompt = ""):
-        self.model = Llama(model_path=model, n_ctx=2048, n_threads=8, prompt=prompt)
+    def __init__(
+        self,
+        model = "",
+        prompt = "",
+        replicas: int = INFERENCE_REPLICAS,
+        max_pending: int = INFERENCE_MAX_PENDING,
+        timeout: float = INFERENCE_TIMEOUT,
+        prefix_cache_dir: str | None = None,
+        n_ctx: int = 2048,
+    ):
+        # llama.cpp 호출은 동기 함수이므로 이벤트 루프를 막지 않도록 전용 워커에서 실행
+        self.executor = InferenceExecutor(
+            lambda: Llama(model_path=model, n_ctx=n_ctx, n_threads=8, prompt=prompt),
+            replicas=replicas,
+            max_pending=max_pending,
+            timeout=timeout,
+        )
+        # 다른 모델(또는 n_ctx)로 만든 KV 상태를 불러오지 않도록 모델별 디렉터리를 쓴다
+        if prefix_cache_dir:
+            prefix_cache_dir = PrefixCache.model_dir(prefix_cache_dir, model, n_ctx)
+        self.prefix_cache = PrefixCache(cache_dir=prefix_cache_dir)
+        # 여러 replica가 같은 prefix를 동시에 평가하지 않도록 key별 lock을 둔다
+        self._prefix_locks: Dict[str, threading.Lock] = {}
+        self._prefix_locks_guard = threading.Lock()
+        self.batcher = PromptBatcher(self.executor, self._complete_batch)
     
-    async def ask(self, prompt: str = "", request: str = "") -> List[MCPRequest[Any]]:
-        full_prompt = f"""[INST] <<SYS>>
+    async def ask(self, prompt: str = "", request: str = "", cache_version: str = "") -> List[MCPRequest[Any]]:
+        prefix, full_prompt = Model._build_prompt(prompt, request)
+
+        key = PrefixCache.key(prefix, cache_version)
+        response = await self.batcher.submit(key, prefix, full_prompt)
+        
+        response = [ret["text"].rstrip() for ret in response["choices"]]
+        return convert_to_agent_message_local(response)
+
+    async def stream(self, prompt: str = "", request: str = "", cache_version: str = "") -> AsyncGenerator[str, None]:
+        """
+        생성되는 token(text 조각)을 바로바로 내보냅니다.
+        워커 스레드에서 stream=True로 생성하고 조각마다 이벤트 루프의 queue로 넘긴다.
+        소비하는 쪽이 중간에 멈추면 워커도 다음 조각에서 생성을 중단한다.
+        """
+        prefix, full_prompt = Model._build_prompt(prompt, request)
+        key = PrefixCache.key(prefix, cache_version)
+
+        loop = asyncio.get_running_loop()
+        chunks: asyncio.Queue = asyncio.Queue()
+        stop = threading.Event()
+        done = object()
+
+        def emit(text) -> None:
+            loop.call_soon_threadsafe(chunks.put_nowait, text)
+
+        task = asyncio.ensure_future(self.executor.submit(self._stream_completion, key, prefix, full_prompt, emit, stop))
+        task.add_done_callback(lambda _: chunks.put_nowait(done))
+
+        try:
+            while True:
+                text = await chunks.get()
+                if text is done:
+                    break
+                yield text
+            # 워커에서 난 예외(timeout 포함)를 그대로 전달
+            await task
+        finally:
+            stop.set()
+            if not task.done():
+                task.cancel()
+
+    @staticmethod
+    def _build_prompt(prompt: str, request: str) -> Tuple[str, str]:
+        prefix = f"""[INST] <<SYS>>
             {prompt}
             <</SYS>>
-
+"""
+        full_prompt = f"""{prefix}
             {request}
             [/INST]
         """
+        return prefix, full_prompt
+
+    def _prefix_state(self, model: Llama, key: str, prefix: str) -> Any:
+        """공통 prefix의 KV cache 상태를 캐시에서 가져오거나, 없으면 한 번만 평가해 저장합니다."""
+        prefix_state = self.prefix_cache.get(key)
+        if prefix_state is None:
+            with self._prefix_locks_guard:
+                lock = self._prefix_locks.setdefault(key, threading.Lock())
+            with lock:
+                # 기다리는 동안 다른 replica가 평가를 마쳤을 수 있다
+                prefix_state = self.prefix_cache.get(key)
+                if prefix_state is None:
+                    model.reset()
+                    model.eval(model.tokenize(prefix.encode("utf-8")))
+                    prefix_state = model.save_state()
+                    self.prefix_cache.put(key, prefix_state)
+            with self._prefix_locks_guard:
+                self._prefix_locks.pop(key, None)
+        return prefix_state
+
+    def _load_prefix(self, model: Llama, key: str, prefix: str) -> None:
+        model.load_state(self._prefix_state(model, key, prefix))
 
-        response = self.model(
+    def _complete_batch(
+        self,
+        model: Llama,
+        key: str,
+        prefix: str,
+        prompts: List[str],
+        deliver: Callable[[int, Any, Exception | None], None],
+    ) -> None:
+        """
+        prefix 상태를 한 번 찾아 둔 뒤 prompt마다 그 상태를 복원하고 나머지(suffix)만 생성합니다.
+        결과는 prompt가 끝날 때마다 deliver로 넘깁니다.
+        """
+        prefix_state = self._prefix_state(model, key, prefix)
+        for index, full_prompt in enumerate(prompts):
+            try:
+                model.load_state(prefix_state)
+                deliver(index, Model._complete(model, full_prompt), None)
+            except Exception as e:
+                deliver(index, None, e)
+
+    def _stream_completion(
+        self,
+        model: Llama,
+        key: str,
+        prefix: str,
+        full_prompt: str,
+        emit: Callable[[str], None],
+        stop: threading.Event,
+    ) -> None:
+        self._load_prefix(model, key, prefix)
+        for chunk in Model._complete(model, full_prompt, stream=True):
+            if stop.is_set():
+                break
+            text = chunk["choices"][0]["text"]
+            if text:
+                emit(text)
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=False)
+
+    @staticmethod
+    def _complete(model: Llama, full_prompt: str, stream: bool = False) -> Any:
+        return model(
             full_prompt,
             max_tokens=1024,
             temperature=0.7,
             top_p=0.95,
             repeat_penalty=1.1,
-            stop=["</s>", "[INST]"]
+            stop=["</s>", "[INST]"],
+            stream=stream,
         )
-        
-        response = [ret["text"].rstrip() for ret in response["choices"]]
-        return convert_to_agent_message_local(response)
     
 
 class ApiModel:
-    def __init__(self, provider: str="gemini", api_key: str="", model_name: str=""): 
+    def __init__(
+        self,
+        provider: str="gemini",
+        api_key: str="",
+        model_name: str="",
+        base_url: str = "https://generativelanguage.googleapis.com/v1beta",
+        connection_limit: int = API_CONNECTION_LIMIT,
+        timeout: float = API_TIMEOUT,
+    ): 
         self.provider = provider
         self.api_key = api_key
         self.model_name = model_name
-        self.endpoint = f"https://generativelanguage.googleapis.com/v1beta/models/{self.model_name}:generateContent"
+        self.endpoint = f"{base_url}/models/{self.model_name}:generateContent"
+        self.stream_endpoint = f"{base_url}/models/{self.model_name}:streamGenerateContent"
+        self.connection_limit = connection_limit
+        self.timeout = timeout
+        self._session: aiohttp.ClientSession | None = None
+        self._stats = {"requests": 0, "in_flight": 0, "connections_created": 0, "connections_reused": 0}
+
+    async def start(self) -> aiohttp.ClientSession:
+        """
+        keep-alive 연결을 재사용하도록 요청 간에 공유하는 session을 반환합니다.
+        session은 처음 사용할 때(또는 FastAPI 시작 시) 현재 이벤트 루프에서 생성됩니다.
+        """
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.connection_limit,
+                ttl_dns_cache=300,
+                keepalive_timeout=60,
+            )
+            trace = aiohttp.TraceConfig()
+            trace.on_connection_create_end.append(self._on_connection_create)
+            trace.on_connection_reuseconn.append(self._on_connection_reuse)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                trace_configs=[trace],
+            )
+        return self._session
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def pool_stats(self) -> dict:
+        return {**self._stats, "limit": self.connection_limit, "open": self._session is not None and not self._session.closed}
+
+    async def _on_connection_create(self, session, context, params) -> None:
+        self._stats["connections_created"] += 1
+
+    async def _on_connection_reuse(self, session, context, params) -> None:
+        self._stats["connections_reused"] += 1
     
     async def ask(self, prompt:str, request: str = "", request_sender="") -> List[AgentMessage]:
         headers = {
@@ -55,26 +325,73 @@ class ApiModel:
 
         res_json = {}
 
+        session = await self.start()
+        self._stats["requests"] += 1
+        self._stats["in_flight"] += 1
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(self.endpoint, headers=headers, params=params, json=body) as resp:
-                    if resp.status != 200:
-                        text = await resp.text()
-                        raise Exception(f"GeminiLite API 호출 실패: {resp.status} {text}")
-                    res_json = await resp.json()
-                    candidates = res_json["candidates"]
-                    content = []
-                    for candidate in candidates:
-                        parts = candidate.get("content", {}).get("parts", [])
-                        for part in parts:
-                            if "text" in part:
-                                content.append(part["text"])
-                    
-                    if not all(isinstance(x, str) for x in content):
-                        raise ValueError("응답 content에 문자열이 아닌 요소가 포함되어 있음")
-                     
-                    
-                    return convert_to_agent_message_api(request_sender, content)
+            async with session.post(self.endpoint, headers=headers, params=params, json=body) as resp:
+                if resp.status != 200:
+                    text = await resp.text()
+                    raise Exception(f"GeminiLite API 호출 실패: {resp.status} {text}")
+                res_json = await resp.json()
+                candidates = res_json["candidates"]
+                content = []
+                for candidate in candidates:
+                    parts = candidate.get("content", {}).get("parts", [])
+                    for part in parts:
+                        if "text" in part:
+                            content.append(part["text"])
+                
+                if not all(isinstance(x, str) for x in content):
+                    raise ValueError("응답 content에 문자열이 아닌 요소가 포함되어 있음")
+                 
+                
+                return convert_to_agent_message_api(request_sender, content)
 
         except Exception as e:
-            raise Exception(f"GeminiLite 응답 파싱 실패: {e}\n응답내용: {res_json}")
\ No newline at end of file
+            raise Exception(f"GeminiLite 응답 파싱 실패: {e}\n응답내용: {res_json}")
+        finally:
+            self._stats["in_flight"] -= 1
+
+    async def stream(self, prompt: str, request: str = "") -> AsyncGenerator[str, None]:
+        """
+        streamGenerateContent(SSE)로 생성되는 text 조각을 도착하는 대로 내보냅니다.
+        """
+        params = {
+            "key": self.api_key,
+            "alt": "sse",
+        }
+        body = {
+            "contents": [
+                {"role": "user", "parts": [{"text": f"{prompt}\n\n{request}"}]}
+            ]
+        }
+
+        session = await self.start()
+        self._stats["requests"] += 1
+        self._stats["in_flight"] += 1
+        try:
+            async with session.post(self.stream_endpoint, params=params, json=body) as resp:
+                if resp.status != 200:
+                    text = await resp.text()
+                    raise Exception(f"GeminiLite 스트리밍 호출 실패: {resp.status} {text}")
+
+                async for line in resp.content:
+                    line = line.decode("utf-8").strip()
+                    if not line.startswith("data:"):
+                        continue
+
+                    event = json.loads(line[len("data:"):])
+                    for candidate in event.get("candidates", []):
+                        for part in candidate.get("content", {}).get("parts", []):
+                            if part.get("text"):
+                                yield part["text"]
+        finally:
+            self._stats["in_flight"] -= 1
+
+    async def ask_stream(self, prompt: str, request: str = "", request_sender="") -> AsyncGenerator[AgentMessage, None]:
+        """
+        응답을 스트리밍으로 받으면서, plan의 각 step(JSON 객체)이 완성되는 즉시 AgentMessage로 내보냅니다.
+        """
+        async for message in stream_agent_messages(request_sender, self.stream(prompt, request)):
+            yield message
@@ -0,0 +1,121 @@
+import hashlib
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from typing import Any
+
+from utils.constant import PREFIX_CACHE_SIZE
+from utils.logging import setup_logger
+
+
+class PrefixCache:
+    """
+        system prompt(prefix)를 평가한 llama.cpp 상태를 보관하는 LRU 캐시
+
+        - key는 prefix와 플러그인 registry 버전의 해시
+        - cache_dir이 주어지면 상태를 디스크에도 기록하고, 재시작 시 다시 불러온다.
+          KV 상태는 만든 모델 파일과 n_ctx에서만 쓸 수 있으므로 Model은 model_dir()로 모델별 하위 디렉터리를 넘긴다.
+    """
+
+    def __init__(self, capacity: int = PREFIX_CACHE_SIZE, cache_dir: str | None = None):
+        self.logger = setup_logger("PrefixCache")
+        self.capacity = capacity
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+        self._states: OrderedDict[str, Any] = OrderedDict()
+        # 추론 워커 스레드에서 접근하므로 lock으로 보호
+        self._lock = threading.Lock()
+
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            self.warm_load()
+
+    @staticmethod
+    def key(prefix: str, version: str = "") -> str:
+        return hashlib.sha256(f"{version}\n{prefix}".encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def model_dir(cache_dir: str, model_path: str, n_ctx: int) -> str:
+        """모델 파일(경로, 크기, 수정 시각)과 n_ctx가 같을 때만 같은 값이 나오는 cache_dir 아래 하위 디렉터리"""
+        try:
+            stat = os.stat(model_path)
+            stamp = f"{stat.st_size}:{stat.st_mtime_ns}"
+        except OSError:
+            stamp = ""
+        fingerprint = hashlib.sha256(f"{os.path.abspath(model_path)}\n{stamp}\n{n_ctx}".encode("utf-8")).hexdigest()[:16]
+        return os.path.join(cache_dir, fingerprint)
+
+    def get(self, key: str) -> Any | None:
+        with self._lock:
+            if key in self._states:
+                self._states.move_to_end(key)
+                self.hits += 1
+                return self._states[key]
+
+        state = self._load(key)
+        with self._lock:
+            if state is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._insert(key, state)
+            return state
+
+    def put(self, key: str, state: Any) -> None:
+        with self._lock:
+            self._insert(key, state)
+
+        if self.cache_dir:
+            self._dump(key, state)
+
+    def warm_load(self) -> None:
+        """디스크에 저장된 상태 중 최근 것부터 capacity만큼 메모리에 올립니다."""
+        paths = sorted(
+            (os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir) if name.endswith(".state")),
+            key=os.path.getmtime,
+        )
+        for path in paths[-self.capacity:]:
+            key = os.path.basename(path)[: -len(".state")]
+            state = self._load(key)
+            if state is not None:
+                with self._lock:
+                    self._insert(key, state)
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._states
+
+    def _insert(self, key: str, state: Any) -> None:
+        self._states[key] = state
+        self._states.move_to_end(key)
+        while len(self._states) > self.capacity:
+            evicted, _ = self._states.popitem(last=False)
+            self.logger.info(f"[PrefixCache] evict '{evicted}'")
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.state")
+
+    def _load(self, key: str) -> Any | None:
+        if not self.cache_dir or not os.path.exists(self._path(key)):
+            return None
+
+        try:
+            with open(self._path(key), "rb") as f:
+                return pickle.load(f)
+        except Exception as e:
+            self.logger.error(f"[PrefixCache] '{key}' 로딩 실패: {e}", exc_info=True)
+            return None
+
+    def _dump(self, key: str, state: Any) -> None:
+        tmp_path = f"{self._path(key)}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                pickle.dump(state, f)
+            os.replace(tmp_path, self._path(key))
+        except Exception as e:
+            self.logger.error(f"[PrefixCache] '{key}' 저장 실패: {e}", exc_info=True)
@@ -2,12 +2,19 @@ from abc import ABC, abstractmethod
 from typing import Any, Dict, List
 
 from scheme.mcp import T, MCPRequest
+from utils.constant import PLUGIN_ASYNC, PLUGIN_CONCURRENCY, PLUGIN_TIMEOUT
 
 
 # will be change Dict to Request and return will be changed Response
 class BaseAgent(ABC):
     description: str = "No description available"
     version: str = "1.0"
+    # 실행 방식: "async"(이벤트 루프), "thread"(블로킹 I/O), "process"(CPU 작업)
+    execution: str = PLUGIN_ASYNC
+    # 이 플러그인을 동시에 실행할 수 있는 최대 요청 수
+    concurrency: int = PLUGIN_CONCURRENCY
+    # run() 한 번의 제한 시간(초), None이면 제한 없음
+    timeout: float | None = PLUGIN_TIMEOUT
     _execution_count: int = 0
 
     def __init__(self):
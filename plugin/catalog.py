@@ -0,0 +1,30 @@
+from typing import Any, Dict, List
+
+
+class ToolCatalog:
+    """
+        도구 선택 prompt에 들어가는 플러그인 정보 묶음
+
+        - names: 플러그인 이름 목록
+        - tools_list: prompt에 넣을 이름 목록 문자열 (미리 만들어 둔다)
+        - descriptions: "이름 - 설명" 목록 (설명이 없으면 빈 문자열)
+        - tools_info: descriptions를 이어 붙인 문자열
+        - profiles: FastToolRouter용 이름/스키마/설명 목록
+        - version: 만들 당시의 registry_version(), 값이 같으면 내용도 같다
+
+        registry가 바뀔 때만 PluginManager가 새로 만든다. 한 번 만든 catalog는 바꾸지 않는다.
+    """
+
+    def __init__(
+        self,
+        version: str,
+        names: List[str],
+        descriptions: List[str],
+        profiles: List[Dict[str, Any]],
+    ):
+        self.version = version
+        self.names = list(names)
+        self.tools_list = "\n".join([f'- "{tool}"' for tool in self.names])
+        self.descriptions = list(descriptions)
+        self.tools_info = "".join(self.descriptions)
+        self.profiles = profiles
@@ -0,0 +1,120 @@
+import asyncio
+import importlib
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, Tuple
+
+from pydantic import BaseModel
+
+from plugin.base import BaseAgent
+from scheme.mcp import MCPRequest, MCPRequestMessage
+from utils.constant import PLUGIN_ASYNC, PLUGIN_PROCESS, PLUGIN_PROCESS_WORKERS, PLUGIN_THREAD, PLUGIN_THREAD_WORKERS
+from utils.logging import setup_logger
+
+
+# 프로세스 워커마다 한 번만 만드는 플러그인 인스턴스 (class path -> (version, instance))
+_PROCESS_PLUGINS: Dict[str, Tuple[str, BaseAgent]] = {}
+
+
+def _encode(value: Any) -> Any:
+    # pydantic generic model(MCPRequest[dict] 등)은 pickle할 수 없으므로 dict로 주고받는다
+    if isinstance(value, BaseModel):
+        return ("model", value.model_dump())
+    return ("raw", value)
+
+
+def _run_in_process(cls_path: str, version: str, request: Any) -> Any:
+    cached = _PROCESS_PLUGINS.get(cls_path)
+    if cached is not None and cached[0] == version:
+        plugin = cached[1]
+    else:
+        module_path, class_name = cls_path.rsplit(".", 1)
+        module = importlib.import_module(module_path)
+        if cached is not None:
+            # 플러그인 파일이 바뀌었으므로 워커 프로세스에서도 모듈을 다시 불러온다
+            module = importlib.reload(module)
+        plugin = getattr(module, class_name)()
+        _PROCESS_PLUGINS[cls_path] = (version, plugin)
+
+    kind, data = request
+    if kind == "model":
+        request = MCPRequestMessage[Any](**data)
+    else:
+        request = data
+    return _encode(asyncio.run(plugin.run(request)))
+
+
+class PluginExecutor:
+    """
+        플러그인의 execution 값에 맞춰 run()을 실행하는 실행기
+
+        - async: 이벤트 루프에서 그대로 await 한다.
+        - thread: 워커 스레드의 별도 이벤트 루프에서 실행한다. 블로킹 호출이 다른 요청을 막지 않는다.
+          취소되면 워커 루프의 task를 취소한다. (플러그인이 await 지점에 도달해야 멈춘다)
+        - process: 워커 프로세스에서 실행한다. CPU를 오래 쓰는 플러그인용이며
+          요청/응답은 dict로 직렬화해 주고받는다. 이미 시작한 작업은 취소할 수 없다.
+    """
+
+    def __init__(self, thread_workers: int = PLUGIN_THREAD_WORKERS, process_workers: int = PLUGIN_PROCESS_WORKERS):
+        self.logger = setup_logger("PluginExecutor")
+        self.thread_workers = thread_workers
+        self.process_workers = process_workers
+        self._threads: ThreadPoolExecutor | None = None
+        self._processes: ProcessPoolExecutor | None = None
+
+    async def submit(self, plugin: BaseAgent, cls_path: str, request: Any, version: str = "") -> Any:
+        execution = getattr(plugin, "execution", PLUGIN_ASYNC)
+        if execution == PLUGIN_THREAD:
+            return await self._run_thread(plugin, request)
+        if execution == PLUGIN_PROCESS:
+            return await self._run_process(cls_path, request, version)
+        if execution != PLUGIN_ASYNC:
+            raise ValueError(f"[PluginExecutor] 알 수 없는 execution '{execution}' ({plugin.plugin_name()})")
+        return await plugin.run(request)
+
+    async def _run_thread(self, plugin: BaseAgent, request: Any) -> Any:
+        if self._threads is None:
+            self._threads = ThreadPoolExecutor(max_workers=self.thread_workers, thread_name_prefix="plugin")
+
+        started = threading.Event()
+        holder: Dict[str, Any] = {}
+
+        def entry() -> Any:
+            loop = asyncio.new_event_loop()
+            task = loop.create_task(plugin.run(request))
+            holder["loop"], holder["task"] = loop, task
+            started.set()
+            try:
+                return loop.run_until_complete(task)
+            finally:
+                loop.close()
+
+        future = asyncio.get_running_loop().run_in_executor(self._threads, entry)
+        try:
+            return await future
+        except asyncio.CancelledError:
+            if started.is_set():
+                try:
+                    holder["loop"].call_soon_threadsafe(holder["task"].cancel)
+                except RuntimeError:
+                    # 워커 루프가 이미 끝난 경우
+                    pass
+            raise
+
+    async def _run_process(self, cls_path: str, request: Any, version: str) -> Any:
+        if self._processes is None:
+            self._processes = ProcessPoolExecutor(max_workers=self.process_workers)
+
+        future = asyncio.get_running_loop().run_in_executor(self._processes, _run_in_process, cls_path, version, _encode(request))
+        kind, data = await future
+        if kind == "model":
+            return MCPRequest[Any](**data)
+        return data
+
+    def shutdown(self, wait: bool = False) -> None:
+        if self._threads is not None:
+            self._threads.shutdown(wait=wait, cancel_futures=True)
+            self._threads = None
+        if self._processes is not None:
+            self._processes.shutdown(wait=wait, cancel_futures=True)
+            self._processes = None
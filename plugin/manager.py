@@ -1,13 +1,18 @@
 import asyncio
 import importlib
+import sys
 from collections import OrderedDict
-from typing import Any, List, Tuple
+from typing import Any, Dict, List, Tuple
 from agent.selector.base import Agent
-from plugin.registry import PLUGIN_REGISTRY
-from plugin.scanner import register_scan_directory
-from scheme.mcp import MCPRequest
-from utils.util import get_description_from_class_path
+from plugin.catalog import ToolCatalog
+from plugin.registry import PLUGIN_INFO, PLUGIN_REGISTRY, plugin_info, registry_epoch, registry_version, unregister_plugin
+from plugin.scanner import load_module_fresh, module_name_from_path, register_entry, register_scan_directory, scan_manifest
+from scheme.mcp import MCPRequest, MCPRequestMessage
+from utils.constant import FAIL, PLUGIN_WATCH_INTERVAL
+from utils.http import http_client
+from utils.logging import setup_logger
 from .base import BaseAgent
+from .executor import PluginExecutor
 
 
 class PluginManager:
@@ -15,11 +20,21 @@ class PluginManager:
         Agent를 동적으로 불러와 실행하는 매니저 클래스
     """
 
-    def __init__(self, plugin: str = "plugin", maximum_load = 10):
+    def __init__(self, plugin: str = "plugin", maximum_load = 10, plugin_dir: str = "plugins"):
+        self.logger = setup_logger("PluginManager")
         self._plugin_package = plugin
+        self._plugin_dir = plugin_dir
         self._loaded_plugins: OrderedDict[str, BaseAgent] = OrderedDict()
         self._maximum_tools = maximum_load
-        register_scan_directory("plugins")
+        self._executor = PluginExecutor()
+        # 플러그인별 동시 실행 제한
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        # 마지막으로 반영한 manifest (file path -> 항목)
+        self._manifest: Dict[str, Any] = register_scan_directory(plugin_dir) or {}
+        # 불러오기에 실패한 파일 -> 실패한 시점의 fingerprint (같은 내용이면 다시 시도하지 않는다)
+        self._failed: Dict[str, Tuple] = {}
+        self._catalog: ToolCatalog | None = None
+        self._catalog_epoch = -1
 
     def import_class_from_path(self, path: str) -> type[BaseAgent]:
         """
@@ -46,7 +61,6 @@ class PluginManager:
         if len(self._loaded_plugins) >= self._maximum_tools:
             removed_name, _ = self._loaded_plugins.popitem(last=False)
             print(f"[PluginManager] unload for cached data '{removed_name}'")
-            register_scan_directory("plugins")
         
         instance = agent()
         self._loaded_plugins[name] = instance
@@ -55,11 +69,27 @@ class PluginManager:
     async def run(self, name: str, request) -> MCPRequest[Any] | MCPRequest[Any]:
         """
         지정된 플러그인을 실행하여 결과 반환
+        플러그인의 execution / concurrency / timeout 설정에 따라 실행기와 제한을 고른다.
         """
         
         plugin = self.load_plugin(name)
-        
-        return await plugin.run(request)
+
+        semaphore = self._semaphores.get(name)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(max(1, getattr(plugin, "concurrency", 1)))
+            self._semaphores[name] = semaphore
+
+        timeout = getattr(plugin, "timeout", None)
+        async with semaphore:
+            try:
+                version = PLUGIN_INFO.get(name, {}).get("hash", "")
+                return await asyncio.wait_for(
+                    self._executor.submit(plugin, PLUGIN_REGISTRY[name], request, version=version), timeout=timeout
+                )
+            except asyncio.TimeoutError:
+                self.logger.warning(f"'{name}' 실행 시간 초과 ({timeout}s)")
+                response = MCPRequestMessage[dict](content=f"'{name}' 플러그인이 {timeout}초 안에 끝나지 않았습니다.", metadata={})
+                return MCPRequest[dict](content=[response], selected_tool=name, stop_reason=FAIL)
 
     def list_loaded(self) -> List[str]:
         """
@@ -70,8 +100,35 @@ class PluginManager:
     def list_registry(self) -> List[str]:
         return [name for name in PLUGIN_REGISTRY.keys()]
     
+    def tool_catalog(self) -> ToolCatalog:
+        """
+        도구 이름/설명/스키마를 담은 catalog를 반환합니다.
+        registry가 바뀌었을 때만 다시 만들고, 그 외에는 같은 객체를 돌려준다.
+        """
+        epoch = registry_epoch()
+        if self._catalog is None or self._catalog_epoch != epoch:
+            names = list(PLUGIN_REGISTRY.keys())
+            infos = {name: plugin_info(name) for name in names}
+            self._catalog = ToolCatalog(
+                version=registry_version(),
+                names=names,
+                descriptions=[f"{name} - {infos[name]['description']}" if infos[name]["description"] else "" for name in names],
+                profiles=[
+                    {"name": name, "schema": infos[name]["schema"], "description": infos[name]["description"]}
+                    for name in names
+                ],
+            )
+            self._catalog_epoch = epoch
+        return self._catalog
+
     def pair_registry_execute_info(self) -> List[str]:
-        return [f"{name} - {get_description_from_class_path(PLUGIN_REGISTRY[name])}" if get_description_from_class_path(PLUGIN_REGISTRY[name]) else "" for name in PLUGIN_REGISTRY.keys()]
+        return list(self.tool_catalog().descriptions)
+
+    def list_tool_profiles(self) -> List[Dict[str, Any]]:
+        """
+        플러그인별 이름, 스키마(.json), 설명(.md) 목록
+        """
+        return list(self.tool_catalog().profiles)
     
     
     def unload(self, name: str) -> None:
@@ -81,6 +138,77 @@ class PluginManager:
 
         if name in self._loaded_plugins:
             del self._loaded_plugins[name]
+        self._semaphores.pop(name, None)
 
         print(f"[PluginManager] deleted '{name}' from cache")
 
+    async def watch(self, interval: float = PLUGIN_WATCH_INTERVAL) -> None:
+        """
+        plugins 디렉터리를 주기적으로(mtime polling) 확인해 바뀐 플러그인만 다시 불러옵니다.
+        서버 lifespan에서 task로 실행하고 종료 시 취소합니다.
+        """
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                files = await asyncio.to_thread(scan_manifest, self._plugin_dir)
+                self.apply_manifest(files)
+            except Exception as e:
+                self.logger.error(f"플러그인 변경 확인 실패: {e}", exc_info=True)
+
+    def apply_manifest(self, files: Dict[str, Any]) -> List[str]:
+        """
+        새 manifest와 마지막으로 반영한 manifest를 비교해 바뀐 파일만 반영하고, 다시 불러온 플러그인 이름을 반환합니다.
+
+        - 이미 import된 모듈은 새 모듈을 끝까지 실행한 뒤에 sys.modules를 교체한다. 실패하면 기존 모듈을 유지한다.
+        - 불러온 인스턴스는 캐시에서만 제거한다. 실행 중인 요청은 기존 인스턴스로 끝까지 실행된다.
+        - registry가 바뀌면 registry_version()이 달라지므로 도구 선택 캐시가 무효화된다.
+        """
+        reloaded: List[str] = []
+        for file_path in sorted(files.keys() | self._manifest.keys()):
+            old_entry, new_entry = self._manifest.get(file_path), files.get(file_path)
+            fingerprint = self._fingerprint(new_entry)
+            if self._fingerprint(old_entry) == fingerprint or self._failed.get(file_path) == fingerprint:
+                continue
+
+            module_name = module_name_from_path(self._plugin_dir, file_path)
+            if new_entry is None:
+                sys.modules.pop(module_name, None)
+            elif module_name in sys.modules:
+                try:
+                    module = load_module_fresh(module_name, file_path)
+                except Exception as e:
+                    self.logger.error(f"'{module_name}' 다시 불러오기 실패, 기존 모듈을 유지합니다: {e}")
+                    self._failed[file_path] = fingerprint
+                    continue
+                sys.modules[module_name] = module
+            self._failed.pop(file_path, None)
+
+            old_names = {plugin["name"] for plugin in old_entry["plugins"]} if old_entry else set()
+            new_names = {plugin["name"] for plugin in new_entry["plugins"]} if new_entry else set()
+            for name in old_names - new_names:
+                unregister_plugin(name)
+            if new_entry is not None:
+                register_entry(new_entry)
+                self._manifest[file_path] = new_entry
+            else:
+                self._manifest.pop(file_path, None)
+
+            for name in old_names | new_names:
+                self._loaded_plugins.pop(name, None)
+                self._semaphores.pop(name, None)
+                reloaded.append(name)
+            self.logger.info(f"reloaded '{module_name}' ({', '.join(sorted(old_names | new_names))})")
+        return reloaded
+
+    @staticmethod
+    def _fingerprint(entry: Dict[str, Any] | None) -> Tuple | None:
+        if entry is None:
+            return None
+        return (entry["hash"], entry["json_mtime"], entry["md_mtime"])
+
+    async def shutdown(self) -> None:
+        """
+        플러그인 실행기와 플러그인이 공유하는 HTTP 연결을 닫습니다.
+        """
+        self._executor.shutdown()
+        await http_client.close()
@@ -1,11 +1,65 @@
-from typing import Dict
+import hashlib
+import json
+from typing import Any, Dict
 from plugin.base import BaseAgent
+from utils.util import get_description_from_class_path, get_schema_from_class_path
 
 
 PLUGIN_REGISTRY: Dict[str, str] = {}
+# 플러그인 이름 -> manifest 정보(schema, description, 파일 hash)
+PLUGIN_INFO: Dict[str, Dict[str, Any]] = {}
+# register_plugin / unregister_plugin으로 registry가 바뀔 때마다 1씩 증가
+_EPOCH = 0
 
-def register_plugin(name: str,  cls_path: str) -> None:
-    if name in PLUGIN_REGISTRY:
+def register_plugin(name: str,  cls_path: str, info: Dict[str, Any] | None = None) -> None:
+    if name in PLUGIN_REGISTRY and PLUGIN_REGISTRY[name] != cls_path:
         raise ValueError(f"[Registry] '{name}'은 이미 등록되어 있습니다.")
 
+    global _EPOCH
+    if PLUGIN_REGISTRY.get(name) != cls_path or (info is not None and PLUGIN_INFO.get(name) != info):
+        _EPOCH += 1
+
     PLUGIN_REGISTRY[name] = cls_path
+    if info is not None:
+        PLUGIN_INFO[name] = info
+
+
+def unregister_plugin(name: str) -> None:
+    global _EPOCH
+    if name in PLUGIN_REGISTRY:
+        _EPOCH += 1
+    PLUGIN_REGISTRY.pop(name, None)
+    PLUGIN_INFO.pop(name, None)
+
+
+def registry_epoch() -> int:
+    """registry 변경 횟수. 값 비교만으로 변경 여부를 알 수 있어 hot path에서 쓴다."""
+    return _EPOCH
+
+
+def plugin_info(name: str) -> Dict[str, Any]:
+    """
+    manifest에 기록된 스키마와 설명을 반환합니다.
+    manifest 없이 직접 등록된 플러그인은 .json/.md 파일을 읽습니다.
+    """
+    cls_path = PLUGIN_REGISTRY[name]
+    info = PLUGIN_INFO.get(name)
+    if info is not None and info.get("class_path", cls_path) == cls_path:
+        return info
+    return {
+        "schema": get_schema_from_class_path(cls_path),
+        "description": get_description_from_class_path(cls_path),
+    }
+
+
+def registry_version() -> str:
+    """
+    등록된 플러그인 구성(이름, 클래스 경로, 파일 hash, 스키마, 설명)의 해시.
+    구성이 바뀌면(플러그인 hot reload 포함) 값이 달라지고, 재시작해도 같은 구성이면 같은 값을 반환한다.
+    """
+    items = []
+    for name, path in sorted(PLUGIN_REGISTRY.items()):
+        info = PLUGIN_INFO.get(name, {})
+        schema = json.dumps(info.get("schema", ""), sort_keys=True, ensure_ascii=False)
+        items.append(f"{name}={path}@{info.get('hash', '')}:{schema}:{info.get('description', '')}")
+    return hashlib.sha256("\n".join(items).encode("utf-8")).hexdigest()[:16]
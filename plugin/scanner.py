@@ -1,33 +1,252 @@
+import ast
+import hashlib
+import json
 import os
+import sys
 import importlib.util
+from types import ModuleType
+from typing import Any, Dict, List
 from plugin.base import BaseAgent
 from plugin.registry import register_plugin
+from utils.constant import PLUGIN_MANIFEST_PATH
 
-def register_scan_directory(path: str):
-    package_prefix: str = path
-    
-    for root, _, files in os.walk(path):
-        for file in files:
-            if file.endswith(".py") and not file.startswith("__"):
-                file_path = os.path.join(root, file)
-                rel_path = os.path.relpath(file_path, path)
-                module_path = os.path.splitext(rel_path)[0].replace(os.sep, ".")
-                full_module_path = f"{package_prefix}.{module_path}"
-
-                try:
-                    module = importlib.import_module(full_module_path)
-
-                    for attr_name in dir(module):
-                        attr = getattr(module, attr_name)
-                        if (
-                            isinstance(attr, type)
-                            and issubclass(attr, BaseAgent)
-                            and attr is not BaseAgent
-                            and hasattr(attr, "plugin_name")
-                        ):
-                            name = attr.plugin_name()
-                            class_path = f"{module.__name__}.{attr.__name__}"
-                            register_plugin(name, class_path)
-
-                except Exception as e:
-                    print(f"[AutoScan] {full_module_path} 로딩 실패: {e}")
\ No newline at end of file
+MANIFEST_VERSION = 1
+
+
+def _file_hash(file_path: str) -> str:
+    with open(file_path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _sidecar(file_path: str, ext: str) -> str:
+    return f"{os.path.splitext(file_path)[0]}{ext}"
+
+
+def _mtime(path: str) -> int:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return 0
+
+
+def _read_sidecars(file_path: str) -> Dict[str, Any]:
+    """플러그인 파일 옆의 .json(스키마), .md(설명)를 읽습니다. 없으면 빈 문자열"""
+    schema, description = "", ""
+    json_path, md_path = _sidecar(file_path, ".json"), _sidecar(file_path, ".md")
+    if os.path.exists(json_path):
+        with open(json_path, "r", encoding="utf-8") as f:
+            schema = json.load(f)
+    if os.path.exists(md_path):
+        with open(md_path, "r", encoding="utf-8") as f:
+            description = f.read()
+    return {"schema": schema, "description": description}
+
+
+def _literal_plugin_name(node: ast.ClassDef) -> str | None:
+    """`def plugin_name(): return "Name"` 형태라면 Name을 반환합니다."""
+    for item in node.body:
+        if not isinstance(item, ast.FunctionDef) or item.name != "plugin_name":
+            continue
+        returns = [stmt for stmt in item.body if isinstance(stmt, ast.Return)]
+        if len(returns) != 1 or returns[0].value is None:
+            return None
+        value = returns[0].value
+        if isinstance(value, ast.Constant) and isinstance(value.value, str):
+            return value.value
+        # f"Name" 처럼 상수만 있는 f-string
+        if isinstance(value, ast.JoinedStr) and all(isinstance(v, ast.Constant) for v in value.values):
+            return "".join(v.value for v in value.values)
+        return None
+    return None
+
+
+def _base_names(node: ast.ClassDef) -> List[str]:
+    names = []
+    for base in node.bases:
+        if isinstance(base, ast.Name):
+            names.append(base.id)
+        elif isinstance(base, ast.Attribute):
+            names.append(base.attr)
+    return names
+
+
+def _parse_plugins(file_path: str, module_name: str) -> List[Dict[str, str]] | None:
+    """
+    모듈을 import 하지 않고 AST에서 플러그인 이름과 클래스 경로를 찾습니다.
+    정적으로 판단할 수 없는 경우(다른 플러그인 상속, 계산된 plugin_name 등) None을 반환합니다.
+    """
+    with open(file_path, "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=file_path)
+
+    plugins = []
+    for node in tree.body:
+        if not isinstance(node, ast.ClassDef):
+            continue
+        bases = _base_names(node)
+        if "BaseAgent" not in bases:
+            if any(base not in ("ABC", "object", "Generic") for base in bases):
+                return None
+            continue
+
+        name = _literal_plugin_name(node)
+        if name is None:
+            if any(isinstance(item, ast.FunctionDef) and item.name == "plugin_name" for item in node.body):
+                return None
+            # plugin_name이 없는 중간 추상 클래스
+            continue
+        plugins.append({"name": name, "class_path": f"{module_name}.{node.name}"})
+    return plugins
+
+
+def module_name_from_path(path: str, file_path: str) -> str:
+    rel_path = os.path.relpath(file_path, path)
+    return f"{path}." + os.path.splitext(rel_path)[0].replace(os.sep, ".")
+
+
+def load_module_fresh(module_name: str, file_path: str) -> ModuleType:
+    """
+    sys.modules를 건드리지 않고 파일에서 모듈을 새로 실행합니다.
+    실행에 실패하면 예외가 나고 기존 모듈은 그대로 남습니다.
+    """
+    spec = importlib.util.spec_from_file_location(module_name, file_path)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"{file_path}에서 모듈을 찾을 수 없습니다.")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _import_plugins(module_name: str, file_path: str) -> List[Dict[str, str]]:
+    """AST로 판단할 수 없는 모듈은 기존처럼 import 해서 찾습니다."""
+    if module_name in sys.modules:
+        # 이미 불러온 모듈이라면 바뀐 파일 내용을 보기 위해 새로 실행한다
+        module = load_module_fresh(module_name, file_path)
+    else:
+        module = importlib.import_module(module_name)
+    plugins = []
+    for attr_name in dir(module):
+        attr = getattr(module, attr_name)
+        if (
+            isinstance(attr, type)
+            and issubclass(attr, BaseAgent)
+            and attr is not BaseAgent
+            and hasattr(attr, "plugin_name")
+            and attr.__module__ == module.__name__
+        ):
+            plugins.append({"name": attr.plugin_name(), "class_path": f"{module.__name__}.{attr.__name__}"})
+    return plugins
+
+
+def load_manifest(manifest_path: str | None) -> Dict[str, Any]:
+    if not manifest_path or not os.path.exists(manifest_path):
+        return {}
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"[AutoScan] manifest 로딩 실패, 다시 만듭니다: {e}")
+        return {}
+    if manifest.get("version") != MANIFEST_VERSION:
+        return {}
+    return manifest.get("files", {})
+
+
+def save_manifest(manifest_path: str | None, files: Dict[str, Any]) -> None:
+    if not manifest_path:
+        return
+    try:
+        os.makedirs(os.path.dirname(manifest_path) or ".", exist_ok=True)
+        with open(f"{manifest_path}.tmp", "w", encoding="utf-8") as f:
+            json.dump({"version": MANIFEST_VERSION, "files": files}, f, ensure_ascii=False, indent=2)
+        os.replace(f"{manifest_path}.tmp", manifest_path)
+    except OSError as e:
+        print(f"[AutoScan] manifest 저장 실패: {e}")
+
+
+def scan_manifest(path: str, manifest_path: str | None = None) -> Dict[str, Any]:
+    """
+    path 아래 플러그인 파일들의 manifest를 반환합니다.
+
+    file path -> {mtime, hash, json_mtime, md_mtime, plugins: [{name, class_path, schema, description}]}
+    파일(.py/.json/.md)의 mtime이 그대로면 저장된 항목을 재사용하고,
+    .py의 mtime만 바뀌었다면 hash를 비교해 내용이 같을 때 재사용합니다.
+    manifest_path가 None이면 PLUGIN_MANIFEST_PATH 환경 변수(또는 기본 경로)를, ""이면 저장하지 않습니다.
+    """
+    if manifest_path is None:
+        manifest_path = os.getenv("PLUGIN_MANIFEST_PATH", PLUGIN_MANIFEST_PATH)
+    previous = load_manifest(manifest_path)
+    files: Dict[str, Any] = {}
+    changed = False
+
+    for root, _, names in os.walk(path):
+        for file in sorted(names):
+            if not file.endswith(".py") or file.startswith("__"):
+                continue
+
+            file_path = os.path.join(root, file)
+            full_module_path = module_name_from_path(path, file_path)
+
+            stamp = {
+                "mtime": _mtime(file_path),
+                "json_mtime": _mtime(_sidecar(file_path, ".json")),
+                "md_mtime": _mtime(_sidecar(file_path, ".md")),
+            }
+            entry = previous.get(file_path)
+            if entry is not None and all(entry.get(k) == v for k, v in stamp.items()):
+                files[file_path] = entry
+                continue
+
+            try:
+                digest = _file_hash(file_path)
+                sidecars_same = entry is not None and entry["json_mtime"] == stamp["json_mtime"] and entry["md_mtime"] == stamp["md_mtime"]
+                if entry is not None and sidecars_same and entry.get("hash") == digest:
+                    # 내용은 그대로이고 mtime만 바뀐 경우
+                    files[file_path] = {**entry, **stamp}
+                    changed = True
+                    continue
+
+                plugins = _parse_plugins(file_path, full_module_path)
+                if plugins is None:
+                    plugins = _import_plugins(full_module_path, file_path)
+
+                sidecars = _read_sidecars(file_path)
+                files[file_path] = {
+                    **stamp,
+                    "hash": digest,
+                    "plugins": [{**plugin, **sidecars} for plugin in plugins],
+                }
+                changed = True
+            except Exception as e:
+                print(f"[AutoScan] {full_module_path} 로딩 실패: {e}")
+
+    if changed or files.keys() != previous.keys():
+        save_manifest(manifest_path, files)
+    return files
+
+
+def register_entry(entry: Dict[str, Any]) -> None:
+    """manifest의 파일 항목 하나에 들어 있는 플러그인들을 등록합니다."""
+    for plugin in entry["plugins"]:
+        try:
+            register_plugin(
+                plugin["name"],
+                plugin["class_path"],
+                info={
+                    "class_path": plugin["class_path"],
+                    "schema": plugin["schema"],
+                    "description": plugin["description"],
+                    "hash": entry["hash"],
+                },
+            )
+        except ValueError as e:
+            print(f"[AutoScan] {plugin['class_path']} 등록 실패: {e}")
+
+
+def register_scan_directory(path: str, manifest_path: str | None = None) -> Dict[str, Any]:
+    """
+    manifest를 갱신하고 플러그인을 등록합니다. 플러그인 모듈은 처음 실행될 때 import 됩니다.
+    """
+    files = scan_manifest(path, manifest_path)
+    for entry in files.values():
+        register_entry(entry)
+    return files
@@ -1,23 +1,54 @@
 import os
-import requests
+from typing import Tuple
 from plugin.base import BaseAgent
 from scheme.mcp import MCPRequest, MCPRequestMessage
-from utils.constant import FAIL, MORE_DATA, SUCCESS
+from utils.cache import InFlight, TTLCache
+from utils.constant import FAIL, MORE_DATA, SUCCESS, WEATHER_CACHE_MAX_ENTRIES, WEATHER_CACHE_TTL
 from utils.env import load_dotenv
+from utils.http import HttpClient, http_client
 from utils.logging import setup_logger
 
 class WeatherToolAgent(BaseAgent):
-    def __init__(self):
+    # 플러그인 인스턴스가 unload/reload 되어도 유지되도록 클래스에 둔다
+    cache: TTLCache[str, dict] = TTLCache(max_entries=WEATHER_CACHE_MAX_ENTRIES, ttl=WEATHER_CACHE_TTL)
+    in_flight: InFlight[str, Tuple[int, dict]] = InFlight()
+
+    def __init__(self, client: HttpClient = http_client):
         super().__init__()
         load_dotenv()
         self.logger = setup_logger("weather_tool_agent")
         self.api_key = os.getenv("OPENWEATHER_API_KEY", "")
         self.api_url = "http://api.openweathermap.org/data/2.5/weather"
+        self.client = client
 
     @staticmethod
     def plugin_name():
         return f"WeatherToolAgent"
 
+    async def _fetch(self, city: str) -> Tuple[int, dict]:
+        params = {
+            "q": city,
+            "appid": self.api_key,
+            "units": "metric",
+            "lang": "en"  # changed to 'en' for English descriptions
+        }
+
+        status, data = await self.client.get_json(self.api_url, params=params)
+        if status != 200:
+            return status, {
+                "content": f"Failed to retrieve weather information. Status code: {status}",
+                "city": city
+            }
+
+        weather = data['weather'][0]['description']
+        temp = data['main']['temp']
+        return status, {
+            "content": f"The current weather in {city} is '{weather}', with a temperature of {temp}°C.",
+            "city": city,
+            "weather": weather,
+            "temp": temp
+        }
+
     async def run(self, input_data: MCPRequestMessage):
         try:
             request = input_data.content
@@ -37,13 +68,6 @@ class WeatherToolAgent(BaseAgent):
                 missing["city"] = "string"
                 raise ValueError(missing)
 
-            params = {
-                "q": city,
-                "appid": self.api_key,
-                "units": "metric",
-                "lang": "en"  # changed to 'en' for English descriptions
-            }
-
             if self.api_key == "":
                 # Fallback response
                 weather = "rain"
@@ -55,22 +79,14 @@ class WeatherToolAgent(BaseAgent):
                     "temp": temp,
                 }
             else:
-                response = requests.get(self.api_url, params=params)
-                if response.status_code != 200:
-                    content = {
-                        "content": f"Failed to retrieve weather information. Status code: {response.status_code}",
-                        "city": city
-                    }
-                else:
-                    data = response.json()
-                    weather = data['weather'][0]['description']
-                    temp = data['main']['temp']
-                    content = {
-                        "content": f"The current weather in {city} is '{weather}', with a temperature of {temp}°C.",
-                        "city": city,
-                        "weather": weather,
-                        "temp": temp
-                    }
+                key = city.strip().lower()
+                content = self.cache.get(key)
+                if content is None:
+                    # 같은 도시에 대한 동시 요청은 upstream 호출 한 번을 함께 기다린다
+                    status, content = await self.in_flight.run(key, lambda: self._fetch(city))
+                    if status == 200:
+                        self.cache.set(key, content)
+                content = dict(content)
 
             mcp_response_msg = MCPRequestMessage[dict](content=request, metadata=content)
             return MCPRequest[dict](content=[mcp_response_msg], selected_tool=self.plugin_name(), stop_reason=SUCCESS)
@@ -1,9 +1,9 @@
 import asyncio
 from collections import deque
 from collections.abc import AsyncGenerator
-from copy import deepcopy
 import datetime
-from typing import Deque, Dict
+import os
+from typing import Deque, Dict, Set
 from agent.planning_agent_mcts import PlanningState
 from agent.selector.base import Agent
 from scheme.a2a_message import AgentMessage
@@ -13,12 +13,19 @@ from agent.planning_agent import PlanningAgent
 from agent.execution_agent import ExecutionAgent
 from agent.validation_agent import ValidationAgent
 from plugin.manager import PluginManager
-from utils.constant import FAIL, MAX_RETRIES, SPECIAL_ROUTER, SUCCESS
+from utils.constant import FAIL, MAX_CONCURRENCY, MAX_RETRIES, SPECIAL_ROUTER, SUCCESS
+from utils.locks import KeyedLock
 from utils.logging import setup_logger
+from utils.session_store import SessionStore
 from utils.util import merge_metadata_only
 
 class Router:
-    def __init__(self, plugin_manager: PluginManager):
+    def __init__(
+        self,
+        plugin_manager: PluginManager,
+        max_concurrency: int = MAX_CONCURRENCY,
+        sessions: SessionStore[PlanningState] | None = None,
+    ):
         self.agents = {
             "PlanningAgent": PlanningAgent(),
             "ToolSelectorAgent": ToolSelectorAgent(plugin_manager),
@@ -26,11 +33,35 @@ class Router:
             "ValidationAgent": ValidationAgent(),
         }
         self.logger = setup_logger("Router")
-        self.sessions: Dict[str, PlanningState] = {}
-        self.lock = asyncio.Lock()
+        self.sessions: SessionStore[PlanningState] = sessions or SessionStore(
+            lambda: PlanningState(history=[], remaining_goals=[], execution_results={}),
+            offload_dir=os.getenv("SESSION_OFFLOAD_DIR"),
+            dumps=PlanningState.dumps,
+            loads=PlanningState.loads,
+            sizeof=PlanningState.approx_size,
+        )
+        # 세션별 lock: 서로 다른 세션의 상태 접근은 서로 기다리지 않는다
+        self.session_locks = KeyedLock("RouterLock")
+        self.max_concurrency = max_concurrency
+
+    async def startup(self):
+        for agent in self.agents.values():
+            await agent.startup()
+
+    async def shutdown(self):
+        for agent in self.agents.values():
+            await agent.shutdown()
+        await self.sessions.flush()
+
+    def lock_stats(self) -> dict:
+        return self.session_locks.stats()
+
+    async def close_session(self, session_id: str):
+        async with self.session_locks(session_id):
+            self.sessions.pop(session_id)
 
     async def on_update_state(self, session_id: str, state: PlanningState):
-        async with self.lock:
+        async with self.session_locks(session_id):
             self._update_session_state(session_id, state)
 
     async def route(self, plan_queue: Deque[AgentMessage], msg: AgentMessage, receiver: str, state: PlanningState):
@@ -117,19 +148,85 @@ class Router:
             payload=[MCPRequest[dict](content=[MCPRequestMessage[dict](**user_request)])]
         )
         print(initial_message)
-        async with self.lock:
-            if session_id not in self.sessions:
-                self.sessions[session_id] = PlanningState(
-                    history=[], remaining_goals=[], execution_results={}
-                )
+        async with self.session_locks(session_id):
+            # 요청을 처리하는 동안에는 세션이 내보내지지 않도록 고정
+            self.sessions.pin(session_id)
+            # 디스크로 내보낸 세션은 이벤트 루프 밖에서 불러온다
+            await self.sessions.restore(session_id)
+            state = self.sessions.get_or_create(session_id).clone()
+            # step id는 요청마다 0부터 시작하므로 이전 요청의 결과가 선행 결과로 쓰이지 않도록 비운다
+            state.begin_request()
 
-            state = deepcopy(self.sessions[session_id])
-            self.agents["PlanningAgent"].set_state(state)
+        try:
+            async for result in self._handle(initial_message, session_id, state):
+                yield result
+        finally:
+            # 요청이 끝난 시점의 크기로 다시 측정하고 고정을 푼다
+            state = self.sessions.get(session_id)
+            if state is not None:
+                self.sessions[session_id] = state
+            self.sessions.unpin(session_id)
 
+    async def _handle(self, initial_message: AgentMessage, session_id: str, state: PlanningState) -> AsyncGenerator[AgentMessage]:
         plan_queue: Deque[AgentMessage] = deque()
+        results: asyncio.Queue = asyncio.Queue()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        parked: Dict[asyncio.Future, AgentMessage] = {}
+        running: Set[asyncio.Task] = set()
+
+        # plan은 스트리밍으로 도착하므로 플래닝이 끝나기 전에도 도착한 step부터 실행한다
+        running.add(asyncio.create_task(self._plan(initial_message, plan_queue, results, session_id, state)))
+
+        cur = datetime.datetime.now()
+        print(f"start time : {cur}")
+        deadline = cur + datetime.timedelta(minutes=3)
+
+        try:
+            while True:
+                self._dispatch_ready(plan_queue, parked, running, results, semaphore, session_id, state)
+
+                stalled = [msg for future, msg in parked.items() if not future.done()]
+                if len(stalled) == len(running) and results.empty():
+                    # 실행 중인 step 없이 대기 step만 남았다면 부모 결과는 더 이상 도착하지 않는다
+                    for msg in stalled:
+                        yield self._error_message(msg.receiver, Exception(f"선행 작업({msg.dag})의 결과가 없어 실행할 수 없습니다."))
+                    break
+
+                timeout = (deadline - datetime.datetime.now()).total_seconds()
+                try:
+                    item = await asyncio.wait_for(results.get(), timeout=max(timeout, 0))
+                except asyncio.TimeoutError:
+                    yield self._error_message("Router", Exception("너무 오래지속 되는것으로 판단하고 종료 합니다."))
+                    break
 
+                if isinstance(item, asyncio.Task):
+                    running.discard(item)
+                    continue
+
+                if item is None:
+                    # 새 plan step이 도착했으니 다시 dispatch
+                    continue
+
+                self._update_session_state(session_id, state)
+                yield item
+        finally:
+            for task in running:
+                task.cancel()
+
+        print("[done]")
+
+    async def _plan(
+        self,
+        initial_message: AgentMessage,
+        plan_queue: Deque[AgentMessage],
+        results: asyncio.Queue,
+        session_id: str,
+        state: PlanningState,
+    ) -> None:
+        """PlanningAgent가 내보내는 step을 도착하는 대로 plan_queue에 넣고 dispatch 루프를 깨웁니다."""
         try:
-            async for plan_result in self.agents["PlanningAgent"].on_event(initial_message):
+            # PlanningAgent는 세션 간에 공유되므로 이 요청의 상태를 직접 넘긴다
+            async for plan_result in self.agents["PlanningAgent"].on_event(initial_message, state):
                 plan_result = plan_result if isinstance(plan_result, list) else [plan_result]
                 for new_plan in plan_result:
                     # new_plan이 리스트인 경우 처리
@@ -144,83 +241,103 @@ class Router:
                         if new_plan.receiver == "user":
                             continue
                         plan_queue.append(new_plan)
+                results.put_nowait(None)
+            print(plan_queue)
+            self.sessions[session_id] = state
         except Exception as e:
             self.logger.error(f"PlanningAgent 예외: {e}", exc_info=True)
-            return
-        print(plan_queue)
-        self.sessions[session_id] = self.agents["PlanningAgent"].get_state()
-        state = self.sessions[session_id]
-        
-        cur = datetime.datetime.now()
-        print(f"start time : {cur}")
+        finally:
+            results.put_nowait(asyncio.current_task())
+
+    def _dispatch_ready(
+        self,
+        plan_queue: Deque[AgentMessage],
+        parked: Dict[asyncio.Future, AgentMessage],
+        running: Set[asyncio.Task],
+        results: asyncio.Queue,
+        semaphore: asyncio.Semaphore,
+        session_id: str,
+        state: PlanningState,
+    ) -> None:
+        """plan_queue의 step들을 실행합니다. 선행 결과가 없는 step은 결과가 기록될 때까지 대기합니다."""
         while plan_queue:
-            try:
-                msg = plan_queue.popleft()
-                
-                # ✅ 리스트라면 flatten (이전 플랜 결과가 잘못 들어간 경우 대응)
-                while isinstance(msg, list):
-                    if not msg:
-                        msg = None
-                        break  # <- continue가 아니라 loop 탈출
-                    for m in reversed(msg[1:]):
-                        plan_queue.appendleft(m)
-                    msg = msg[0]
-                
-                if msg == None:
-                    continue
+            msg = plan_queue.popleft()
 
-                receiver = msg.receiver
-                if msg.retries > MAX_RETRIES:
-                    print(msg)
-                    raise Exception(f"요청이 {MAX_RETRIES}회 이상 실패하였습니다. 다시 시도해주세요.")
-
-                combined_msg = msg
-                if msg.dag != -1:
-                    previous_msg = state.get_result(msg.dag)
-
-                    if len(previous_msg) == 0:
-                        msg.retries += 1
-                        plan_queue.append(msg)
-                        continue
-                     
-                    combined_msg = merge_metadata_only(previous_msg[-1], msg)
-                
-                print("[Before Router]===================")
-                print(combined_msg)
-                print("==================================")
+            # ✅ 리스트라면 flatten (이전 플랜 결과가 잘못 들어간 경우 대응)
+            if isinstance(msg, list):
+                for m in reversed(msg):
+                    plan_queue.appendleft(m)
+                continue
 
-                if receiver in SPECIAL_ROUTER:
-                    self._update_session_state(session_id, state)
-                    continue
+            if msg is None:
+                continue
 
-                if receiver in self.agents:
-                    print(f"[Router] {receiver}의 on_event 호출 준비")
-                    async for step_result in self.route(plan_queue, combined_msg, receiver, state):
-                        self._update_session_state(session_id, state)
-                        
-                        yield step_result
+            receiver = msg.receiver
+            if msg.retries > MAX_RETRIES:
+                print(msg)
+                results.put_nowait(self._error_message(receiver, Exception(f"요청이 {MAX_RETRIES}회 이상 실패하였습니다. 다시 시도해주세요.")))
+                continue
 
-                else:
-                    self.logger.error(f"알 수 없는 receiver {receiver}")
+            if receiver in SPECIAL_ROUTER:
+                self._update_session_state(session_id, state)
+                continue
 
-                end = datetime.datetime.now()
-                if end - cur > datetime.timedelta(minutes=3):
-                    raise Exception("너무 오래지속 되는것으로 판단하고 종료 합니다.")
+            if receiver not in self.agents:
+                self.logger.error(f"알 수 없는 receiver {receiver}")
+                continue
 
-            except Exception as e:
-                self.logger.error(f"{receiver} 처리 중 에러: {e}", exc_info=True)
-                response_message = MCPRequestMessage(content=f"에러 발생: {str(e)}", metadata = {})
-                response_payload = MCPRequest(content=[response_message])
-                yield AgentMessage(sender=receiver, receiver="user", payload=[response_payload], stop_reason=FAIL)
-        
-        print("[done]")
+            dependency = None
+            if msg.dag not in (-1, None):
+                dependency = state.wait_result(msg.dag)
+                parked[dependency] = msg
+
+            print(f"[Router] {receiver}의 on_event 호출 준비")
+            task = asyncio.create_task(self._run_step(plan_queue, msg, receiver, state, results, semaphore, parked, dependency))
+            running.add(task)
+
+    async def _run_step(
+        self,
+        plan_queue: Deque[AgentMessage],
+        msg: AgentMessage,
+        receiver: str,
+        state: PlanningState,
+        results: asyncio.Queue,
+        semaphore: asyncio.Semaphore,
+        parked: Dict[asyncio.Future, AgentMessage],
+        dependency: asyncio.Future | None = None,
+    ) -> None:
+        """선행 결과를 기다린 뒤 하나의 step을 동시 실행 한도 안에서 실행하고 결과를 스트리밍합니다."""
+        try:
+            if dependency is not None:
+                try:
+                    previous_msg = await dependency
+                finally:
+                    parked.pop(dependency, None)
+                msg = merge_metadata_only(previous_msg[-1], msg)
+
+            print("[Before Router]===================")
+            print(msg)
+            print("==================================")
+
+            async with semaphore:
+                async for step_result in self.route(plan_queue, msg, receiver, state):
+                    await results.put(step_result)
+        except Exception as e:
+            self.logger.error(f"{receiver} 처리 중 에러: {e}", exc_info=True)
+            await results.put(self._error_message(receiver, e))
+        finally:
+            results.put_nowait(asyncio.current_task())
+
+    def _error_message(self, sender: str, error: Exception) -> AgentMessage:
+        response_message = MCPRequestMessage(content=f"에러 발생: {str(error)}", metadata = {})
+        response_payload = MCPRequest(content=[response_message])
+        return AgentMessage(sender=sender, receiver="user", payload=[response_payload], stop_reason=FAIL)
 
     def _update_session_state(self, session_id: str, new_state: PlanningState):
         """세션 상태 병합 로직"""
-        existing = self.sessions[session_id]
-        
-        existing.init_args(
-            history=list({msg.id: msg for msg in existing.history + new_state.history}.values()),
-            remaining_goals = [g for g in new_state.remaining_goals if g not in existing.history]
-        ) 
-        existing.update_execute(new_state.execution_results)
+        existing = self.sessions.get(session_id)
+        if existing is None:
+            # 연결 종료 등으로 이미 제거된 세션
+            return
+
+        existing.merge(new_state)
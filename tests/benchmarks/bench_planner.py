@@ -0,0 +1,117 @@
+"""
+플래너 벤치마크
+
+    python -m tests.benchmarks.bench_planner --sizes 10 100 1000 --output planner.json
+
+shape(chain, fan_out, diamond, random) x size 조합마다 MCTSPlanner.run, PlanningState.clone,
+evaluate_plan의 실행 시간과 tracemalloc peak memory를 측정해 JSON으로 출력한다.
+커밋 간 비교를 위해 같은 --seed를 사용한다.
+"""
+import argparse
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+from agent.planning_agent_mcts import MCTSPlanner, PlanningState, evaluate_plan
+from tests.benchmarks.dag import GENERATORS
+
+
+def measure(fn: Callable[[], object], repeat: int) -> Dict[str, float]:
+    """fn을 repeat번 실행한 시간(초)과 첫 실행의 peak memory(byte)"""
+    timings: List[float] = []
+    peak = 0
+    for i in range(repeat):
+        if i == 0:
+            tracemalloc.start()
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+        if i == 0:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+    # tracemalloc이 켜진 첫 실행은 느리므로 시간은 나머지 실행 기준으로 계산
+    samples = timings[1:] or timings
+    return {
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "max": max(samples),
+        "runs": len(samples),
+        "peak_bytes": peak,
+    }
+
+
+def bench_case(shape: str, size: int, seed: int, repeat: int, max_iter: int, time_budget: float | None) -> dict:
+    goals = GENERATORS[shape](size, random.Random(seed))
+
+    def run_planner():
+        state = PlanningState(history=[], remaining_goals=list(goals), execution_results={})
+        return MCTSPlanner(state, seed=seed).run(max_iter=max_iter, time_budget=time_budget)
+
+    plan = run_planner()
+    state = PlanningState(history=list(goals), remaining_goals=list(goals), execution_results={})
+
+    return {
+        "shape": shape,
+        "size": size,
+        "planned_steps": len(plan),
+        "plan_score": evaluate_plan(plan),
+        "planner_run": measure(run_planner, repeat),
+        "state_clone": measure(state.clone, max(repeat, 10)),
+        "evaluate_plan": measure(lambda: evaluate_plan(goals), max(repeat, 10)),
+    }
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def main(argv: List[str] | None = None) -> dict:
+    parser = argparse.ArgumentParser(description="MCTSPlanner benchmark")
+    parser.add_argument("--shapes", nargs="+", default=list(GENERATORS), choices=list(GENERATORS))
+    parser.add_argument("--sizes", nargs="+", type=int, default=[10, 100, 1000, 10000])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--max-iter", type=int, default=100)
+    parser.add_argument("--time-budget", type=float, default=None, help="run()당 최대 탐색 시간(초)")
+    parser.add_argument("--output", default="-", help="결과 JSON 경로 (- 이면 stdout)")
+    args = parser.parse_args(argv)
+
+    results = []
+    for shape in args.shapes:
+        for size in args.sizes:
+            print(f"[bench] {shape} size={size}", file=sys.stderr)
+            results.append(bench_case(shape, size, args.seed, args.repeat, args.max_iter, args.time_budget))
+
+    report = {
+        "benchmark": "planner",
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "seed": args.seed,
+        "max_iter": args.max_iter,
+        "time_budget": args.time_budget,
+        "results": results,
+    }
+
+    text = json.dumps(report, indent=2)
+    if args.output == "-":
+        print(text)
+    else:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""
+Router 부하 벤치마크
+
+    python -m tests.benchmarks.bench_router --sessions 50 --requests 5 --llm-latency lognormal:0.2,0.5
+
+stub 모델/플러그인(tests/benchmarks/stubs.py)을 설치한 뒤 main.app을 uvicorn으로 같은 프로세스에서 띄우고,
+N개의 WebSocket 세션이 /ws로 요청을 보내 ExecutionAgent 결과(또는 error)를 받을 때까지의 시간을 잰다.
+requests/sec, p50/p95/p99 latency, event loop lag, 세션 lock 대기 시간, 세션당 메모리를 JSON으로 출력한다.
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import platform
+import resource
+import socket
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Dict, List
+
+import aiohttp
+
+from tests.benchmarks import stubs
+
+
+def percentile(samples: List[float], q: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(q / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    return {
+        "count": len(samples),
+        "mean": statistics.fmean(samples) if samples else 0.0,
+        "p50": percentile(samples, 50),
+        "p95": percentile(samples, 95),
+        "p99": percentile(samples, 99),
+        "max": max(samples, default=0.0),
+    }
+
+
+async def monitor_loop_lag(interval: float, lags: List[float], stop: asyncio.Event) -> None:
+    """interval마다 깨어나도록 예약하고, 실제로 늦게 깨어난 시간을 event loop lag으로 기록"""
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, time.perf_counter() - started - interval))
+
+
+async def run_session(
+    http: aiohttp.ClientSession,
+    url: str,
+    session_index: int,
+    requests: int,
+    timeout: float,
+    latencies: List[float],
+    errors: List[str],
+) -> None:
+    async with http.ws_connect(url) as ws:
+        for i in range(requests):
+            # 요청 내용이 같으면 plan cache에 걸려 LLM 지연이 측정되지 않으므로 세션/순번을 넣는다
+            content = f"weather for city-{session_index}-{i}"
+            started = time.perf_counter()
+            await ws.send_str(json.dumps({"content": content}))
+
+            try:
+                while True:
+                    frame = await ws.receive_json(timeout=timeout)
+                    if "error" in frame:
+                        errors.append(frame["error"])
+                        break
+                    if "ExecutionAgent" in frame:
+                        break
+            except (asyncio.TimeoutError, TypeError, ValueError) as e:
+                errors.append(f"session {session_index} request {i}: {e!r}")
+                continue
+
+            latencies.append(time.perf_counter() - started)
+
+
+async def run(args: argparse.Namespace) -> dict:
+    stubs.install(llm=args.llm_latency, local=args.local_latency, plugin=args.plugin_latency, seed=args.seed)
+    import main
+    import uvicorn
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    config = uvicorn.Config(main.app, host="127.0.0.1", port=port, log_level="warning", lifespan="on")
+    server = uvicorn.Server(config)
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+
+    lags: List[float] = []
+    latencies: List[float] = []
+    errors: List[str] = []
+    stop = asyncio.Event()
+    lag_task = asyncio.create_task(monitor_loop_lag(args.lag_interval, lags, stop))
+
+    if args.trace_memory:
+        tracemalloc.start()
+    memory_before = tracemalloc.get_traced_memory()[0] if args.trace_memory else 0
+
+    url = f"http://127.0.0.1:{port}/ws"
+    started = time.perf_counter()
+    connector = aiohttp.TCPConnector(limit=0)
+    async with aiohttp.ClientSession(connector=connector) as http:
+        await asyncio.gather(
+            *(
+                run_session(http, url, index, args.requests, args.timeout, latencies, errors)
+                for index in range(args.sessions)
+            )
+        )
+    elapsed = time.perf_counter() - started
+
+    memory_after = tracemalloc.get_traced_memory()[0] if args.trace_memory else 0
+    peak = tracemalloc.get_traced_memory()[1] if args.trace_memory else 0
+    if args.trace_memory:
+        tracemalloc.stop()
+
+    stop.set()
+    await lag_task
+    sessions_held = len(main.router.sessions)
+    lock_stats = main.router.lock_stats()
+    server.should_exit = True
+    await server_task
+
+    return {
+        "benchmark": "router",
+        "python": platform.python_version(),
+        "config": {
+            "sessions": args.sessions,
+            "requests_per_session": args.requests,
+            "llm_latency": args.llm_latency,
+            "local_latency": args.local_latency,
+            "plugin_latency": args.plugin_latency,
+            "seed": args.seed,
+        },
+        "elapsed": elapsed,
+        "completed": len(latencies),
+        "errors": len(errors),
+        "error_samples": errors[:5],
+        "requests_per_sec": len(latencies) / elapsed if elapsed else 0.0,
+        "latency": summarize(latencies),
+        "event_loop_lag": summarize(lags),
+        "session_locks": lock_stats,
+        "memory": {
+            "router_sessions": sessions_held,
+            "traced_growth_bytes": memory_after - memory_before,
+            "traced_peak_bytes": peak,
+            "bytes_per_session": (memory_after - memory_before) / args.sessions if args.trace_memory else None,
+            "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        },
+    }
+
+
+def main(argv: List[str] | None = None) -> dict:
+    parser = argparse.ArgumentParser(description="Router load benchmark")
+    parser.add_argument("--sessions", type=int, default=20, help="동시 WebSocket 세션 수")
+    parser.add_argument("--requests", type=int, default=5, help="세션당 순차 요청 수")
+    parser.add_argument("--llm-latency", default="lognormal:0.2,0.3", help="PlanningAgent(Gemini) 지연 분포")
+    parser.add_argument("--local-latency", default="const:0.05", help="ToolSelectorAgent(llama.cpp) 지연 분포")
+    parser.add_argument("--plugin-latency", default="uniform:0.01,0.05", help="플러그인 실행 지연 분포")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=60.0, help="요청 하나의 최대 대기 시간(초)")
+    parser.add_argument("--lag-interval", type=float, default=0.01)
+    parser.add_argument("--no-trace-memory", dest="trace_memory", action="store_false")
+    parser.add_argument("--verbose", action="store_true", help="서버 쪽 print 출력을 그대로 보여준다")
+    parser.add_argument("--output", default="-", help="결과 JSON 경로 (- 이면 stdout)")
+    args = parser.parse_args(argv)
+
+    # 서버 코드의 디버깅 print가 측정을 방해하지 않도록 기본적으로 버린다
+    with contextlib.redirect_stdout(sys.stdout if args.verbose else io.StringIO()):
+        report = asyncio.run(run(args))
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output == "-":
+        print(text)
+    else:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import random
+from typing import Callable, Dict, List
+
+from scheme.a2a_message import AgentMessage
+from scheme.mcp import MCPRequest, MCPRequestMessage
+from utils.constant import FAIL, SUCCESS
+
+RECEIVERS = ["ToolSelectorAgent", "WeatherToolAgent", "ScheduleRecommenderAgent", "user"]
+
+
+def make_goal(step_id: int, dag: int, rng: random.Random) -> AgentMessage:
+    return AgentMessage(
+        id=step_id,
+        sender="PlanningAgent",
+        receiver=rng.choice(RECEIVERS),
+        dag=dag,
+        payload=[MCPRequest[dict](content=[MCPRequestMessage[dict](content=f"step-{step_id}", metadata={})])],
+        stop_reason=SUCCESS if rng.random() > 0.1 else FAIL,
+    )
+
+
+def chain(size: int, rng: random.Random) -> List[AgentMessage]:
+    """0 -> 1 -> 2 -> ... 한 줄로 이어진 DAG"""
+    return [make_goal(i, i - 1 if i else -1, rng) for i in range(size)]
+
+
+def fan_out(size: int, rng: random.Random) -> List[AgentMessage]:
+    """root 하나에 나머지 goal이 모두 매달린 DAG"""
+    return [make_goal(i, 0 if i else -1, rng) for i in range(size)]
+
+
+def diamond(size: int, rng: random.Random) -> List[AgentMessage]:
+    """
+    root -> 중간 goal들 -> sink 형태의 diamond를 이어 붙인 DAG
+    AgentMessage.dag는 부모를 하나만 가지므로 sink는 중간 goal 중 마지막 것에 연결한다.
+    """
+    goals: List[AgentMessage] = []
+    parent = -1
+    width = 4
+    while len(goals) < size:
+        root = len(goals)
+        goals.append(make_goal(root, parent, rng))
+        middle = [make_goal(root + 1 + k, root, rng) for k in range(min(width, size - len(goals)))]
+        goals.extend(middle)
+        if len(goals) < size:
+            sink = len(goals)
+            goals.append(make_goal(sink, middle[-1].id, rng))
+            parent = sink
+    return goals
+
+
+def random_dag(size: int, rng: random.Random) -> List[AgentMessage]:
+    """각 goal이 자신보다 앞선 임의의 goal(또는 root)을 부모로 갖는 DAG, 순서는 섞어서 반환"""
+    goals = [make_goal(i, rng.randrange(-1, i) if i else -1, rng) for i in range(size)]
+    rng.shuffle(goals)
+    return goals
+
+
+GENERATORS: Dict[str, Callable[[int, random.Random], List[AgentMessage]]] = {
+    "chain": chain,
+    "fan_out": fan_out,
+    "diamond": diamond,
+    "random": random_dag,
+}
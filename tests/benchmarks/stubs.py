@@ -0,0 +1,191 @@
+"""
+Router 부하 측정용 결정적(deterministic) stand-in
+
+Gemini(ApiModel), llama.cpp(Model), 플러그인을 설정 가능한 지연 분포를 가진 가짜 구현으로 바꾼다.
+install()은 main을 import하기 전에 호출해야 한다.
+
+    from tests.benchmarks import stubs
+    stubs.install(llm="lognormal:0.2,0.5", local="const:0.05", plugin="uniform:0.01,0.03")
+    import main
+"""
+import asyncio
+import json
+import math
+import os
+import random
+import sys
+import tempfile
+from typing import Any, AsyncGenerator, List
+
+from plugin.base import BaseAgent
+from scheme.a2a_message import AgentMessage
+from scheme.mcp import MCPRequest, MCPRequestMessage
+from utils.constant import SUCCESS
+
+
+class Latency:
+    """
+        "const:0.05", "uniform:0.01,0.05", "exp:0.05"(평균), "lognormal:0.05,0.5"(중앙값, sigma)
+        형식의 지연 분포. 같은 seed면 같은 순서의 지연을 만든다.
+    """
+
+    def __init__(self, spec: str = "const:0", seed: int = 0):
+        kind, _, args = spec.partition(":")
+        self.spec = spec
+        self.kind = kind
+        self.args = [float(arg) for arg in args.split(",") if arg]
+        self.rng = random.Random(seed)
+
+        if kind not in ("const", "uniform", "exp", "lognormal"):
+            raise ValueError(f"알 수 없는 지연 분포입니다: {spec}")
+
+    def sample(self) -> float:
+        if self.kind == "const":
+            return self.args[0] if self.args else 0.0
+        if self.kind == "uniform":
+            return self.rng.uniform(self.args[0], self.args[1])
+        if self.kind == "exp":
+            return self.rng.expovariate(1 / self.args[0]) if self.args[0] > 0 else 0.0
+        return self.rng.lognormvariate(math.log(self.args[0]), self.args[1])
+
+    async def wait(self) -> None:
+        await asyncio.sleep(self.sample())
+
+
+LATENCY = {
+    "llm": Latency(),
+    "local": Latency(),
+    "plugin": Latency(),
+}
+
+
+class StubApiModel:
+    """PlanningAgent용 ApiModel 대체: 요청마다 '도구 실행 -> user 응답' 2단계 plan을 돌려준다."""
+
+    def __init__(self, provider: str = "gemini", api_key: str = "", model_name: str = "", **kwargs):
+        self.provider = provider
+        self.model_name = model_name
+        self._stats = {"requests": 0, "in_flight": 0}
+
+    async def start(self) -> None:
+        return None
+
+    async def close(self) -> None:
+        return None
+
+    def pool_stats(self) -> dict:
+        return dict(self._stats)
+
+    async def ask(self, prompt: str, request: Any = "", request_sender: str = "") -> List[AgentMessage]:
+        self._stats["requests"] += 1
+        self._stats["in_flight"] += 1
+        try:
+            await LATENCY["llm"].wait()
+        finally:
+            self._stats["in_flight"] -= 1
+
+        content = " ".join(request) if isinstance(request, list) else str(request)
+        return [
+            AgentMessage(
+                id=0,
+                sender=request_sender,
+                receiver="ToolSelectorAgent",
+                dag=-1,
+                payload=[MCPRequest[dict](content=[MCPRequestMessage[dict](content=content, metadata={"city": "seoul"})])],
+            ),
+            AgentMessage(
+                id=1,
+                sender=request_sender,
+                receiver="user",
+                dag=0,
+                payload=[MCPRequest[dict](content=[MCPRequestMessage[dict](content=f"answer {content}", metadata={})])],
+            ),
+        ]
+
+
+    async def stream(self, prompt: str, request: Any = "") -> AsyncGenerator[str, None]:
+        plan = await self.ask(prompt, request, request_sender="PlanningAgent")
+        yield json.dumps([message.model_dump() for message in plan])
+
+    async def ask_stream(self, prompt: str, request: Any = "", request_sender: str = "") -> AsyncGenerator[AgentMessage, None]:
+        for message in await self.ask(prompt, request, request_sender):
+            yield message
+
+
+class StubModel:
+    """ToolSelectorAgent용 Model 대체: 항상 StubToolAgent를 고른다."""
+
+    def __init__(self, model: str = "", prompt: str = "", **kwargs):
+        self.model = model
+
+    async def ask(self, prompt: str = "", request: str = "", cache_version: str = "") -> List[MCPRequest[Any]]:
+        await LATENCY["local"].wait()
+        return [
+            MCPRequest[dict](
+                content=[MCPRequestMessage[dict](content=request, metadata={"city": "seoul"})],
+                selected_tool=StubToolAgent.plugin_name(),
+            )
+        ]
+
+    async def stream(self, prompt: str = "", request: str = "", cache_version: str = "") -> AsyncGenerator[str, None]:
+        for response in await self.ask(prompt, request, cache_version):
+            yield json.dumps({"selected_tool": response.selected_tool, "content": request, "metadata": {"city": "seoul"}})
+
+    def close(self) -> None:
+        return None
+
+
+class StubToolAgent(BaseAgent):
+    description = "stub tool for router load benchmarks"
+
+    @staticmethod
+    def plugin_name():
+        return "StubToolAgent"
+
+    async def run(self, input_data: MCPRequestMessage):
+        self.increment_count()
+        await LATENCY["plugin"].wait()
+        return MCPRequest[dict](
+            content=[MCPRequestMessage[dict](content=f"stub result: {input_data.content}", metadata=input_data.metadata)],
+            selected_tool=self.plugin_name(),
+            stop_reason=SUCCESS,
+        )
+
+
+def install(llm: str = "const:0", local: str = "const:0", plugin: str = "const:0", seed: int = 0) -> None:
+    """
+    모델/플러그인을 stub으로 교체합니다. 실제 플러그인 디렉터리는 스캔하지 않으므로
+    OpenWeather 등 외부 API는 호출되지 않습니다.
+    """
+    if "main" in sys.modules or "router" in sys.modules:
+        raise RuntimeError("stubs.install()은 main/router를 import하기 전에 호출해야 합니다.")
+
+    LATENCY["llm"] = Latency(llm, seed)
+    LATENCY["local"] = Latency(local, seed + 1)
+    LATENCY["plugin"] = Latency(plugin, seed + 2)
+
+    # ToolSelectorAgent는 모델 경로를 환경 변수로 조립하므로 값만 채워 둔다
+    os.environ.setdefault("LOCAL_DIR", "stub")
+    os.environ.setdefault("LOCAL_MODEL", "stub")
+    os.environ.setdefault("LOCAL_MODEL_NAME", "stub.gguf")
+    # 벤치마크가 작업 트리의 manifest(data/)를 만들거나 덮어쓰지 않도록 임시 경로를 쓴다
+    os.environ.setdefault("PLUGIN_MANIFEST_PATH", os.path.join(tempfile.mkdtemp(prefix="bench-"), "plugin_manifest.json"))
+    # 실제 plugins 디렉터리를 다시 등록하지 않도록 hot reload를 끈다
+    os.environ["PLUGIN_WATCH_INTERVAL"] = "0"
+
+    import models.model
+    import plugin.manager
+    from plugin.registry import PLUGIN_REGISTRY
+
+    models.model.ApiModel = StubApiModel
+    models.model.Model = StubModel
+    for module_name, attr, stub in (
+        ("agent.planning_agent", "ApiModel", StubApiModel),
+        ("agent.tool_agent", "Model", StubModel),
+    ):
+        if module_name in sys.modules:
+            setattr(sys.modules[module_name], attr, stub)
+
+    plugin.manager.register_scan_directory = lambda path: None
+    PLUGIN_REGISTRY.clear()
+    PLUGIN_REGISTRY[StubToolAgent.plugin_name()] = f"{__name__}.{StubToolAgent.__name__}"
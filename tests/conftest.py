@@ -0,0 +1,9 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def plugin_manifest_path(tmp_path, monkeypatch):
+    # 플러그인 스캔 manifest가 작업 트리(data/)에 기록되지 않도록 테스트마다 임시 경로를 쓴다
+    path = tmp_path / "plugin_manifest.json"
+    monkeypatch.setenv("PLUGIN_MANIFEST_PATH", str(path))
+    return path
@@ -0,0 +1,66 @@
+import json
+import random
+import subprocess
+import sys
+
+import pytest
+
+from tests.benchmarks import bench_planner, stubs
+from tests.benchmarks.dag import GENERATORS
+
+
+def test_dag_generators_build_valid_dags():
+    for shape, generate in GENERATORS.items():
+        goals = generate(50, random.Random(0))
+        ids = {goal.id for goal in goals}
+
+        assert len(goals) == 50, shape
+        assert len(ids) == 50, shape
+        assert all(goal.dag == -1 or goal.dag in ids for goal in goals), shape
+
+
+def test_bench_planner_reports_every_case(tmp_path):
+    output = tmp_path / "planner.json"
+    report = bench_planner.main(
+        ["--sizes", "5", "--repeat", "1", "--max-iter", "2", "--output", str(output)]
+    )
+
+    assert output.exists()
+    assert [(case["shape"], case["size"]) for case in report["results"]] == [(shape, 5) for shape in GENERATORS]
+    assert all(case["planned_steps"] == 5 for case in report["results"])
+    assert all(case["planner_run"]["peak_bytes"] > 0 for case in report["results"])
+
+
+def test_latency_distributions_are_deterministic():
+    for spec in ("const:0.05", "uniform:0.01,0.05", "exp:0.05", "lognormal:0.05,0.5"):
+        first = [stubs.Latency(spec, seed=3).sample() for _ in range(5)]
+        second = [stubs.Latency(spec, seed=3).sample() for _ in range(5)]
+
+        assert first == second, spec
+        assert all(sample >= 0 for sample in first), spec
+
+    with pytest.raises(ValueError):
+        stubs.Latency("normal:1")
+
+
+def test_bench_router_drives_websocket_sessions(tmp_path):
+    pytest.importorskip("uvicorn")
+    output = tmp_path / "router.json"
+
+    # stub 설치가 전역 모듈을 바꾸므로 별도 프로세스에서 실행
+    subprocess.run(
+        [
+            sys.executable, "-m", "tests.benchmarks.bench_router",
+            "--sessions", "2", "--requests", "1",
+            "--llm-latency", "const:0", "--local-latency", "const:0", "--plugin-latency", "const:0",
+            "--timeout", "20", "--output", str(output),
+        ],
+        check=True,
+        capture_output=True,
+        timeout=120,
+    )
+
+    report = json.loads(output.read_text(encoding="utf-8"))
+    assert report["completed"] == 2
+    assert report["errors"] == 0
+    assert report["latency"]["p99"] > 0
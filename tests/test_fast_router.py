@@ -0,0 +1,48 @@
+import json
+
+import pytest
+
+from agent.fast_router import FastToolRouter
+
+
+def _profile(name: str, stem: str) -> dict:
+    with open(f"plugins/{stem}.json", encoding="utf-8") as f:
+        schema = json.load(f)
+    with open(f"plugins/{stem}.md", encoding="utf-8") as f:
+        description = f.read()
+    return {"name": name, "schema": schema, "description": description}
+
+
+@pytest.fixture
+def fast_router():
+    return FastToolRouter([
+        _profile("WeatherToolAgent", "weather"),
+        _profile("ScheduleRecommendAgent", "schedule_recommend"),
+    ])
+
+
+def test_fast_router_selects_tool_by_capability(fast_router):
+    results = fast_router.select("What is the weather in Seoul", {"city": "Seoul", "date": "20240506", "note": "x"})
+
+    assert results[0].selected_tool == "WeatherToolAgent"
+    # 스키마에 없는 키는 넘기지 않는다
+    assert results[0].content[0].metadata == {"city": "Seoul", "date": "20240506"}
+
+
+def test_fast_router_ignores_metadata_only_and_example_matches(fast_router):
+    # city 키와 설명 예시 속 "Seoul"만 겹치는 요청은 LLM에 넘긴다
+    assert fast_router.select("find a restaurant in Seoul", {"city": "Seoul"}) is None
+    assert fast_router.select("sunny day in Seoul", {}) is None
+
+
+def test_fast_router_passes_metadata_to_schemaless_plugin():
+    router = FastToolRouter([
+        _profile("WeatherToolAgent", "weather"),
+        {"name": "ReserveAgent", "schema": "", "description": ""},
+    ])
+
+    results = router.select("reserve a table for two", {"time": "19:00", "people": "2"})
+
+    assert results[0].selected_tool == "ReserveAgent"
+    # 스키마가 없으면 어떤 키가 파라미터인지 알 수 없으므로 걸러내지 않는다
+    assert results[0].content[0].metadata == {"time": "19:00", "people": "2"}
@@ -0,0 +1,35 @@
+import asyncio
+import threading
+
+from utils.http import HttpClient
+
+
+def test_http_client_keeps_one_session_per_loop_and_closes_all():
+    client = HttpClient()
+    other = asyncio.new_event_loop()
+    thread = threading.Thread(target=other.run_forever, daemon=True)
+    thread.start()
+
+    try:
+        other_session = asyncio.run_coroutine_threadsafe(client.start(), other).result(timeout=5)
+
+        async def main():
+            session = await client.start()
+            # 다른 루프의 session을 바꾸거나 버리지 않는다
+            assert session is not other_session
+            assert await client.start() is session
+            assert not other_session.closed
+
+            await client.close()
+            return session
+
+        session = asyncio.run(main())
+
+        # 다른 루프의 session도 자기 루프에서 닫힌다
+        assert session.closed
+        assert other_session.closed
+        assert client.pool_stats()["open"] is False
+    finally:
+        other.call_soon_threadsafe(other.stop)
+        thread.join(timeout=5)
+        other.close()
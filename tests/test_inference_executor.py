@@ -0,0 +1,84 @@
+import asyncio
+import time
+
+import pytest
+
+from models.executor import InferenceExecutor
+
+
+class SlowReplica:
+    def __call__(self, prompt: str, delay: float) -> str:
+        time.sleep(delay)
+        return prompt.upper()
+
+
+def _generate(replica: SlowReplica, prompt: str, delay: float = 0.2) -> str:
+    return replica(prompt, delay)
+
+
+@pytest.mark.asyncio
+async def test_executor_keeps_event_loop_responsive():
+    executor = InferenceExecutor(SlowReplica, replicas=2)
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    tick_task = asyncio.create_task(ticker())
+    started = time.perf_counter()
+    results = await asyncio.gather(
+        executor.submit(_generate, "seoul"),
+        executor.submit(_generate, "busan"),
+    )
+    elapsed = time.perf_counter() - started
+    tick_task.cancel()
+    executor.shutdown()
+
+    assert results == ["SEOUL", "BUSAN"]
+    assert elapsed < 0.35
+    assert ticks > 5
+
+
+@pytest.mark.asyncio
+async def test_executor_rejects_when_queue_is_full():
+    executor = InferenceExecutor(SlowReplica, replicas=1, max_pending=1)
+
+    first = asyncio.create_task(executor.submit(_generate, "seoul"))
+    await asyncio.sleep(0)
+
+    with pytest.raises(RuntimeError):
+        await executor.submit(_generate, "busan")
+
+    assert await first == "SEOUL"
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_executor_applies_request_timeout():
+    executor = InferenceExecutor(SlowReplica, replicas=1, timeout=0.05)
+
+    with pytest.raises(TimeoutError):
+        await executor.submit(_generate, "seoul", 0.3)
+
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_executor_counts_timed_out_job_until_it_finishes():
+    executor = InferenceExecutor(SlowReplica, replicas=1, max_pending=1, timeout=0.05)
+
+    with pytest.raises(TimeoutError):
+        await executor.submit(_generate, "seoul", 0.3)
+
+    # timeout이 나도 워커는 아직 생성 중이므로 슬롯을 반납하지 않는다
+    assert executor.pending == 1
+    with pytest.raises(RuntimeError):
+        await executor.submit(_generate, "busan", 0.0)
+
+    await asyncio.sleep(0.35)
+    assert executor.pending == 0
+    assert await executor.submit(_generate, "busan", 0.0) == "BUSAN"
+    executor.shutdown()
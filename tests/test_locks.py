@@ -0,0 +1,63 @@
+import asyncio
+
+import pytest
+
+from utils.locks import KeyedLock
+
+
+@pytest.mark.asyncio
+async def test_different_keys_do_not_wait_for_each_other():
+    locks = KeyedLock()
+    entered = asyncio.Event()
+    release = asyncio.Event()
+
+    async def hold(key):
+        async with locks(key):
+            entered.set()
+            await release.wait()
+
+    holder = asyncio.create_task(hold("a"))
+    await entered.wait()
+
+    # a가 잡혀 있어도 b는 바로 얻을 수 있다
+    async with locks("b"):
+        pass
+
+    release.set()
+    await holder
+    assert locks.stats()["contended"] == 0
+    assert locks.stats()["active_keys"] == 0
+
+
+@pytest.mark.asyncio
+async def test_same_key_is_serialized_and_wait_is_recorded():
+    locks = KeyedLock(warn_after=0.01)
+    order = []
+
+    async def work(name):
+        async with locks("session"):
+            order.append(f"{name}-start")
+            await asyncio.sleep(0.05)
+            order.append(f"{name}-end")
+
+    await asyncio.gather(work("first"), work("second"))
+
+    assert order == ["first-start", "first-end", "second-start", "second-end"]
+    stats = locks.stats()
+    assert stats["acquired"] == 2
+    assert stats["contended"] == 1
+    assert stats["wait_max"] >= 0.04
+    assert stats["active_keys"] == 0
+
+
+@pytest.mark.asyncio
+async def test_lock_is_released_on_error():
+    locks = KeyedLock()
+
+    with pytest.raises(RuntimeError):
+        async with locks("a"):
+            raise RuntimeError("boom")
+
+    async with locks("a"):
+        pass
+    assert locks.stats()["active_keys"] == 0
@@ -0,0 +1,270 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+import models.model as model_module
+from models.model import Model
+
+
+class FakeLlama:
+    instances = []
+
+    def __init__(self, *args, **kwargs):
+        self.prefix_evals = 0
+        self.completions = []
+        self.tokens = []
+        FakeLlama.instances.append(self)
+
+    def tokenize(self, text: bytes):
+        return list(text)
+
+    def reset(self):
+        self.tokens = []
+
+    def eval(self, tokens):
+        self.prefix_evals += 1
+        self.tokens.extend(tokens)
+
+    def save_state(self):
+        return list(self.tokens)
+
+    def load_state(self, state):
+        self.tokens = list(state)
+
+    def __call__(self, prompt, **kwargs):
+        # 복원된 prefix 상태 위에서만 생성되어야 한다
+        assert bytes(self.tokens) == prompt.encode("utf-8")[: len(self.tokens)]
+        self.completions.append(prompt)
+        text = json.dumps({"selected_tool": "WeatherToolAgent", "content": prompt.split()[-2], "metadata": {}})
+        if kwargs.get("stream"):
+            return self._stream(text)
+        time.sleep(0.01)
+        return {"choices": [{"text": text}]}
+
+    def _stream(self, text):
+        self.streamed = 0
+        for i in range(0, len(text), 4):
+            self.streamed += 1
+            time.sleep(0.001)
+            yield {"choices": [{"text": text[i:i + 4]}]}
+
+
+@pytest.fixture
+def model(monkeypatch):
+    FakeLlama.instances = []
+    monkeypatch.setattr(model_module, "Llama", FakeLlama)
+    model = Model("fake.gguf")
+    yield model
+    model.executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_asks_share_one_prefix_evaluation(model):
+    results = await asyncio.gather(*[model.ask("tools list", f"query-{i}") for i in range(3)])
+
+    replica = FakeLlama.instances[0]
+    assert replica.prefix_evals == 1
+    assert len(replica.completions) == 3
+    assert [r[0].content[0].content for r in results] == ["query-0", "query-1", "query-2"]
+
+
+@pytest.mark.asyncio
+async def test_different_system_prompts_are_batched_separately(model):
+    await asyncio.gather(model.ask("planner", "a"), model.ask("tools list", "b"))
+
+    assert FakeLlama.instances[0].prefix_evals == 2
+
+
+@pytest.mark.asyncio
+async def test_prefix_state_is_reused_until_version_changes(model):
+    await model.ask("tools list", "a", cache_version="v1")
+    await model.ask("tools list", "b", cache_version="v1")
+    assert FakeLlama.instances[0].prefix_evals == 1
+
+    await model.ask("tools list", "c", cache_version="v2")
+    assert FakeLlama.instances[0].prefix_evals == 2
+    assert model.prefix_cache.hits == 1
+
+
+@pytest.mark.asyncio
+async def test_prefix_state_warm_loads_from_disk(monkeypatch, tmp_path):
+    monkeypatch.setattr(model_module, "Llama", FakeLlama)
+    FakeLlama.instances = []
+
+    first = Model("fake.gguf", prefix_cache_dir=str(tmp_path))
+    await first.ask("tools list", "a", cache_version="v1")
+    first.executor.shutdown()
+
+    restarted = Model("fake.gguf", prefix_cache_dir=str(tmp_path))
+    await restarted.ask("tools list", "b", cache_version="v1")
+    restarted.executor.shutdown()
+
+    assert FakeLlama.instances[0].prefix_evals == 1
+    assert FakeLlama.instances[1].prefix_evals == 0
+
+
+@pytest.mark.asyncio
+async def test_api_model_reuses_pooled_connection():
+    from aiohttp import web
+
+    from models.model import ApiModel
+
+    plan = [{"id": 0, "receiver": "ToolSelectorAgent", "dag": -1, "payload": [{"content": "weather", "metadata": {"city": "Seoul"}}]}]
+
+    async def generate_content(request):
+        return web.json_response({"candidates": [{"content": {"parts": [{"text": json.dumps(plan)}]}}]})
+
+    app = web.Application()
+    app.router.add_post("/v1beta/models/{model}", generate_content)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    model = ApiModel("gemini", "key", "stub", base_url=f"http://127.0.0.1:{port}/v1beta")
+    try:
+        for _ in range(3):
+            messages = await model.ask("plan", "weather in Seoul", request_sender="PlanningAgent")
+            assert messages[0].receiver == "ToolSelectorAgent"
+    finally:
+        stats = model.pool_stats()
+        await model.close()
+        await runner.cleanup()
+
+    assert stats["requests"] == 3
+    assert stats["connections_created"] == 1
+    assert stats["connections_reused"] == 2
+    assert stats["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_model_stream_yields_chunks_from_worker(model):
+    chunks = [chunk async for chunk in model.stream("system", "weather Seoul", cache_version="v1")]
+
+    assert len(chunks) > 1
+    parsed = json.loads("".join(chunks))
+    assert parsed["selected_tool"] == "WeatherToolAgent"
+    # 스트리밍도 prefix 상태를 재사용한다
+    await model.ask("system", "weather Busan", cache_version="v1")
+    assert FakeLlama.instances[0].prefix_evals == 1
+
+
+@pytest.mark.asyncio
+async def test_model_stream_stops_worker_when_consumer_stops(model):
+    stream = model.stream("system", "weather Seoul")
+    async for _ in stream:
+        break
+    await stream.aclose()
+
+    # 워커가 끝날 때까지 기다린 뒤 생성된 조각 수를 확인
+    await model.executor.submit(lambda replica: None)
+    llama = FakeLlama.instances[0]
+    assert llama.streamed < len(json.dumps({"selected_tool": "WeatherToolAgent", "content": "Seoul", "metadata": {}})) // 4
+
+
+@pytest.mark.asyncio
+async def test_api_model_streams_plan_steps_before_response_ends():
+    from aiohttp import web
+
+    from models.model import ApiModel
+
+    plan = json.dumps([
+        {"id": 0, "receiver": "ToolSelectorAgent", "dag": -1, "payload": [{"content": "weather", "metadata": {"city": "Seoul"}}]},
+        {"id": 1, "receiver": "user", "dag": 0, "payload": [{"content": "answer", "metadata": {}}]},
+    ])
+    split = plan.index('{"id": 1')
+    first_step_received = asyncio.Event()
+
+    async def stream_generate_content(request):
+        assert request.query["alt"] == "sse"
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        for text in (plan[:split], plan[split:]):
+            event = {"candidates": [{"content": {"parts": [{"text": text}]}}]}
+            await response.write(f"data: {json.dumps(event)}\r\n\r\n".encode("utf-8"))
+            # 첫 step을 클라이언트가 받은 뒤에야 나머지를 보낸다
+            await asyncio.wait_for(first_step_received.wait(), timeout=5)
+        await response.write_eof()
+        return response
+
+    app = web.Application()
+    app.router.add_post("/v1beta/models/{model}", stream_generate_content)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    model = ApiModel("gemini", "key", "stub", base_url=f"http://127.0.0.1:{port}/v1beta")
+    steps = []
+    try:
+        async for step in model.ask_stream("plan", "weather in Seoul", request_sender="PlanningAgent"):
+            steps.append(step)
+            first_step_received.set()
+    finally:
+        stats = model.pool_stats()
+        await model.close()
+        await runner.cleanup()
+
+    assert [(step.id, step.receiver) for step in steps] == [(0, "ToolSelectorAgent"), (1, "user")]
+    assert stats["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_batched_prompts_spread_across_replicas(monkeypatch):
+    monkeypatch.setattr(model_module, "Llama", FakeLlama)
+    FakeLlama.instances = []
+    model = Model("fake.gguf", replicas=2)
+
+    try:
+        await asyncio.gather(*[model.ask("tools list", f"query-{i}") for i in range(4)])
+    finally:
+        model.executor.shutdown()
+
+    # 배치가 한 replica에 몰리지 않고, prefix는 replica 전체에서 한 번만 평가된다
+    assert all(replica.completions for replica in FakeLlama.instances)
+    assert sum(len(replica.completions) for replica in FakeLlama.instances) == 4
+    assert sum(replica.prefix_evals for replica in FakeLlama.instances) == 1
+
+
+@pytest.mark.asyncio
+async def test_batched_prompts_run_as_one_job_per_replica(model, monkeypatch):
+    jobs = []
+    submit = model.executor.submit
+
+    async def counting_submit(fn, *args, **kwargs):
+        jobs.append(args[2])
+        return await submit(fn, *args, **kwargs)
+
+    monkeypatch.setattr(model.executor, "submit", counting_submit)
+    results = await asyncio.gather(*[model.ask("tools list", f"query-{i}") for i in range(3)])
+
+    # replica가 하나이므로 모은 prompt 3개가 한 작업에서 차례로 생성된다
+    assert len(jobs) == 1 and len(jobs[0]) == 3
+    assert [r[0].content[0].content for r in results] == ["query-0", "query-1", "query-2"]
+
+
+@pytest.mark.asyncio
+async def test_prefix_state_is_not_shared_across_models(monkeypatch, tmp_path):
+    monkeypatch.setattr(model_module, "Llama", FakeLlama)
+    FakeLlama.instances = []
+    model_path = tmp_path / "model.gguf"
+    model_path.write_bytes(b"v1")
+
+    first = Model(str(model_path), prefix_cache_dir=str(tmp_path / "cache"))
+    await first.ask("tools list", "a", cache_version="v1")
+    first.executor.shutdown()
+
+    # 모델 파일이나 n_ctx가 바뀌면 저장된 KV 상태를 불러오지 않는다
+    model_path.write_bytes(b"v2-larger")
+    changed = Model(str(model_path), prefix_cache_dir=str(tmp_path / "cache"))
+    other_ctx = Model(str(model_path), prefix_cache_dir=str(tmp_path / "cache"), n_ctx=4096)
+    try:
+        assert len(changed.prefix_cache) == 0
+        assert len(other_ctx.prefix_cache) == 0
+    finally:
+        changed.executor.shutdown()
+        other_ctx.executor.shutdown()
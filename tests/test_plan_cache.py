@@ -0,0 +1,84 @@
+import sqlite3
+import time
+
+from agent.plan_cache import PlanCache
+from scheme.a2a_message import AgentMessage
+from scheme.mcp import MCPRequest, MCPRequestMessage
+from utils.cache import TTLCache
+
+
+def _plan():
+    return [
+        AgentMessage(
+            id=0,
+            sender="PlanningAgent",
+            receiver="ToolSelectorAgent",
+            dag=-1,
+            payload=[MCPRequest(content=[MCPRequestMessage(content="Seoul weather", metadata={"city": "Seoul"})])],
+        )
+    ]
+
+
+def test_plan_cache_matches_normalized_request():
+    cache = PlanCache()
+    plan = _plan()
+    cache.put("Weather in Seoul and a schedule", plan)
+
+    cached = cache.get("  weather in seoul   and a SCHEDULE!")
+
+    assert [m.model_dump() for m in cached] == [m.model_dump() for m in plan]
+    # 캐시에서 꺼낸 plan은 매번 새 인스턴스여야 한다
+    assert cached[0] is not plan[0]
+    assert cache.get("Weather in Seoul and a schedule")[0] is not cached[0]
+
+
+def test_plan_cache_expires_after_ttl():
+    cache = PlanCache(ttl=0.05)
+    cache.put("weather in seoul", _plan())
+
+    time.sleep(0.1)
+
+    assert cache.get("weather in seoul") is None
+
+
+def test_plan_cache_persists_to_sqlite(tmp_path):
+    path = str(tmp_path / "plans.db")
+    PlanCache(path=path).put("weather in seoul", _plan())
+
+    cached = PlanCache(path=path).get("Weather in Seoul")
+
+    assert cached[0].payload[0].content[0].metadata == {"city": "Seoul"}
+
+
+def test_ttl_cache_evicts_least_recently_used_by_bytes():
+    cache = TTLCache(max_entries=10, max_bytes=10, sizeof=len)
+    cache.set("a", "aaaa")
+    cache.set("b", "bbbb")
+    cache.get("a")
+    cache.set("c", "cccc")
+
+    assert "a" in cache and "c" in cache
+    assert "b" not in cache
+    assert cache.bytes == 8
+
+
+def test_plan_cache_counts_one_miss_per_get():
+    cache = PlanCache()
+    cache.put("weather in seoul", _plan())
+
+    assert cache.get("schedule for busan") is None
+    assert cache.get("Weather in Seoul!") is not None
+
+    assert cache.misses == 1
+    assert cache.hits == 1
+
+
+def test_plan_cache_prunes_expired_rows(tmp_path):
+    path = str(tmp_path / "plans.db")
+    PlanCache(path=path, ttl=0.05).put("weather in seoul", _plan())
+
+    time.sleep(0.1)
+    PlanCache(path=path, ttl=0.05)
+
+    with sqlite3.connect(path) as db:
+        assert db.execute("SELECT COUNT(*) FROM plans").fetchone()[0] == 0
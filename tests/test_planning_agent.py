@@ -1,3 +1,4 @@
+import asyncio
 import pytest
 from agent.planning_agent_mcts import PlanningState
 from agent.planning_agent import PlanningAgent
@@ -89,4 +90,37 @@ async def test_planning_agent_generates_steps():
 
     assert len(results) == 2
     assert all(isinstance(msg, AgentMessage) for msg in results)
-    assert {msg.receiver for msg in results} == {"ToolSelectorAgent", "user"}
\ No newline at end of file
+    assert {msg.receiver for msg in results} == {"ToolSelectorAgent", "user"}
+
+class StreamingModel:
+    def __init__(self):
+        self.first_step_consumed = asyncio.Event()
+
+    async def ask_stream(self, prompt, request="", request_sender=""):
+        yield fake_plan[0]
+        # 첫 step이 소비된 뒤에야 나머지 step을 생성한다
+        await asyncio.wait_for(self.first_step_consumed.wait(), timeout=5)
+        yield fake_plan[1]
+
+
+@pytest.mark.asyncio
+async def test_planning_agent_yields_root_steps_while_streaming():
+    agent = PlanningAgent()
+    agent.model = StreamingModel()
+    agent.set_state(PlanningState(history=[], remaining_goals=[], execution_results={}))
+
+    input_message = AgentMessage(
+        sender="user",
+        receiver="PlanningAgent",
+        payload=[MCPRequest[dict](content=[MCPRequestMessage[dict](content="search the weather", metadata={})])],
+    )
+
+    results = []
+    async for result in agent.on_event(input_message):
+        results.append(result)
+        agent.model.first_step_consumed.set()
+
+    # 먼저 내보낸 step은 MCTS 결과에서 다시 내보내지 않는다
+    assert [msg.id for msg in results] == [0, 1]
+    assert results[0] is fake_plan[0]
+    assert [msg.id for msg in agent.get_state().history] == [0, 1]
@@ -1,4 +1,12 @@
-from agent.planning_agent_mcts import MCTSPlanner, PlanningState, evaluate_plan
+import asyncio
+import random
+import time
+from copy import deepcopy
+
+import numpy as np
+import pytest
+
+from agent.planning_agent_mcts import CompiledGoals, MCTSPlanner, PlanningState, evaluate_plan
 from scheme.a2a_message import AgentMessage
 from scheme.mcp import MCPRequest, MCPRequestMessage
 from utils.constant import FAIL, SUCCESS
@@ -30,3 +38,172 @@ def test_evaluate_plan_penalizes_failures():
     failure_plan = [_msg(0, -1, stop_reason=FAIL), _msg(1, 0, receiver="user", stop_reason=SUCCESS)]
 
     assert evaluate_plan(success_plan) > evaluate_plan(failure_plan)
+
+
+@pytest.mark.asyncio
+async def test_wait_result_released_when_parent_result_recorded():
+    state = PlanningState(history=[], remaining_goals=[], execution_results={})
+    waiter = state.wait_result(0)
+
+    await asyncio.sleep(0)
+    assert not waiter.done()
+
+    parent = _msg(0, -1)
+    state.set_result(0, parent)
+
+    assert await asyncio.wait_for(waiter, timeout=1) == [parent]
+    assert deepcopy(state).get_result(0) == [parent]
+
+
+def test_clone_copies_containers_only_on_write():
+    goals = [_msg(0, -1), _msg(1, 0)]
+    state = PlanningState(history=[], remaining_goals=goals, execution_results={0: [_msg(0, -1)]})
+    snapshot = state.clone()
+
+    assert snapshot.remaining_goals is state.remaining_goals
+
+    snapshot.pop_goal(0)
+    snapshot.set_result(0, _msg(9, -1))
+
+    assert [g.id for g in state.remaining_goals] == [0, 1]
+    assert len(state.get_result(0)) == 1
+    assert [g.id for g in snapshot.remaining_goals] == [1]
+    assert len(snapshot.get_result(0)) == 2
+
+
+def test_mcts_tree_is_reused_for_same_goals():
+    def make_state(root):
+        state = root.clone()
+        state.init_args(history=[], remaining_goals=[_msg(0, -1), _msg(1, -1), _msg(2, 0, receiver="user")])
+        return state
+
+    root = PlanningState(history=[], remaining_goals=[], execution_results={})
+    MCTSPlanner(make_state(root)).run(max_iter=20)
+    tree = next(iter(root.search_trees.values()))
+    first_visits = tree[frozenset()].visits
+
+    best_plan = MCTSPlanner(make_state(root)).run(max_iter=20)
+
+    assert len(root.search_trees) == 1
+    # 작은 트리는 끝까지 확장되면 max_iter 전에 멈춘다
+    assert first_visits < tree[frozenset()].visits <= first_visits + 20
+    assert best_plan[-1].receiver == "user"
+
+
+def test_mcts_stops_when_tree_is_fully_expanded():
+    goals = [_msg(0, -1), _msg(1, 0), _msg(2, 1)]
+    state = PlanningState(history=[], remaining_goals=goals, execution_results={})
+
+    started = time.perf_counter()
+    best_plan = MCTSPlanner(state).run(max_iter=None, time_budget=5.0)
+
+    assert time.perf_counter() - started < 0.5
+    assert [step.id for step in best_plan] == [0, 1, 2]
+    tree = next(iter(state.search_trees.values()))
+    assert tree[frozenset()].visits <= 2 * len(goals)
+
+
+def test_mcts_stops_at_time_budget():
+    goals = [_msg(i, -1) for i in range(50)]
+    state = PlanningState(history=[], remaining_goals=goals, execution_results={})
+
+    started = time.perf_counter()
+    best_plan = MCTSPlanner(state).run(max_iter=None, time_budget=0.05)
+
+    assert time.perf_counter() - started < 0.5
+    assert len(best_plan) == 50
+
+
+def test_compiled_score_matches_evaluate_plan():
+    rng = random.Random(7)
+    receivers = ["user", "WeatherToolAgent", "ScheduleRecommenderAgent", "PlanningAgent"]
+    stop_reasons = [SUCCESS, FAIL, ""]
+
+    for _ in range(20):
+        history = [
+            _msg(100 + i, -1, receiver=rng.choice(receivers), stop_reason=rng.choice(stop_reasons))
+            for i in range(rng.randint(0, 3))
+        ]
+        goals = [
+            _msg(i, -1, receiver=rng.choice(receivers), stop_reason=rng.choice(stop_reasons))
+            for i in range(rng.randint(1, 8))
+        ]
+        compiled = CompiledGoals(goals, history)
+
+        order = rng.sample(range(len(goals)), rng.randint(0, len(goals)))
+        executed = np.zeros((1, len(goals)), dtype=bool)
+        executed[0, order] = True
+        last = np.array([order[-1] if order else -1])
+
+        expected = evaluate_plan(history + [goals[idx] for idx in order])
+        assert compiled.score(executed, last)[0] == pytest.approx(expected)
+
+
+def test_compiled_rollout_never_breaks_dag_order():
+    goals = [_msg(0, -1), _msg(1, 0), _msg(2, 0), _msg(3, 2), _msg(4, 99)]
+    compiled = CompiledGoals(goals, history=[])
+
+    orders, lengths = compiled.rollout([], batch=64, epsilon=1.0, rng=np.random.default_rng(0))
+
+    # 부모를 알 수 없는 goal(4)은 실행되지 않는다
+    assert set(lengths.tolist()) == {4}
+    for row in orders:
+        position = {idx: pos for pos, idx in enumerate(row.tolist()) if idx >= 0}
+        assert 4 not in position
+        assert position[0] < position[1] and position[0] < position[2] < position[3]
+
+
+def _reference_merge(existing: PlanningState, new_state: PlanningState):
+    """이전 Router._update_session_state의 병합 결과"""
+    history = list({msg.id: msg for msg in existing.history + new_state.history}.values())
+    goals = [g for g in new_state.remaining_goals if g not in existing.history]
+    return history, goals
+
+
+def test_merge_matches_previous_semantics():
+    rng = random.Random(3)
+
+    for _ in range(30):
+        state = PlanningState(history=[], remaining_goals=[], execution_results={})
+        other = PlanningState(history=[], remaining_goals=[], execution_results={})
+        for _ in range(rng.randint(1, 6)):
+            for target in (state, other):
+                for _ in range(rng.randint(0, 3)):
+                    target.set_history(_msg(rng.randint(0, 5), -1, stop_reason=rng.choice([SUCCESS, FAIL])))
+            other.set_goals([_msg(rng.randint(0, 8), -1) for _ in range(rng.randint(0, 2))])
+
+            target = rng.choice([state, other])
+            expected_history, expected_goals = _reference_merge(state, target)
+            state.merge(target)
+
+            assert state.history == expected_history
+            assert state.remaining_goals == expected_goals
+
+
+def test_merge_with_itself_only_reindexes_new_steps():
+    state = PlanningState(history=[], remaining_goals=[_msg(1, 0)], execution_results={})
+    state.set_history([_msg(0, -1), _msg(1, 0, stop_reason=FAIL)])
+    state.merge(state)
+
+    state.set_history([_msg(1, 0), _msg(2, 1)])
+    state.merge(state)
+
+    assert [(msg.id, msg.stop_reason) for msg in state.history] == [(0, SUCCESS), (1, SUCCESS), (2, SUCCESS)]
+    assert state.remaining_goals == []
+
+
+def test_execution_results_skip_duplicates():
+    state = PlanningState(history=[], remaining_goals=[], execution_results={})
+    state.set_result(0, _msg(0, -1))
+    state.set_result(0, _msg(0, -1))
+    assert len(state.get_result(0)) == 1
+
+    state.pop_result(0, _msg(0, -1))
+    state.set_result(0, _msg(1, 0))
+    state.set_result(0, _msg(0, -1))
+    assert [msg.id for msg in state.get_result(0)] == [1, 0]
+
+    other = PlanningState(history=[], remaining_goals=[], execution_results={0: [_msg(0, -1), _msg(2, 0)], 3: [_msg(3, -1)]})
+    state.update_execute(other.execution_results)
+    assert [msg.id for msg in state.get_result(0)] == [1, 0, 2]
+    assert [msg.id for msg in state.get_result(3)] == [3]
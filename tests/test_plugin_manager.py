@@ -0,0 +1,238 @@
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+
+import plugin.manager as manager_module
+from plugin.base import BaseAgent
+from plugin.manager import PluginManager
+from scheme.mcp import MCPRequest, MCPRequestMessage
+from utils.constant import FAIL, PLUGIN_PROCESS, PLUGIN_THREAD, SUCCESS
+
+
+def _response(content: str) -> MCPRequest[dict]:
+    return MCPRequest[dict](content=[MCPRequestMessage[dict](content=content, metadata={})], stop_reason=SUCCESS)
+
+
+class BlockingPlugin(BaseAgent):
+    execution = PLUGIN_THREAD
+
+    @staticmethod
+    def plugin_name():
+        return "BlockingPlugin"
+
+    async def run(self, input_data):
+        time.sleep(0.2)
+        return _response("blocked")
+
+
+class SlowPlugin(BaseAgent):
+    timeout = 0.05
+    concurrency = 1
+    cancelled = 0
+
+    @staticmethod
+    def plugin_name():
+        return "SlowPlugin"
+
+    async def run(self, input_data):
+        try:
+            await asyncio.sleep(float(input_data.content))
+        except asyncio.CancelledError:
+            SlowPlugin.cancelled += 1
+            raise
+        return _response(input_data.content)
+
+
+class ProcessPlugin(BaseAgent):
+    execution = PLUGIN_PROCESS
+
+    @staticmethod
+    def plugin_name():
+        return "ProcessPlugin"
+
+    async def run(self, input_data):
+        return _response(f"{input_data.content}:{os.getpid()}")
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    registry = {
+        plugin.plugin_name(): f"{__name__}.{plugin.__name__}"
+        for plugin in (BlockingPlugin, SlowPlugin, ProcessPlugin)
+    }
+    monkeypatch.setattr(manager_module, "PLUGIN_REGISTRY", registry)
+    monkeypatch.setattr(manager_module, "register_scan_directory", lambda path: None)
+    manager = PluginManager()
+    yield manager
+    manager._executor.shutdown(wait=True)
+
+
+@pytest.mark.asyncio
+async def test_thread_plugin_does_not_block_event_loop(manager):
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    task = asyncio.create_task(ticker())
+    request = MCPRequestMessage[dict](content="", metadata={})
+    responses = await asyncio.gather(*[manager.run("BlockingPlugin", request) for _ in range(2)])
+    task.cancel()
+
+    assert [response.content[0].content for response in responses] == ["blocked", "blocked"]
+    # 블로킹 0.2초 동안에도 이벤트 루프는 계속 돈다
+    assert ticks >= 10
+
+
+@pytest.mark.asyncio
+async def test_plugin_timeout_cancels_and_reports_failure(manager):
+    SlowPlugin.cancelled = 0
+    response = await manager.run("SlowPlugin", MCPRequestMessage[dict](content="1", metadata={}))
+
+    assert response.stop_reason == FAIL
+    assert response.selected_tool == "SlowPlugin"
+    assert SlowPlugin.cancelled == 1
+
+
+@pytest.mark.asyncio
+async def test_plugin_concurrency_limit(manager, monkeypatch):
+    monkeypatch.setattr(SlowPlugin, "timeout", None)
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    request = MCPRequestMessage[dict](content="0.05", metadata={})
+    await asyncio.gather(*[manager.run("SlowPlugin", request) for _ in range(3)])
+
+    # concurrency=1이므로 순서대로 실행된다
+    assert loop.time() - started >= 0.15
+
+
+@pytest.mark.asyncio
+async def test_process_plugin_runs_in_worker_process(manager):
+    response = await manager.run("ProcessPlugin", MCPRequestMessage[dict](content="hello", metadata={"a": 1}))
+
+    content, pid = response.content[0].content.split(":")
+    assert content == "hello"
+    assert int(pid) != os.getpid()
+    assert response.stop_reason == SUCCESS
+
+
+HOT_PLUGIN_SOURCE = '''
+import asyncio
+from plugin.base import BaseAgent
+from scheme.mcp import MCPRequest, MCPRequestMessage
+
+class HotPlugin(BaseAgent):
+    @staticmethod
+    def plugin_name():
+        return "HotPlugin"
+
+    async def run(self, input_data):
+        await asyncio.sleep(float(input_data.content))
+        return MCPRequest[dict](content=[MCPRequestMessage[dict](content="{version}", metadata={{}})], stop_reason="done")
+'''
+
+
+def write_hot_plugin(root, version: str, bump: int = 0):
+    path = os.path.join(root, "hot.py")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(HOT_PLUGIN_SOURCE.format(version=version))
+    # 같은 초 안에 다시 써도 mtime이 바뀌도록 한다
+    os.utime(path, ns=(0, 10**18 + bump))
+    return path
+
+
+@pytest.fixture
+def hot_manager(tmp_path, monkeypatch):
+    import plugin.registry as registry
+    root = tmp_path / "hot_plugins"
+    root.mkdir()
+    (root / "__init__.py").write_text("")
+    (tmp_path / "logs").mkdir()
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setenv("PLUGIN_MANIFEST_PATH", str(tmp_path / "manifest.json"))
+    plugins, infos = {}, {}
+    for module in (registry, manager_module):
+        monkeypatch.setattr(module, "PLUGIN_REGISTRY", plugins)
+        monkeypatch.setattr(module, "PLUGIN_INFO", infos)
+
+    write_hot_plugin("hot_plugins", "v1")
+    manager = PluginManager(plugin_dir="hot_plugins")
+    yield manager
+    for module in [m for m in sys.modules if m.startswith("hot_plugins")]:
+        del sys.modules[module]
+
+
+@pytest.mark.asyncio
+async def test_hot_reload_swaps_module_and_keeps_in_flight_instance(hot_manager):
+    from plugin.registry import registry_version
+    from plugin.scanner import scan_manifest
+
+    request = MCPRequestMessage[dict](content="0", metadata={})
+    assert (await hot_manager.run("HotPlugin", request)).content[0].content == "v1"
+    version = registry_version()
+
+    in_flight = asyncio.create_task(hot_manager.run("HotPlugin", MCPRequestMessage[dict](content="0.1", metadata={})))
+    await asyncio.sleep(0.01)
+
+    write_hot_plugin("hot_plugins", "v2", bump=1)
+    assert hot_manager.apply_manifest(scan_manifest("hot_plugins")) == ["HotPlugin"]
+    assert registry_version() != version
+
+    assert (await hot_manager.run("HotPlugin", request)).content[0].content == "v2"
+    # 실행 중이던 요청은 기존 인스턴스로 끝난다
+    assert (await in_flight).content[0].content == "v1"
+
+    # 바뀐 것이 없으면 아무것도 다시 불러오지 않는다
+    assert hot_manager.apply_manifest(scan_manifest("hot_plugins")) == []
+
+
+@pytest.mark.asyncio
+async def test_hot_reload_keeps_old_module_when_new_one_fails(hot_manager):
+    from plugin.scanner import scan_manifest
+
+    request = MCPRequestMessage[dict](content="0", metadata={})
+    await hot_manager.run("HotPlugin", request)
+
+    path = write_hot_plugin("hot_plugins", "v2", bump=1)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("\nraise RuntimeError('broken')\n")
+    os.utime(path, ns=(0, 10**18 + 2))
+
+    assert hot_manager.apply_manifest(scan_manifest("hot_plugins")) == []
+    assert (await hot_manager.run("HotPlugin", request)).content[0].content == "v1"
+
+    os.remove(path)
+    assert hot_manager.apply_manifest(scan_manifest("hot_plugins")) == ["HotPlugin"]
+    assert "HotPlugin" not in manager_module.PLUGIN_REGISTRY
+
+
+def test_tool_catalog_is_reused_until_registry_changes(hot_manager, monkeypatch):
+    import plugin.registry as registry
+    from plugin.scanner import scan_manifest
+
+    reads = []
+    original = registry.plugin_info
+    monkeypatch.setattr(manager_module, "plugin_info", lambda name: reads.append(name) or original(name))
+
+    catalog = hot_manager.tool_catalog()
+    assert catalog.names == ["HotPlugin"]
+    assert catalog.tools_list == '- "HotPlugin"'
+    assert hot_manager.tool_catalog() is catalog
+    assert hot_manager.pair_registry_execute_info() == catalog.descriptions
+    assert reads == ["HotPlugin"]
+
+    with open(os.path.join("hot_plugins", "hot.md"), "w", encoding="utf-8") as f:
+        f.write("hot tool")
+    hot_manager.apply_manifest(scan_manifest("hot_plugins"))
+
+    rebuilt = hot_manager.tool_catalog()
+    assert rebuilt is not catalog
+    assert rebuilt.version != catalog.version
+    assert rebuilt.tools_info == "HotPlugin - hot tool"
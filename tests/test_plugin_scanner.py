@@ -0,0 +1,105 @@
+import json
+import os
+import sys
+
+import pytest
+
+import plugin.registry as registry
+import plugin.scanner as scanner
+
+
+PLUGIN_SOURCE = '''
+from plugin.base import BaseAgent
+
+class {cls}(BaseAgent):
+    @staticmethod
+    def plugin_name():
+        return f"{name}"
+
+    async def run(self, input_data):
+        return input_data
+'''
+
+
+def write_plugin(root, module: str, cls: str, name: str, description: str | None = None):
+    with open(os.path.join(root, f"{module}.py"), "w", encoding="utf-8") as f:
+        f.write(PLUGIN_SOURCE.format(cls=cls, name=name))
+    if description is not None:
+        with open(os.path.join(root, f"{module}.md"), "w", encoding="utf-8") as f:
+            f.write(description)
+
+
+@pytest.fixture
+def plugin_dir(tmp_path, monkeypatch):
+    root = tmp_path / "lazy_plugins"
+    root.mkdir()
+    (root / "__init__.py").write_text("")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setattr(registry, "PLUGIN_REGISTRY", {})
+    monkeypatch.setattr(registry, "PLUGIN_INFO", {})
+    yield "lazy_plugins", str(tmp_path / "manifest.json")
+    for module in [m for m in sys.modules if m.startswith("lazy_plugins")]:
+        del sys.modules[module]
+
+
+def test_scan_registers_plugins_without_importing(plugin_dir):
+    path, manifest_path = plugin_dir
+    write_plugin(path, "alpha", "AlphaAgent", "Alpha", description="alpha tool")
+
+    scanner.register_scan_directory(path, manifest_path)
+
+    assert registry.PLUGIN_REGISTRY == {"Alpha": "lazy_plugins.alpha.AlphaAgent"}
+    assert registry.plugin_info("Alpha")["description"] == "alpha tool"
+    assert "lazy_plugins.alpha" not in sys.modules
+
+    with open(manifest_path, encoding="utf-8") as f:
+        files = json.load(f)["files"]
+    assert [plugin["name"] for plugin in files[os.path.join(path, "alpha.py")]["plugins"]] == ["Alpha"]
+
+
+def test_scan_reparses_only_changed_files(plugin_dir, monkeypatch):
+    path, manifest_path = plugin_dir
+    write_plugin(path, "alpha", "AlphaAgent", "Alpha")
+    write_plugin(path, "beta", "BetaAgent", "Beta")
+    scanner.scan_manifest(path, manifest_path)
+
+    parsed = []
+    original = scanner._parse_plugins
+    monkeypatch.setattr(scanner, "_parse_plugins", lambda file_path, module: parsed.append(file_path) or original(file_path, module))
+
+    scanner.scan_manifest(path, manifest_path)
+    assert parsed == []
+
+    # 내용이 같으면 mtime이 바뀌어도 다시 분석하지 않는다
+    alpha = os.path.join(path, "alpha.py")
+    os.utime(alpha, ns=(0, os.stat(alpha).st_mtime_ns + 10**9))
+    scanner.scan_manifest(path, manifest_path)
+    assert parsed == []
+
+    write_plugin(path, "beta", "BetaAgent", "BetaRenamed")
+    os.utime(os.path.join(path, "beta.py"), ns=(0, os.stat(alpha).st_mtime_ns + 10**9))
+    files = scanner.scan_manifest(path, manifest_path)
+    assert parsed == [os.path.join(path, "beta.py")]
+    assert files[os.path.join(path, "beta.py")]["plugins"][0]["name"] == "BetaRenamed"
+
+
+def test_scan_falls_back_to_import_for_dynamic_plugin_name(plugin_dir):
+    path, manifest_path = plugin_dir
+    with open(os.path.join(path, "dynamic.py"), "w", encoding="utf-8") as f:
+        f.write(
+            "from plugin.base import BaseAgent\n"
+            "NAME = 'Dyn'\n"
+            "class DynamicAgent(BaseAgent):\n"
+            "    @staticmethod\n"
+            "    def plugin_name():\n"
+            "        return NAME + 'amic'\n"
+            "    async def run(self, input_data):\n"
+            "        return input_data\n"
+        )
+
+    scanner.register_scan_directory(path, manifest_path)
+    assert registry.PLUGIN_REGISTRY == {"Dynamic": "lazy_plugins.dynamic.DynamicAgent"}
+    # 같은 구성으로 다시 등록해도 오류가 나지 않는다
+    scanner.register_scan_directory(path, manifest_path)
+    assert len(registry.PLUGIN_REGISTRY) == 1
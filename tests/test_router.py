@@ -0,0 +1,223 @@
+import asyncio
+import time
+
+import pytest
+
+import router as router_module
+from agent.planning_agent_mcts import PlanningState
+from scheme.a2a_message import AgentMessage
+from scheme.mcp import MCPRequest, MCPRequestMessage
+from utils.constant import FAIL, SUCCESS
+
+
+STEP_LATENCY = 0.2
+
+
+def _msg(step_id: int, dag: int, sender: str, receiver: str, metadata: dict | None = None):
+    return AgentMessage(
+        id=step_id,
+        sender=sender,
+        receiver=receiver,
+        dag=dag,
+        payload=[
+            MCPRequest[dict](
+                content=[MCPRequestMessage[dict](content=f"step-{step_id}", metadata=metadata or {})],
+                selected_tool="WeatherToolAgent",
+                stop_reason=SUCCESS,
+            )
+        ],
+        stop_reason=SUCCESS,
+    )
+
+
+class FakePlanningAgent:
+    plan = []
+
+    def set_state(self, state: PlanningState):
+        self.state = state
+
+    def get_state(self) -> PlanningState:
+        return self.state
+
+    async def on_event(self, message, state=None):
+        for plan in self.plan:
+            yield plan
+
+
+class FakeToolSelectorAgent:
+    def __init__(self, plugin_manager):
+        pass
+
+    async def on_event(self, message):
+        await asyncio.sleep(STEP_LATENCY)
+        metadata = message.payload[0].content[0].metadata
+        yield _msg(message.id, message.dag, "ToolSelectorAgent", "ExecutionAgent", metadata)
+
+
+class FakeExecutionAgent:
+    def __init__(self, plugin_manager):
+        self.started = {}
+
+    async def on_event(self, message):
+        self.started[message.id] = time.perf_counter()
+        await asyncio.sleep(STEP_LATENCY)
+        metadata = {**message.payload[0].content[0].metadata, f"done-{message.id}": True}
+        yield _msg(message.id, message.dag, "ExecutionAgent", "Router", metadata)
+
+
+class FakeValidationAgent:
+    async def on_event(self, message):
+        yield message
+
+
+@pytest.fixture
+def router(monkeypatch):
+    monkeypatch.setattr(router_module, "PlanningAgent", FakePlanningAgent)
+    monkeypatch.setattr(router_module, "ToolSelectorAgent", FakeToolSelectorAgent)
+    monkeypatch.setattr(router_module, "ExecutionAgent", FakeExecutionAgent)
+    monkeypatch.setattr(router_module, "ValidationAgent", FakeValidationAgent)
+    return router_module.Router(plugin_manager=None, max_concurrency=4)
+
+
+async def _collect(router, session_id="test"):
+    results = []
+    async for item in router.on_event({"content": "weather in Seoul and Busan", "metadata": {}}, session_id):
+        results.append(item)
+    return results
+
+
+@pytest.mark.asyncio
+async def test_router_runs_independent_steps_concurrently(router):
+    FakePlanningAgent.plan = [
+        _msg(0, -1, "PlanningAgent", "ToolSelectorAgent", {"city": "Seoul"}),
+        _msg(1, -1, "PlanningAgent", "ToolSelectorAgent", {"city": "Busan"}),
+    ]
+
+    started = time.perf_counter()
+    results = await _collect(router)
+    elapsed = time.perf_counter() - started
+
+    executed = [r for r in results if r.sender == "ExecutionAgent"]
+    assert {r.id for r in executed} == {0, 1}
+    # 순차 실행이라면 4 * STEP_LATENCY 가 걸린다
+    assert elapsed < 3 * STEP_LATENCY
+
+
+@pytest.mark.asyncio
+async def test_router_waits_for_parent_result(router):
+    FakePlanningAgent.plan = [
+        _msg(1, 0, "PlanningAgent", "ToolSelectorAgent"),
+        _msg(0, -1, "PlanningAgent", "ToolSelectorAgent", {"city": "Seoul"}),
+    ]
+
+    results = await _collect(router)
+
+    executed = [r for r in results if r.sender == "ExecutionAgent"]
+    assert [r.id for r in executed] == [0, 1]
+    # 부모 step의 metadata가 자식 step에 병합된다
+    assert executed[1].payload[0].content[0].metadata["done-0"] is True
+    agent = router.agents["ExecutionAgent"]
+    assert agent.started[1] >= agent.started[0] + STEP_LATENCY
+
+
+@pytest.mark.asyncio
+async def test_router_reports_unresolvable_dependency(router):
+    FakePlanningAgent.plan = [_msg(1, 5, "PlanningAgent", "ToolSelectorAgent")]
+
+    results = await _collect(router)
+
+    assert len(results) == 1
+    assert results[0].stop_reason == FAIL
+
+
+@pytest.mark.asyncio
+async def test_router_does_not_reuse_previous_request_results(router):
+    agent = router.agents["ExecutionAgent"]
+    for request in range(2):
+        FakePlanningAgent.plan = [
+            _msg(0, -1, "PlanningAgent", "ToolSelectorAgent", {"city": f"req{request}"}),
+            _msg(1, 0, "PlanningAgent", "ToolSelectorAgent"),
+        ]
+
+        results = await _collect(router, session_id="conn-1")
+
+        executed = [r for r in results if r.sender == "ExecutionAgent"]
+        assert [r.id for r in executed] == [0, 1]
+        # 두 번째 요청의 step 1은 이전 요청의 step 0 결과가 아니라 이번 요청의 결과를 기다린다
+        metadata = executed[1].payload[0].content[0].metadata
+        assert metadata["city"] == f"req{request}"
+        assert agent.started[1] >= agent.started[0] + STEP_LATENCY
+
+
+@pytest.mark.asyncio
+async def test_router_runs_streamed_steps_before_planning_finishes(router):
+    agent = router.agents["ExecutionAgent"]
+
+    async def streaming_plan(message, state=None):
+        yield _msg(0, -1, "PlanningAgent", "ToolSelectorAgent", {"city": "Seoul"})
+        # 나머지 plan이 생성되는 동안 먼저 도착한 step이 실행된다
+        while 0 not in agent.started:
+            await asyncio.sleep(0.01)
+        yield _msg(1, 0, "PlanningAgent", "ToolSelectorAgent")
+
+    router.agents["PlanningAgent"].on_event = streaming_plan
+    results = await asyncio.wait_for(_collect(router), timeout=5)
+
+    executed = [r for r in results if r.sender == "ExecutionAgent"]
+    assert [r.id for r in executed] == [0, 1]
+
+
+class StreamingPlanModel:
+    def __init__(self):
+        self.requests = 0
+
+    async def ask_stream(self, prompt, request="", request_sender=""):
+        self.requests += 1
+        yield _msg(0, -1, "PlanningAgent", "ToolSelectorAgent", {"city": f"req{self.requests}-a"})
+        yield _msg(1, 0, "PlanningAgent", "ToolSelectorAgent", {"step": f"req{self.requests}-b"})
+
+
+@pytest.fixture
+def planning_router(monkeypatch):
+    monkeypatch.setattr(router_module, "ToolSelectorAgent", FakeToolSelectorAgent)
+    monkeypatch.setattr(router_module, "ExecutionAgent", FakeExecutionAgent)
+    monkeypatch.setattr(router_module, "ValidationAgent", FakeValidationAgent)
+    router = router_module.Router(plugin_manager=None, max_concurrency=4)
+    router.agents["PlanningAgent"].model = StreamingPlanModel()
+    return router
+
+
+@pytest.mark.asyncio
+async def test_router_runs_only_current_request_steps_on_reused_session(planning_router):
+    for request in (1, 2):
+        results = []
+        message = {"content": f"weather request {request}", "metadata": {}}
+        async for item in planning_router.on_event(message, "conn-1"):
+            results.append(item)
+
+        executed = [r for r in results if r.sender == "ExecutionAgent"]
+        # 이전 요청의 step은 history에 남지만 다시 실행하지 않는다
+        assert [r.id for r in executed] == [0, 1]
+        assert executed[0].payload[0].content[0].metadata["city"] == f"req{request}-a"
+
+
+class EchoPlanModel:
+    async def ask_stream(self, prompt, request="", request_sender=""):
+        # 두 세션의 플래닝이 겹치도록 응답을 늦춘다
+        await asyncio.sleep(0.05)
+        yield _msg(0, -1, "PlanningAgent", "ToolSelectorAgent", {"city": request[0]})
+
+
+@pytest.mark.asyncio
+async def test_router_keeps_concurrent_sessions_plans_apart(planning_router):
+    planning_router.agents["PlanningAgent"].model = EchoPlanModel()
+
+    async def collect(session_id):
+        return [item async for item in planning_router.on_event({"content": session_id, "metadata": {}}, session_id)]
+
+    await asyncio.gather(collect("A"), collect("B"))
+
+    for session_id in ("A", "B"):
+        history = planning_router.sessions.get(session_id).history
+        cities = {msg.payload[0].content[0].metadata.get("city") for msg in history}
+        assert cities == {session_id}
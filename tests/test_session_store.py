@@ -0,0 +1,142 @@
+import threading
+import time
+
+import pytest
+
+from agent.planning_agent_mcts import PlanningState
+from scheme.a2a_message import AgentMessage
+from scheme.mcp import MCPRequest, MCPRequestMessage
+from utils.session_store import SessionStore
+
+
+def _state(*step_ids: int) -> PlanningState:
+    history = [
+        AgentMessage(
+            id=step_id,
+            sender="PlanningAgent",
+            receiver="user",
+            payload=[MCPRequest[dict](content=[MCPRequestMessage[dict](content=f"step-{step_id}", metadata={})])],
+        )
+        for step_id in step_ids
+    ]
+    return PlanningState(history=history, remaining_goals=[], execution_results={})
+
+
+def _store(**kwargs) -> SessionStore[PlanningState]:
+    return SessionStore(lambda: _state(), dumps=PlanningState.dumps, loads=PlanningState.loads, **kwargs)
+
+
+def test_get_or_create_reuses_session():
+    store = _store()
+
+    first = store.get_or_create("a")
+    first.set_history(AgentMessage(id=0, sender="PlanningAgent", receiver="user", payload=[]))
+
+    assert store.get_or_create("a") is first
+    assert store.stats()["created"] == 1
+    assert "b" not in store
+
+
+def test_idle_sessions_expire():
+    store = _store(idle_ttl=0.05)
+    store["a"] = _state(0)
+
+    time.sleep(0.1)
+
+    assert store.get("a") is None
+    assert store.stats()["expired"] == 1
+
+
+def test_lru_eviction_skips_pinned_sessions():
+    store = _store(max_entries=2)
+    store["a"] = _state(0)
+    store["b"] = _state(1)
+    store.pin("a")
+
+    store["c"] = _state(2)
+
+    # a는 가장 오래됐지만 처리 중이므로 b가 대신 내보내진다
+    assert "a" in store and "c" in store
+    assert "b" not in store
+
+    store.unpin("a")
+    store["d"] = _state(3)
+    assert "a" not in store
+
+
+def test_max_bytes_limit():
+    store = _store(max_bytes=1, sizeof=lambda state: len(state.history))
+    store["a"] = _state(0)
+    store["b"] = _state(1)
+
+    assert len(store) == 1
+    assert store.bytes == 1
+
+
+def test_cold_sessions_are_offloaded_and_restored(tmp_path):
+    store = _store(max_entries=1, offload_dir=str(tmp_path))
+    store["a"] = _state(0, 1)
+    store["b"] = _state(2)
+
+    assert list(tmp_path.glob("*.session"))
+    assert "a" in store
+
+    restored = store["a"]
+    assert [msg.id for msg in restored.history] == [0, 1]
+    assert restored.history[1].payload[0].content[0].content == "step-1"
+    assert store.stats()["loaded"] == 1
+
+    store.pop("a")
+    store.pop("b")
+    assert not list(tmp_path.glob("*.session"))
+    assert len(store) == 0
+
+
+@pytest.mark.asyncio
+async def test_offload_runs_off_the_event_loop(tmp_path, monkeypatch):
+    store = _store(max_entries=1, offload_dir=str(tmp_path))
+    threads = set()
+    write = store._write
+
+    def recording_write(session_id, value):
+        threads.add(threading.get_ident())
+        return write(session_id, value)
+
+    monkeypatch.setattr(store, "_write", recording_write)
+    first = _state(0, 1)
+    store["a"] = first
+    store["b"] = _state(2)
+
+    # 쓰는 중에 다시 접근하면 메모리의 값을 돌려준다
+    assert store.get("a") is first
+    await store.flush()
+    # 되돌린 a의 파일은 지우고, 대신 내보낸 b만 디스크에 남는다
+    assert len(list(tmp_path.glob("*.session"))) == 1
+    assert store.stats()["offloaded_entries"] == 1
+
+    store["c"] = _state(3)
+    await store.flush()
+    assert threading.get_ident() not in threads
+    assert store.stats()["offloaded_entries"] == 2
+
+    await store.restore("a")
+    assert [msg.id for msg in store["a"].history] == [0, 1]
+    assert store.stats()["loaded"] == 1
+
+
+def test_approx_size_measures_only_new_messages(monkeypatch):
+    state = _state(0, 1)
+    expected = sum(len(msg.model_dump_json()) for msg in state.history)
+    assert state.approx_size() == expected
+
+    measured = []
+    dump = AgentMessage.model_dump_json
+    monkeypatch.setattr(AgentMessage, "model_dump_json", lambda self, **kwargs: measured.append(self.id) or dump(self, **kwargs))
+
+    clone = state.clone()
+    clone.set_history(_state(2).history[0])
+    size = clone.approx_size()
+
+    # 공유하던 history를 복사해도 이미 측정한 메시지는 다시 측정하지 않는다
+    assert measured == [2]
+    assert size > expected
@@ -3,6 +3,7 @@ from unittest.mock import AsyncMock
 from scheme.a2a_message import AgentMessage
 from scheme.mcp import MCPRequest, MCPRequestMessage
 from agent.tool_agent import ToolSelectorAgent
+from plugin.catalog import ToolCatalog
 from utils.constant import SUCCESS
 
 class DummyPluginManager:
@@ -15,6 +16,12 @@ class DummyPluginManager:
             "SearchToolAgent - Performs web searches based on user queries."
         ]
 
+    def list_tool_profiles(self):
+        return []
+
+    def tool_catalog(self):
+        return ToolCatalog("", self.list_registry(), self.pair_registry_execute_info(), self.list_tool_profiles())
+
 @pytest.mark.asyncio
 async def test_tool_selector_agent_on_event(monkeypatch):
     fake_tool_response = [
@@ -56,3 +63,86 @@ async def test_tool_selector_agent_on_event(monkeypatch):
     for msg in results:
         payload = msg.payload[0]
         assert "Weather" in payload.selected_tool, f"Expected 'Weather' in payload selected_tool, got '{payload.selected_tool}'"
+
+
+class FakeModel:
+    def __init__(self, *args, **kwargs):
+        pass
+
+    async def ask(self, prompt, request, cache_version=""):
+        return []
+
+
+@pytest.mark.asyncio
+async def test_tool_selector_agent_caches_selection(monkeypatch):
+    fake_tool_response = [
+        MCPRequest[dict](
+            selected_tool="WeatherToolAgent",
+            content=[MCPRequestMessage[dict](content="execute weather tool", metadata={"city": "Seoul"})],
+        )
+    ]
+    ask = AsyncMock(return_value=fake_tool_response)
+    monkeypatch.setattr("agent.tool_agent.Model", FakeModel)
+    monkeypatch.setattr(FakeModel, "ask", ask)
+
+    dummy_pm = DummyPluginManager()
+    tool_selector_agent = ToolSelectorAgent(plugin_manager=dummy_pm)
+
+    def make_input(metadata):
+        return AgentMessage(
+            sender="PlanningAgent",
+            receiver="ToolSelectorAgent",
+            payload=[MCPRequest[dict](content=[MCPRequestMessage[dict](content="Seoul weather", metadata=metadata)])],
+        )
+
+    async def select(metadata):
+        return [res async for res in tool_selector_agent.on_event(make_input(metadata))]
+
+    await select({"city": "Seoul", "date": "20240506"})
+    results = await select({"date": "20240506", "city": "Seoul"})
+
+    assert ask.await_count == 1
+    assert results[0].payload[0].selected_tool == "WeatherToolAgent"
+    assert tool_selector_agent.cache_stats()["hits"] == 1
+
+    # 도구 설명이 바뀌면 캐시를 사용하지 않는다
+    monkeypatch.setattr(DummyPluginManager, "pair_registry_execute_info", lambda self: ["WeatherToolAgent - changed"])
+    await select({"city": "Seoul", "date": "20240506"})
+
+    assert ask.await_count == 2
+
+
+class ProfiledPluginManager(DummyPluginManager):
+    def list_tool_profiles(self):
+        return [
+            {
+                "name": "WeatherToolAgent",
+                "schema": {"content": "string", "metadata": {"city": "string", "date": "date"}},
+                "description": "Returns current weather and temperature for a given city.",
+            },
+            {
+                "name": "SearchToolAgent",
+                "schema": {"content": "string", "metadata": {"query": "string"}},
+                "description": "Performs web searches based on user queries.",
+            },
+        ]
+
+
+@pytest.mark.asyncio
+async def test_tool_selector_agent_fast_path_skips_llm(monkeypatch):
+    ask = AsyncMock(return_value=[])
+    monkeypatch.setattr("agent.tool_agent.Model", FakeModel)
+    monkeypatch.setattr(FakeModel, "ask", ask)
+
+    tool_selector_agent = ToolSelectorAgent(plugin_manager=ProfiledPluginManager())
+    fake_input = AgentMessage(
+        sender="PlanningAgent",
+        receiver="ToolSelectorAgent",
+        payload=[MCPRequest[dict](content=[MCPRequestMessage[dict](content="Seoul weather", metadata={"city": "Seoul"})])],
+    )
+
+    results = [res async for res in tool_selector_agent.on_event(fake_input)]
+
+    assert ask.await_count == 0
+    assert results[0].payload[0].selected_tool == "WeatherToolAgent"
+    assert results[0].payload[0].content[0].metadata == {"city": "Seoul"}
@@ -2,7 +2,13 @@ import pytest
 from agent.planning_agent import PlanningAgent
 from scheme.a2a_message import AgentMessage
 from scheme.mcp import MCPRequest, MCPRequestMessage
-from utils.util import merge_metadata_only
+from utils.util import (
+    StreamingJSONParser,
+    convert_to_agent_message_api,
+    convert_to_agent_message_local,
+    merge_metadata_only,
+    stream_agent_messages,
+)
 
 
 def test_merge_agent_message():
@@ -51,3 +57,74 @@ def test_merge_agent_message():
     assert merged_msg.retries == 2
     assert len(merged_msg.payload) == 1
     print("Test passed.")
+
+
+PLAN_RESPONSE = """```json
+[
+  {"id": 0, "receiver": "ToolSelectorAgent", "dag": -1,
+   "payload": [{"role": "user", "content": "weather {seoul} \\"today\\"", "metadata": {"city": "seoul"}}]},
+  {id: 1, receiver: "user", dag: 0, payload: [{"role": "user", "content": "recommend", "metadata": {}}]}
+]
+```"""
+
+
+def test_streaming_parser_emits_objects_as_they_close():
+    parser = StreamingJSONParser()
+    emitted = []
+    for position, char in enumerate(PLAN_RESPONSE):
+        for obj in parser.feed(char):
+            emitted.append((position, obj))
+
+    assert [obj["id"] for _, obj in emitted] == [0, 1]
+    # 첫 step은 두 번째 step이 시작되기 전에 나온다
+    assert emitted[0][0] < PLAN_RESPONSE.index("{id: 1")
+    assert emitted[0][1]["payload"][0]["content"] == 'weather {seoul} "today"'
+    assert parser.errors == []
+
+
+def test_streaming_parser_skips_invalid_objects():
+    parser = StreamingJSONParser()
+    objects = parser.feed('{"a": 1} {"b": } {"c": 3} {"d":')
+    parser.close()
+
+    assert objects == [{"a": 1}, {"c": 3}]
+    assert len(parser.errors) == 2
+
+
+def test_convert_to_agent_message_api_tolerates_fences():
+    messages = convert_to_agent_message_api("PlanningAgent", [PLAN_RESPONSE])
+
+    assert [(msg.id, msg.receiver, msg.dag) for msg in messages] == [(0, "ToolSelectorAgent", -1), (1, "user", 0)]
+    assert messages[0].payload[0].content[0].metadata == {"city": "seoul"}
+
+
+def test_convert_to_agent_message_local_keeps_json_prefix_characters():
+    # lstrip("```json")은 문자 단위로 지워 "json..."으로 시작하는 내용을 망가뜨렸다
+    response = '```json\n{"selected_tool": "WeatherToolAgent", "content": "json weather", "metadata": {"city": "seoul"}}\n```'
+
+    messages = convert_to_agent_message_local([response])
+
+    assert messages[0].selected_tool == "WeatherToolAgent"
+    assert messages[0].content[0].content == "json weather"
+
+
+@pytest.mark.asyncio
+async def test_stream_agent_messages_yields_steps_before_stream_ends():
+    chunks = [PLAN_RESPONSE[i:i + 7] for i in range(0, len(PLAN_RESPONSE), 7)]
+    first_step_at = None
+    received = 0
+
+    async def stream():
+        nonlocal received
+        for chunk in chunks:
+            received += 1
+            yield chunk
+
+    steps = []
+    async for message in stream_agent_messages("PlanningAgent", stream()):
+        if first_step_at is None:
+            first_step_at = received
+        steps.append(message)
+
+    assert [step.id for step in steps] == [0, 1]
+    assert first_step_at < len(chunks)
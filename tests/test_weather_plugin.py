@@ -0,0 +1,86 @@
+import asyncio
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+
+from plugins.weather import WeatherToolAgent
+from scheme.mcp import MCPRequestMessage
+from utils.constant import FAIL, SUCCESS
+from utils.http import HttpClient
+
+
+@pytest_asyncio.fixture
+async def weather_server():
+    calls = []
+
+    async def handler(request: web.Request):
+        calls.append(request.query["q"])
+        # 동시 요청이 겹치도록 응답을 늦춘다
+        await asyncio.sleep(0.05)
+        if request.query["q"] == "Nowhere":
+            return web.Response(status=404, text="city not found")
+        return web.json_response({"weather": [{"description": "clear sky"}], "main": {"temp": 21.5}})
+
+    app = web.Application()
+    app.router.add_get("/weather", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = runner.addresses[0][1]
+
+    yield f"http://127.0.0.1:{port}/weather", calls
+    await runner.cleanup()
+
+
+@pytest_asyncio.fixture
+async def weather_agent(monkeypatch, weather_server):
+    url, calls = weather_server
+    monkeypatch.setenv("OPENWEATHER_API_KEY", "test-key")
+    monkeypatch.setattr(WeatherToolAgent, "cache", type(WeatherToolAgent.cache)(ttl=60))
+    client = HttpClient()
+    agent = WeatherToolAgent(client=client)
+    agent.api_url = url
+
+    yield agent, client, calls
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_weather_coalesces_concurrent_requests_and_caches(weather_agent):
+    agent, client, calls = weather_agent
+    request = MCPRequestMessage[dict](content="weather", metadata={"city": "Seoul"})
+
+    responses = await asyncio.gather(*[agent.run(request) for _ in range(5)])
+    assert calls == ["Seoul"]
+    assert all(response.stop_reason == SUCCESS for response in responses)
+    assert responses[0].content[0].metadata["temp"] == 21.5
+
+    # TTL 안에서는 upstream을 다시 부르지 않는다
+    await agent.run(MCPRequestMessage[dict](content="weather", metadata={"city": " seoul "}))
+    assert calls == ["Seoul"]
+
+    await agent.run(MCPRequestMessage[dict](content="weather", metadata={"city": "Busan"}))
+    assert calls == ["Seoul", "Busan"]
+    assert client.pool_stats()["connections_created"] == 1
+
+
+@pytest.mark.asyncio
+async def test_weather_does_not_cache_failures(weather_agent):
+    agent, _, calls = weather_agent
+    request = MCPRequestMessage[dict](content="weather", metadata={"city": "Nowhere"})
+
+    first = await agent.run(request)
+    await agent.run(request)
+    assert calls == ["Nowhere", "Nowhere"]
+    assert "404" in first.content[0].metadata["content"]
+
+
+@pytest.mark.asyncio
+async def test_weather_reports_unreachable_upstream(weather_agent):
+    agent, _, _ = weather_agent
+    agent.api_url = "http://127.0.0.1:1/weather"
+
+    response = await agent.run(MCPRequestMessage[dict](content="weather", metadata={"city": "Seoul"}))
+    assert response.stop_reason == FAIL
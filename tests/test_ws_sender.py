@@ -0,0 +1,98 @@
+import asyncio
+import json
+
+import pytest
+
+from utils.ws_sender import WebSocketSender
+
+
+class FakeWebSocket:
+    def __init__(self, delay: float = 0.0, fail_after: int | None = None):
+        self.delay = delay
+        self.fail_after = fail_after
+        self.frames = []
+
+    async def send_text(self, text: str):
+        if self.fail_after is not None and len(self.frames) >= self.fail_after:
+            raise RuntimeError("disconnected")
+        await asyncio.sleep(self.delay)
+        self.frames.append(json.loads(text))
+
+
+@pytest.mark.asyncio
+async def test_sender_deduplicates_within_window():
+    websocket = FakeWebSocket()
+    sender = WebSocketSender(websocket, dedup_window=2)
+    sender.start()
+
+    assert await sender.send({"A": {"content": 1}}, dedup_key={"content": 1})
+    assert not await sender.send({"B": {"content": 1}}, dedup_key={"content": 1})
+    await sender.send({"A": {"content": 2}})
+    await sender.send({"A": {"content": 3}})
+    # window(2)를 벗어난 frame은 다시 보낼 수 있다
+    assert await sender.send({"A": {"content": 1}}, dedup_key={"content": 1})
+
+    sender.reset_dedup()
+    assert await sender.send({"A": {"content": 3}})
+    await sender.close()
+
+    assert [list(frame.values())[0]["content"] for frame in websocket.frames] == [1, 2, 3, 1, 3]
+    assert sender.stats()["deduplicated"] == 1
+
+
+@pytest.mark.asyncio
+async def test_sender_applies_backpressure_without_sleeping():
+    websocket = FakeWebSocket(delay=0.02)
+    sender = WebSocketSender(websocket, max_queue=1)
+    sender.start()
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    for i in range(5):
+        await sender.send({"A": {"content": i}})
+    # queue가 1칸이므로 producer는 writer가 보내는 속도에 맞춰 기다린다
+    assert loop.time() - started >= 0.05
+
+    await sender.close()
+    assert len(websocket.frames) == 5
+    assert sender.stats()["pending"] == 0
+
+
+@pytest.mark.asyncio
+async def test_sender_reports_disconnect_to_producer():
+    websocket = FakeWebSocket(fail_after=1)
+    sender = WebSocketSender(websocket)
+    sender.start()
+
+    await sender.send({"A": {"content": 0}})
+    await sender.send({"A": {"content": 1}})
+    await asyncio.sleep(0.01)
+
+    with pytest.raises(RuntimeError):
+        await sender.send({"A": {"content": 2}})
+    await sender.close()
+    assert len(websocket.frames) == 1
+
+
+@pytest.mark.asyncio
+async def test_sender_coalesces_queued_frames_from_same_sender():
+    websocket = FakeWebSocket(delay=0.02)
+    sender = WebSocketSender(websocket)
+    sender.start()
+
+    def frame(name, text, stop_reason="done"):
+        return {name: {"content": [{"content": text}], "stop_reason": stop_reason}}
+
+    await sender.send(frame("A", "0"))
+    await asyncio.sleep(0)
+    # 첫 frame을 보내는 동안 쌓인 frame들
+    await sender.send(frame("A", "1"))
+    await sender.send(frame("A", "2"))
+    await sender.send(frame("B", "3"))
+    await sender.send(frame("B", "4", stop_reason="failure"))
+    await sender.close()
+
+    sent = [(name, [item["content"] for item in payload["content"]]) for f in websocket.frames for name, payload in f.items()]
+    assert sent == [("A", ["0"]), ("A", ["1", "2"]), ("B", ["3"]), ("B", ["4"])]
+    assert sender.stats()["coalesced"] == 1
+    assert sender.stats()["pending"] == 0
@@ -0,0 +1,130 @@
+import asyncio
+import sys
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Generic, Hashable, Tuple, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """
+        TTL, 최대 항목 수, 최대 메모리(bytes) 제한을 갖는 LRU 캐시
+
+        - ttl이 None이면 만료되지 않는다.
+        - max_bytes를 넘으면 가장 오래 사용하지 않은 항목부터 제거한다.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        ttl: float | None = None,
+        max_bytes: int | None = None,
+        sizeof: Callable[[Any], int] = sys.getsizeof,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes = 0
+        self._entries: OrderedDict[K, Tuple[V, float, int]] = OrderedDict()
+
+    def get(self, key: K, default: V | None = None) -> V | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+
+        value, expires_at, _ = entry
+        if expires_at < time.monotonic():
+            self.pop(key)
+            self.misses += 1
+            return default
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: K, value: V, size: int | None = None) -> None:
+        if key in self._entries:
+            self.pop(key)
+
+        size = self.sizeof(value) if size is None else size
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else float("inf")
+        self._entries[key] = (value, expires_at, size)
+        self.bytes += size
+        self._evict()
+
+    def pop(self, key: K, default: V | None = None) -> V | None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return default
+
+        self.bytes -= entry[2]
+        return entry[0]
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.bytes = 0
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def __contains__(self, key: K) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and entry[1] >= time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _evict(self) -> None:
+        while self._entries and (
+            len(self._entries) > self.max_entries
+            or (self.max_bytes is not None and self.bytes > self.max_bytes)
+        ):
+            _, (_, _, size) = self._entries.popitem(last=False)
+            self.bytes -= size
+            self.evictions += 1
+
+
+class InFlight(Generic[K, V]):
+    """
+        같은 key에 대한 동시 요청을 하나로 합친다. (single flight)
+
+        먼저 들어온 요청만 factory를 실행하고, 나머지는 그 결과(또는 예외)를 함께 받는다.
+        기다리던 요청 하나가 취소되어도 공유 작업은 취소되지 않는다.
+    """
+
+    def __init__(self):
+        self.coalesced = 0
+        self._pending: Dict[K, asyncio.Future] = {}
+
+    async def run(self, key: K, factory: Callable[[], Awaitable[V]]) -> V:
+        future = self._pending.get(key)
+        if future is not None:
+            self.coalesced += 1
+            return await asyncio.shield(future)
+
+        future = asyncio.ensure_future(factory())
+        self._pending[key] = future
+        future.add_done_callback(lambda done: self._finish(key, done))
+        return await asyncio.shield(future)
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def _finish(self, key: K, future: asyncio.Future) -> None:
+        self._pending.pop(key, None)
+        # 기다리던 요청이 모두 취소된 경우에도 예외가 경고로 남지 않도록 회수한다
+        if not future.cancelled():
+            future.exception()
@@ -5,4 +5,49 @@ RETRY = "retry"
 MORE_DATA ="need_more_data"
 SPECIAL_ROUTER = ["user", "Router"]
 MAX_ITERATIONS = 1000
-MAX_RETRIES = 5
\ No newline at end of file
+MAX_RETRIES = 5
+MAX_CONCURRENCY = 4
+INFERENCE_REPLICAS = 1
+INFERENCE_MAX_PENDING = 16
+INFERENCE_TIMEOUT = 120.0
+BATCH_WINDOW = 0.01
+BATCH_MAX_SIZE = 8
+PREFIX_CACHE_SIZE = 8
+API_CONNECTION_LIMIT = 20
+API_TIMEOUT = 60.0
+PLAN_CACHE_TTL = 3600.0
+PLAN_CACHE_MAX_ENTRIES = 256
+PLAN_CACHE_MAX_BYTES = 8 * 1024 * 1024
+TOOL_CACHE_TTL = 3600.0
+TOOL_CACHE_MAX_ENTRIES = 512
+FAST_ROUTER_MIN_SCORE = 0.35
+FAST_ROUTER_MIN_MARGIN = 0.25
+FAST_ROUTER_STOPWORDS = frozenset({
+    "a", "an", "and", "are", "as", "at", "based", "be", "by", "can", "do", "for", "from", "get", "given",
+    "how", "in", "info", "information", "is", "it", "me", "my", "of", "on", "or", "please", "return", "returns",
+    "show", "tell", "the", "to", "tool", "agent", "user", "what", "when", "where", "which", "with",
+})
+MCTS_EXPLORATION = 1.41
+MCTS_MAX_TREES = 16
+MCTS_TIME_BUDGET = 0.05
+MCTS_ROLLOUT_BATCH = 32
+MCTS_ROLLOUT_CELLS = 4_000_000
+SESSION_IDLE_TTL = 1800.0
+SESSION_MAX_ENTRIES = 1024
+SESSION_MAX_BYTES = 256 * 1024 * 1024
+LOCK_WAIT_WARNING = 0.1
+SEND_QUEUE_SIZE = 64
+SEND_DEDUP_WINDOW = 256
+HTTP_CONNECTION_LIMIT = 20
+HTTP_TIMEOUT = 10.0
+WEATHER_CACHE_TTL = 300.0
+WEATHER_CACHE_MAX_ENTRIES = 256
+PLUGIN_ASYNC = "async"
+PLUGIN_THREAD = "thread"
+PLUGIN_PROCESS = "process"
+PLUGIN_TIMEOUT = 30.0
+PLUGIN_CONCURRENCY = 8
+PLUGIN_THREAD_WORKERS = 8
+PLUGIN_PROCESS_WORKERS = 2
+PLUGIN_MANIFEST_PATH = "data/plugin_manifest.json"
+PLUGIN_WATCH_INTERVAL = 2.0
\ No newline at end of file
@@ -0,0 +1,86 @@
+import asyncio
+from typing import Any, Dict, Tuple
+
+import aiohttp
+
+from utils.constant import HTTP_CONNECTION_LIMIT, HTTP_TIMEOUT
+
+
+class HttpClient:
+    """
+        플러그인들이 함께 쓰는 aiohttp session
+
+        - 연결 풀(keep-alive)을 공유하므로 요청마다 새 연결을 열지 않는다.
+        - session은 이벤트 루프마다 하나씩 처음 사용할 때 만든다. 다른 루프의 session은 바꾸거나 버리지 않는다.
+        - close()는 각 session을 자기 루프에서 닫는다. 멈춰 있는 루프의 session은 남겨 두었다가
+          그 루프에서 다시 start()/close()할 때 정리하고, 이미 닫힌 루프의 항목만 지운다.
+    """
+
+    def __init__(self, connection_limit: int = HTTP_CONNECTION_LIMIT, timeout: float = HTTP_TIMEOUT):
+        self.connection_limit = connection_limit
+        self.timeout = timeout
+        self._sessions: Dict[asyncio.AbstractEventLoop, aiohttp.ClientSession] = {}
+        self._stats = {"requests": 0, "connections_created": 0, "connections_reused": 0}
+
+    async def start(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        self._forget_closed_loops()
+        session = self._sessions.get(loop)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.connection_limit,
+                ttl_dns_cache=300,
+                keepalive_timeout=60,
+            )
+            trace = aiohttp.TraceConfig()
+            trace.on_connection_create_end.append(self._on_connection_create)
+            trace.on_connection_reuseconn.append(self._on_connection_reuse)
+            session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                trace_configs=[trace],
+            )
+            self._sessions[loop] = session
+        return session
+
+    async def close(self) -> None:
+        loop = asyncio.get_running_loop()
+        self._forget_closed_loops()
+        for owner, session in list(self._sessions.items()):
+            if owner is loop:
+                await session.close()
+            elif owner.is_running():
+                # session은 자기 루프에서만 닫을 수 있다
+                await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(session.close(), owner))
+            else:
+                # 멈춰 있는 루프: 그 루프에서 다시 사용할 때까지 남겨 둔다
+                continue
+            del self._sessions[owner]
+
+    def _forget_closed_loops(self) -> None:
+        # 닫힌 루프의 연결은 루프와 함께 이미 끊겼으므로 항목만 지운다
+        for owner in [owner for owner in self._sessions if owner.is_closed()]:
+            session = self._sessions.pop(owner)
+            session.detach()
+
+    async def get_json(self, url: str, params: dict | None = None) -> Tuple[int, Any]:
+        """GET 요청 후 (status code, JSON 본문)을 반환합니다. 200이 아니면 본문은 text입니다."""
+        session = await self.start()
+        self._stats["requests"] += 1
+        async with session.get(url, params=params) as resp:
+            if resp.status != 200:
+                return resp.status, await resp.text()
+            return resp.status, await resp.json(content_type=None)
+
+    def pool_stats(self) -> dict:
+        return {**self._stats, "limit": self.connection_limit, "open": any(not session.closed for session in self._sessions.values())}
+
+    async def _on_connection_create(self, session, context, params) -> None:
+        self._stats["connections_created"] += 1
+
+    async def _on_connection_reuse(self, session, context, params) -> None:
+        self._stats["connections_reused"] += 1
+
+
+# 모든 플러그인이 공유하는 client (PluginManager.shutdown에서 닫는다)
+http_client = HttpClient()
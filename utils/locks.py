@@ -0,0 +1,63 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Hashable, List
+
+from utils.constant import LOCK_WAIT_WARNING
+from utils.logging import setup_logger
+
+
+class KeyedLock:
+    """
+        key(세션 id 등)별 asyncio.Lock
+
+        - 같은 key를 쓰는 작업끼리만 순서대로 실행되고, 다른 key는 서로 기다리지 않는다.
+        - lock은 사용 중인 동안에만 유지하고, 대기자가 없으면 제거한다.
+        - lock을 얻기까지 기다린 시간을 기록하고 warn_after(초)를 넘으면 경고를 남긴다.
+    """
+
+    def __init__(self, name: str = "KeyedLock", warn_after: float = LOCK_WAIT_WARNING):
+        self.logger = setup_logger(name)
+        self.warn_after = warn_after
+        # key -> [lock, 사용/대기 중인 작업 수]
+        self._locks: Dict[Hashable, List] = {}
+        self._stats = {"acquired": 0, "contended": 0, "wait_total": 0.0, "wait_max": 0.0}
+
+    @asynccontextmanager
+    async def __call__(self, key: Hashable) -> AsyncIterator[None]:
+        entry = self._locks.get(key)
+        if entry is None:
+            entry = self._locks[key] = [asyncio.Lock(), 0]
+        entry[1] += 1
+
+        try:
+            started = time.perf_counter()
+            contended = entry[0].locked()
+            await entry[0].acquire()
+            self._record(key, time.perf_counter() - started, contended)
+
+            try:
+                yield
+            finally:
+                entry[0].release()
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0 and self._locks.get(key) is entry:
+                del self._locks[key]
+
+    def stats(self) -> dict:
+        acquired = self._stats["acquired"]
+        return {
+            **self._stats,
+            "wait_mean": self._stats["wait_total"] / acquired if acquired else 0.0,
+            "active_keys": len(self._locks),
+        }
+
+    def _record(self, key: Hashable, waited: float, contended: bool) -> None:
+        self._stats["acquired"] += 1
+        self._stats["wait_total"] += waited
+        self._stats["wait_max"] = max(self._stats["wait_max"], waited)
+        if contended:
+            self._stats["contended"] += 1
+        if waited > self.warn_after:
+            self.logger.warning(f"lock 대기 {waited:.3f}s (key={key})")
@@ -0,0 +1,285 @@
+import asyncio
+import hashlib
+import os
+import pickle
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Generic, Hashable, Set, Tuple, TypeVar
+
+from utils.constant import SESSION_IDLE_TTL, SESSION_MAX_BYTES, SESSION_MAX_ENTRIES
+from utils.logging import setup_logger
+
+V = TypeVar("V")
+
+
+def _dumps(value: Any) -> bytes:
+    return pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+class SessionStore(Generic[V]):
+    """
+        세션 id -> 세션 상태 저장소
+
+        - 마지막 접근 후 idle_ttl이 지난 세션은 메모리와 디스크에서 모두 제거한다.
+        - max_entries / max_bytes를 넘으면 가장 오래 사용하지 않은 세션부터 내보낸다.
+          offload_dir가 있으면 pickle로 디스크에 옮겨 두었다가 다시 접근할 때 불러온다.
+          이벤트 루프 안에서는 직렬화와 파일 쓰기를 asyncio.to_thread로 넘기고, 쓰는 동안 접근하면 메모리의 값을 돌려준다.
+          비동기 코드는 restore()로 디스크의 세션을 루프 밖에서 먼저 불러온다.
+        - pin()된 세션(처리 중인 요청이 있는 세션)은 내보내지 않는다.
+        - 세션 크기는 set() 시점에 sizeof로 측정한다. 기본값은 직렬화한 byte 수이므로
+          자주 set()하는 상태는 증분으로 측정하는 sizeof를 넘긴다. (PlanningState.approx_size)
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], V],
+        idle_ttl: float | None = SESSION_IDLE_TTL,
+        max_entries: int = SESSION_MAX_ENTRIES,
+        max_bytes: int | None = SESSION_MAX_BYTES,
+        offload_dir: str | None = None,
+        dumps: Callable[[V], bytes] = _dumps,
+        loads: Callable[[bytes], V] = pickle.loads,
+        sizeof: Callable[[V], int] | None = None,
+    ):
+        self.logger = setup_logger("SessionStore")
+        self.factory = factory
+        self.idle_ttl = idle_ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.offload_dir = offload_dir
+        self.dumps = dumps
+        self.loads = loads
+        self.sizeof = sizeof or (lambda value: len(dumps(value)))
+        self.bytes = 0
+        self._stats = {"hits": 0, "misses": 0, "created": 0, "expired": 0, "evicted": 0, "offloaded": 0, "loaded": 0}
+        # session_id -> (상태, 마지막 접근 시각, 크기), 접근 순서(LRU)로 정렬
+        self._entries: OrderedDict[Hashable, Tuple[V, float, int]] = OrderedDict()
+        # 디스크로 내보낸 세션의 마지막 접근 시각
+        self._offloaded: Dict[Hashable, float] = {}
+        self._pins: Dict[Hashable, int] = {}
+        # 디스크에 쓰는 중인 세션: session_id -> (상태, 마지막 접근 시각, 쓰기 작업)
+        self._writing: Dict[Hashable, Tuple[V, float, asyncio.Task]] = {}
+        # 세션별 마지막 쓰기 작업 (같은 세션의 쓰기는 순서대로 실행한다)
+        self._tasks: Dict[Hashable, asyncio.Task] = {}
+
+        if offload_dir:
+            os.makedirs(offload_dir, exist_ok=True)
+
+    def get(self, session_id: Hashable, default: V | None = None) -> V | None:
+        self._expire()
+        entry = self._entries.get(session_id)
+        if entry is not None:
+            self._stats["hits"] += 1
+            self._entries[session_id] = (entry[0], time.monotonic(), entry[2])
+            self._entries.move_to_end(session_id)
+            return entry[0]
+
+        value = self._load(session_id)
+        if value is None:
+            self._stats["misses"] += 1
+            return default
+
+        self.set(session_id, value)
+        return value
+
+    async def restore(self, session_id: Hashable) -> None:
+        """디스크로 내보낸 세션이면 이벤트 루프 밖에서 읽어 메모리로 되돌립니다."""
+        if session_id not in self._offloaded:
+            return
+
+        del self._offloaded[session_id]
+        value = await asyncio.to_thread(self._read, session_id)
+        # 읽는 동안 같은 세션이 새로 만들어졌다면 그 값을 유지한다
+        if value is not None and session_id not in self._entries:
+            self._stats["loaded"] += 1
+            self.set(session_id, value)
+
+    async def flush(self) -> None:
+        """진행 중인 offload 쓰기가 끝날 때까지 기다립니다."""
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks.values()), return_exceptions=True)
+
+    def get_or_create(self, session_id: Hashable) -> V:
+        value = self.get(session_id)
+        if value is None:
+            value = self.factory()
+            self._stats["created"] += 1
+            self.set(session_id, value)
+        return value
+
+    def set(self, session_id: Hashable, value: V) -> None:
+        """세션을 저장(또는 교체)하고 크기를 다시 측정합니다."""
+        self._remove(session_id)
+        size = self.sizeof(value)
+        self._entries[session_id] = (value, time.monotonic(), size)
+        self.bytes += size
+        self._evict()
+
+    def pop(self, session_id: Hashable, default: V | None = None) -> V | None:
+        """세션을 메모리와 디스크에서 완전히 제거합니다. (연결 종료 등)"""
+        self._pins.pop(session_id, None)
+        entry = self._remove(session_id)
+        writing = self._writing.pop(session_id, None)
+        if entry is None and writing is not None:
+            entry = (writing[0], writing[1], 0)
+        if session_id in self._offloaded:
+            del self._offloaded[session_id]
+            self._delete_file(session_id)
+        return entry[0] if entry is not None else default
+
+    def pin(self, session_id: Hashable) -> None:
+        self._pins[session_id] = self._pins.get(session_id, 0) + 1
+
+    def unpin(self, session_id: Hashable) -> None:
+        count = self._pins.get(session_id, 0) - 1
+        if count > 0:
+            self._pins[session_id] = count
+        else:
+            self._pins.pop(session_id, None)
+            self._evict()
+
+    def stats(self) -> dict:
+        return {**self._stats, "entries": len(self._entries), "offloaded_entries": len(self._offloaded), "bytes": self.bytes}
+
+    def __getitem__(self, session_id: Hashable) -> V:
+        value = self.get(session_id)
+        if value is None:
+            raise KeyError(session_id)
+        return value
+
+    def __setitem__(self, session_id: Hashable, value: V) -> None:
+        self.set(session_id, value)
+
+    def __contains__(self, session_id: Hashable) -> bool:
+        self._expire()
+        return session_id in self._entries or session_id in self._writing or session_id in self._offloaded
+
+    def __len__(self) -> int:
+        return len(self._entries) + len(self._writing) + len(self._offloaded)
+
+    def _remove(self, session_id: Hashable) -> Tuple[V, float, int] | None:
+        entry = self._entries.pop(session_id, None)
+        if entry is not None:
+            self.bytes -= entry[2]
+        return entry
+
+    def _expire(self) -> None:
+        if self.idle_ttl is None:
+            return
+
+        deadline = time.monotonic() - self.idle_ttl
+        # 접근 순서로 정렬되어 있으므로 앞쪽만 확인하면 된다
+        for session_id in list(self._entries):
+            if self._entries[session_id][1] >= deadline:
+                break
+            if session_id in self._pins:
+                continue
+            self._remove(session_id)
+            self._stats["expired"] += 1
+
+        for session_id, accessed in list(self._offloaded.items()):
+            if accessed < deadline:
+                del self._offloaded[session_id]
+                self._delete_file(session_id)
+                self._stats["expired"] += 1
+
+    def _evict(self) -> None:
+        self._expire()
+        for session_id in list(self._entries):
+            if not (
+                len(self._entries) > self.max_entries
+                or (self.max_bytes is not None and self.bytes > self.max_bytes)
+            ):
+                break
+            if session_id in self._pins:
+                continue
+
+            value, accessed, _ = self._remove(session_id)
+            self._stats["evicted"] += 1
+            if self.offload_dir:
+                self._offload(session_id, value, accessed)
+
+    def _offload(self, session_id: Hashable, value: V, accessed: float) -> None:
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            # 이벤트 루프 밖(동기 코드)에서는 바로 쓴다
+            if self._write(session_id, value):
+                self._offloaded[session_id] = accessed
+                self._stats["offloaded"] += 1
+            return
+
+        previous = self._tasks.get(session_id)
+        task = asyncio.create_task(self._offload_in_thread(session_id, value, accessed, previous))
+        self._writing[session_id] = (value, accessed, task)
+        self._tasks[session_id] = task
+
+    async def _offload_in_thread(self, session_id: Hashable, value: V, accessed: float, previous: asyncio.Task | None) -> None:
+        task = asyncio.current_task()
+        try:
+            if previous is not None:
+                await asyncio.gather(previous, return_exceptions=True)
+            written = await asyncio.to_thread(self._write, session_id, value)
+        finally:
+            if self._tasks.get(session_id) is task:
+                del self._tasks[session_id]
+
+        writing = self._writing.get(session_id)
+        if writing is None or writing[2] is not task:
+            # 쓰는 동안 다시 사용되었거나 제거된 세션: 파일은 필요 없다
+            if written and session_id not in self._offloaded and session_id not in self._writing:
+                self._delete_file(session_id)
+            return
+
+        del self._writing[session_id]
+        if written:
+            self._offloaded[session_id] = accessed
+            self._stats["offloaded"] += 1
+
+    def _path(self, session_id: Hashable) -> str:
+        name = hashlib.sha256(str(session_id).encode("utf-8")).hexdigest()
+        return os.path.join(self.offload_dir, f"{name}.session")
+
+    def _write(self, session_id: Hashable, value: V) -> bool:
+        path = self._path(session_id)
+        try:
+            with open(f"{path}.tmp", "wb") as f:
+                f.write(self.dumps(value))
+            os.replace(f"{path}.tmp", path)
+        except Exception as e:
+            self.logger.warning(f"세션 offload 실패 ({session_id}): {e}")
+            return False
+        return True
+
+    def _load(self, session_id: Hashable) -> V | None:
+        writing = self._writing.pop(session_id, None)
+        if writing is not None:
+            # 아직 쓰는 중이면 메모리의 값을 그대로 되돌린다
+            return writing[0]
+
+        if session_id not in self._offloaded:
+            return None
+
+        del self._offloaded[session_id]
+        value = self._read(session_id)
+        if value is not None:
+            self._stats["loaded"] += 1
+        return value
+
+    def _read(self, session_id: Hashable) -> V | None:
+        path = self._path(session_id)
+        try:
+            with open(path, "rb") as f:
+                value = self.loads(f.read())
+        except Exception as e:
+            self.logger.warning(f"세션 load 실패 ({session_id}): {e}")
+            return None
+        finally:
+            self._delete_file(session_id)
+        return value
+
+    def _delete_file(self, session_id: Hashable) -> None:
+        try:
+            os.remove(self._path(session_id))
+        except OSError:
+            pass
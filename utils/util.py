@@ -6,7 +6,7 @@ import re
 import subprocess
 import sys
 import importlib
-from typing import Any, List, Union
+from typing import Any, AsyncGenerator, AsyncIterable, Iterable, Iterator, List, Union
 from scheme.a2a_message import AgentMessage
 from scheme.mcp import MCPRequest, MCPRequestMessage
 from utils.constant import SUCCESS
@@ -52,85 +52,177 @@ def fix_json_keys(response_text: str) -> str:
     fixed = re.sub(r'([{,]\s*)([a-zA-Z0-9_]+)\s*:', r'\1"\2":', response_text)
     return fixed
 
+
+class StreamingJSONParser:
+    """
+        LLM 출력을 조각(token/chunk) 단위로 받아, 최상위 JSON 객체가 닫히는 즉시 돌려주는 파서
+
+        - 객체 밖의 문자(```json 코드 펜스, 배열 괄호, 쉼표, 설명 문장)는 무시한다.
+          따라서 [ {...}, {...} ] 형태와 {...}, {...} 나열 형태를 모두 처리한다.
+        - 문자열 안의 괄호와 escape된 따옴표는 깊이 계산에 포함하지 않는다.
+        - 그대로 파싱되지 않는 객체는 fix_json_keys로 따옴표 없는 키를 보정해 다시 시도하고,
+          그래도 실패하면 errors에 기록하고 건너뛴다.
+    """
+
+    def __init__(self):
+        self.errors: List[str] = []
+        self._buffer: List[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, chunk: str) -> List[dict]:
+        """chunk를 이어 붙이고, 이번 chunk에서 완성된 객체들을 반환합니다."""
+        objects = []
+        start = 0 if self._depth else None
+
+        for i, char in enumerate(chunk):
+            if self._depth == 0:
+                if char == "{":
+                    self._depth = 1
+                    start = i
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if char == '"':
+                self._in_string = True
+            elif char == "{":
+                self._depth += 1
+            elif char == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._buffer.append(chunk[start:i + 1])
+                    parsed = self._parse("".join(self._buffer))
+                    self._buffer.clear()
+                    start = None
+                    if parsed is not None:
+                        objects.append(parsed)
+
+        if self._depth and start is not None:
+            self._buffer.append(chunk[start:])
+        return objects
+
+    def close(self) -> None:
+        """스트림이 끝났을 때 닫히지 않은 객체가 남아 있으면 errors에 기록합니다."""
+        if self._depth:
+            self.errors.append(f"닫히지 않은 JSON 객체: {''.join(self._buffer)[:200]}")
+        self._buffer.clear()
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    def _parse(self, text: str) -> dict | None:
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError:
+            pass
+
+        try:
+            return json.loads(fix_json_keys(text))
+        except json.JSONDecodeError as e:
+            self.errors.append(f"{e}: {text[:200]}")
+            return None
+
+
+def iter_json_objects(chunks: Iterable[str]) -> Iterator[dict]:
+    """chunks(스트리밍 조각 또는 전체 응답 목록)에서 최상위 JSON 객체를 순서대로 꺼냅니다."""
+    parser = StreamingJSONParser()
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    parser.close()
+    for error in parser.errors:
+        print(f"[iter_json_objects] JSON 파싱 에러: {error}")
+
+
+def _to_tool_selection(parsed_response: dict) -> MCPRequest:
+    selected_tool = parsed_response.get("selected_tool", "")
+    task_content = parsed_response.get("content")
+    metadata = parsed_response.get("metadata")
+    return MCPRequest(
+        content=[
+            MCPRequestMessage(content=task_content, metadata=metadata)
+        ],
+        selected_tool=selected_tool,
+    )
+
+
+def _to_agent_message(request_sender: str, item: dict) -> AgentMessage:
+    receiver = item.get("receiver")
+    payload_data = item.get("payload", [])
+    payload_objs = []
+    id = item.get("id")
+    for data in payload_data:
+        if isinstance(data, dict):
+            payload_objs.append(
+                MCPRequest(content=[MCPRequestMessage(**data)])
+            )
+
+    return AgentMessage(
+        id = id,
+        sender=request_sender,
+        receiver=receiver,
+        payload=payload_objs,
+        dag=item.get("dag", id),
+        origin_request="",
+        stop_reason=SUCCESS
+    )
+
+
 def convert_to_agent_message_local(response_text: List[str]) -> List[MCPRequest]:
     logger = setup_logger("DefaultModel")
     messages = []
 
-    try:
-        for response in response_text:
-            if response.startswith("```json"):
-                response = response.lstrip("```json").rstrip("```").strip()
-            elif response.startswith("```"):
-                response = response.lstrip("```").rstrip("```").strip()
-            response = fix_json_keys(response)
-            parsed_response = json.loads(response)
-
-            selected_tool = parsed_response.get("selected_tool", "")
-            task_content = parsed_response.get("content")
-            metadata = parsed_response.get("metadata")
-            payload_obj = MCPRequest(
-                content=[
-                    MCPRequestMessage(content=task_content, metadata=metadata)
-                ],
-                selected_tool=selected_tool,
-            )
-            messages.append(payload_obj)
+    for response in response_text:
+        parser = StreamingJSONParser()
+        for parsed_response in parser.feed(response):
+            try:
+                messages.append(_to_tool_selection(parsed_response))
+            except Exception as e:
+                logger.error(f"[convert_tool_selection_message] 알 수 없는 에러: {e}", exc_info=True)
+        parser.close()
 
-    except json.JSONDecodeError as e:
-        logger.error(f"[convert_tool_selection_message] JSON 파싱 에러: {e}", exc_info=True)
-    except Exception as e:
-        logger.error(f"[convert_tool_selection_message] 알 수 없는 에러: {e}", exc_info=True)
+        for error in parser.errors:
+            logger.error(f"[convert_tool_selection_message] JSON 파싱 에러: {error}")
     
     return messages
 
 def convert_to_agent_message_api(request_sender: str, response_text: List[str]) -> List[AgentMessage]:
     agent_messages = []
 
-    try:
-        for response in response_text:
-            if response.startswith("```json"):
-                response = response.lstrip("```json").rstrip("```").strip()
-            elif response.startswith("```"):
-                response = response.lstrip("```").rstrip("```").strip()
-            response = fix_json_keys(response)
-            parsed_response = json.loads(response)
-
-            for item in parsed_response:
-                sender = request_sender
-                receiver = item.get("receiver")
-                payload_data = item.get("payload", [])
-                payload_objs = []
-                id = item.get("id")
-                for data in payload_data:
-                    if isinstance(data, dict):
-                        if receiver == "user":
-                            payload_objs.append(
-                                MCPRequest(content=[MCPRequestMessage(**data)])
-                            )
-                        else:
-                            payload_objs.append(
-                                MCPRequest(content=[MCPRequestMessage(**data)])
-                            )
-                
-                agent_message = AgentMessage(
-                    id = id,
-                    sender=sender,
-                    receiver=receiver,
-                    payload=payload_objs,
-                    dag=item.get("dag", id),
-                    origin_request="",
-                    stop_reason=SUCCESS
-                )
-
-                agent_messages.append(agent_message)
-
-    except json.JSONDecodeError as e:
-        print(f"[convert_to_agent_message] JSON 파싱 에러: {e}")
-    except Exception as e:
-        print(f"[convert_to_agent_message] 알 수 없는 에러: {e}")
+    for item in iter_json_objects(response_text):
+        try:
+            agent_messages.append(_to_agent_message(request_sender, item))
+        except Exception as e:
+            print(f"[convert_to_agent_message] 알 수 없는 에러: {e}")
 
     return agent_messages
 
+
+async def stream_agent_messages(request_sender: str, chunks: AsyncIterable[str]) -> AsyncGenerator[AgentMessage, None]:
+    """
+    스트리밍 응답 조각을 받으면서, 각 step 객체가 닫히는 즉시 AgentMessage로 내보냅니다.
+    (앞 step은 뒤 step이 생성되는 동안 먼저 실행될 수 있다)
+    """
+    parser = StreamingJSONParser()
+    async for chunk in chunks:
+        for item in parser.feed(chunk):
+            try:
+                yield _to_agent_message(request_sender, item)
+            except Exception as e:
+                print(f"[stream_agent_messages] 알 수 없는 에러: {e}")
+    parser.close()
+
+    for error in parser.errors:
+        print(f"[stream_agent_messages] JSON 파싱 에러: {error}")
+
 def get_schema_from_class_path(cls_path: str) -> dict | None:
     """
     cls_path를 받아서 동일 경로의 json 파일을 읽어온다.
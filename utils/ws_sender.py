@@ -0,0 +1,137 @@
+import asyncio
+import hashlib
+import json
+from collections import OrderedDict
+from typing import Any
+
+from fastapi import WebSocket
+
+from utils.constant import SEND_DEDUP_WINDOW, SEND_QUEUE_SIZE
+from utils.logging import setup_logger
+
+
+class WebSocketSender:
+    """
+        연결별 송신기: bounded queue + writer task
+
+        - send()는 frame을 queue에 넣기만 한다. queue가 가득 차면 writer가 비울 때까지 기다린다. (backpressure)
+        - writer는 socket 전송을 await하므로 클라이언트가 느리면 전송 버퍼가 빠질 때까지 대기한다.
+        - 같은 내용(dedup_key)의 frame은 최근 dedup_window개 안에서 한 번만 보낸다. (send() 시점에 판단)
+        - writer가 전송하는 동안 queue에 쌓인 frame 중 같은 sender의 연속 frame은 하나로 합쳐 보낸다.
+          ({sender: payload} 형태이고 content 목록 외의 필드가 같은 경우에만 content를 이어 붙인다)
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        max_queue: int = SEND_QUEUE_SIZE,
+        dedup_window: int = SEND_DEDUP_WINDOW,
+    ):
+        self.logger = setup_logger("WebSocketSender")
+        self.websocket = websocket
+        self.dedup_window = dedup_window
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._recent: OrderedDict[bytes, None] = OrderedDict()
+        self._writer: asyncio.Task | None = None
+        self._error: BaseException | None = None
+        self._stats = {"queued": 0, "sent": 0, "deduplicated": 0, "coalesced": 0}
+
+    def start(self) -> None:
+        if self._writer is None:
+            self._writer = asyncio.create_task(self._write_loop())
+
+    async def send(self, frame: Any, dedup_key: Any = None) -> bool:
+        """
+        frame(JSON으로 직렬화 가능한 값)을 전송 대기열에 넣습니다.
+        dedup_key가 주어지면 frame 대신 그 값으로 중복을 판단합니다. 중복이라 버렸다면 False를 반환합니다.
+        """
+        if self._error is not None:
+            raise self._error
+
+        digest = hashlib.sha1(
+            json.dumps(frame if dedup_key is None else dedup_key, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")
+        ).digest()
+        if digest in self._recent:
+            self._stats["deduplicated"] += 1
+            return False
+
+        self._recent[digest] = None
+        while len(self._recent) > self.dedup_window:
+            self._recent.popitem(last=False)
+
+        await self._queue.put(frame)
+        self._stats["queued"] += 1
+        return True
+
+    def reset_dedup(self) -> None:
+        """새 요청을 받을 때 이전 요청의 중복 기록을 비웁니다."""
+        self._recent.clear()
+
+    def stats(self) -> dict:
+        return {**self._stats, "pending": self._queue.qsize()}
+
+    async def close(self, timeout: float = 5.0) -> None:
+        """남은 frame을 보내고 writer를 종료합니다. (연결이 이미 끊겼다면 버린다)"""
+        if self._writer is None:
+            return
+
+        if self._error is None:
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout=timeout)
+            except asyncio.TimeoutError:
+                self.logger.warning(f"전송하지 못한 frame {self._queue.qsize()}개를 버립니다.")
+
+        self._writer.cancel()
+        try:
+            await self._writer
+        except (asyncio.CancelledError, Exception):
+            pass
+        self._writer = None
+
+    async def _write_loop(self) -> None:
+        # 합칠 수 없어 다음 전송으로 미룬 frame (queue에서는 이미 꺼냈다)
+        held = None
+        while True:
+            frame = held if held is not None else await self._queue.get()
+            held = None
+            taken = 1
+
+            # 전송을 기다리는 동안 쌓인 같은 sender의 연속 frame은 한 번에 보낸다
+            while not self._queue.empty():
+                following = self._queue.get_nowait()
+                merged = self._merge(frame, following)
+                if merged is None:
+                    held = following
+                    break
+                frame = merged
+                taken += 1
+                self._stats["coalesced"] += 1
+
+            try:
+                if self._error is None:
+                    await self.websocket.send_text(json.dumps(frame, ensure_ascii=False, default=str))
+                    self._stats["sent"] += 1
+            except Exception as e:
+                # 연결이 끊기면 이후 send()에서 예외를 알리고, 남은 frame은 버린다
+                self._error = e
+                self.logger.warning(f"WebSocket 전송 실패: {e}")
+            finally:
+                for _ in range(taken):
+                    self._queue.task_done()
+
+    @staticmethod
+    def _merge(first: Any, second: Any) -> Any | None:
+        """{sender: payload} frame 두 개를 content를 이어 붙인 하나의 frame으로 합칩니다. 합칠 수 없으면 None"""
+        if not (isinstance(first, dict) and isinstance(second, dict) and len(first) == 1 and first.keys() == second.keys()):
+            return None
+
+        sender = next(iter(first))
+        head, tail = first[sender], second[sender]
+        if not (isinstance(head, dict) and isinstance(tail, dict)):
+            return None
+        if not (isinstance(head.get("content"), list) and isinstance(tail.get("content"), list)):
+            return None
+        if {k: v for k, v in head.items() if k != "content"} != {k: v for k, v in tail.items() if k != "content"}:
+            return None
+
+        return {sender: {**head, "content": head["content"] + tail["content"]}}